@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import gzip
+import hashlib
+import threading
+from collections import OrderedDict
+from collections.abc import Hashable
+
+from werkzeug.datastructures import Accept
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_TYPES = ("application/json", "text/")
+
+
+class ResponseCompressor:
+    """
+    Negotiated gzip or brotli compression of response bodies.
+
+    Compressed bodies are cached by a key identifying their content. Callers that know the
+    version of the data behind a body pass it as key and look it up with :meth:`cached`
+    before serializing, so an unchanged listing is serialized and compressed once and
+    served from memory afterwards. Other bodies are keyed by their digest. Brotli is
+    offered only when the ``brotli`` package is installed (``pip install .[api]``).
+    """
+
+    def __init__(
+        self,
+        threshold: int = 1024,
+        gzip_level: int = 6,
+        brotli_quality: int = 5,
+        cache_size: int = 32,
+    ) -> None:
+        """
+        Initialize the compressor.
+
+        :param threshold: Smallest body compressed, in bytes; smaller ones gain nothing.
+        :type threshold: int, optional
+        :param gzip_level: gzip compression level (1-9).
+        :type gzip_level: int, optional
+        :param brotli_quality: brotli quality (0-11).
+        :type brotli_quality: int, optional
+        :param cache_size: Number of compressed bodies kept.
+        :type cache_size: int, optional
+        """
+        self.threshold = threshold
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.cache_size = cache_size
+        self.encodings = ("br", "gzip") if brotli is not None else ("gzip",)
+        self._cache: OrderedDict[tuple[str, Hashable], bytes] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def negotiate(self, accept_encodings: Accept) -> str | None:
+        """
+        Pick the encoding of a response.
+
+        :param accept_encodings: The parsed ``Accept-Encoding`` header of the request.
+        :type accept_encodings: werkzeug.datastructures.Accept
+        :returns: ``"br"`` or ``"gzip"``, None to send the body uncompressed.
+        :rtype: str or None
+        """
+        return accept_encodings.best_match(self.encodings)
+
+    def compressible(self, mimetype: str, size: int) -> bool:
+        """
+        Check whether a body is worth compressing.
+
+        :param mimetype: Content type of the body, without parameters.
+        :type mimetype: str
+        :param size: Body size in bytes.
+        :type size: int
+        :returns: True for textual bodies of at least ``threshold`` bytes.
+        :rtype: bool
+        """
+        return size >= self.threshold and mimetype.startswith(COMPRESSIBLE_TYPES)
+
+    def _lookup(self, key: tuple[str, Hashable]) -> bytes | None:
+        # Called with the lock held
+        compressed = self._cache.get(key)
+        if compressed is not None:
+            self._cache.move_to_end(key)
+            self.hits += 1
+        return compressed
+
+    def cached(self, version: Hashable, encoding: str) -> bytes | None:
+        """
+        Get a cached body by the version of its content, without the body at hand.
+
+        A miss is not counted; the :meth:`compress` call that follows counts it.
+
+        :param version: The ``version`` the body was compressed with.
+        :type version: Hashable
+        :param encoding: ``"br"`` or ``"gzip"``.
+        :type encoding: str
+        :returns: The compressed body, or None if it is not cached.
+        :rtype: bytes or None
+        """
+        with self._lock:
+            return self._lookup((encoding, version))
+
+    def compress(
+        self, body: bytes, encoding: str, version: Hashable | None = None
+    ) -> bytes:
+        """
+        Compress a body, reusing the cached result for an unchanged body.
+
+        :param body: The uncompressed body.
+        :type body: bytes
+        :param encoding: ``"br"`` or ``"gzip"``.
+        :type encoding: str
+        :param version: Identity of the body content, e.g. a data version read before the
+                        body was serialized; defaults to the body digest.
+        :type version: Hashable, optional
+        :returns: The compressed body.
+        :rtype: bytes
+        """
+        if version is None:
+            version = hashlib.blake2b(body, digest_size=16).digest()
+        key = (encoding, version)
+        with self._lock:
+            compressed = self._lookup(key)
+            if compressed is not None:
+                return compressed
+            self.misses += 1
+        if encoding == "br":
+            compressed = brotli.compress(body, quality=self.brotli_quality)
+        else:
+            # mtime=0 keeps the output identical for identical bodies
+            compressed = gzip.compress(body, compresslevel=self.gzip_level, mtime=0)
+        with self._lock:
+            self._cache[key] = compressed
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return compressed
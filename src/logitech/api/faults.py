@@ -0,0 +1,260 @@
+from __future__ import annotations
+
+import math
+import random
+import threading
+import time
+from collections.abc import Iterator
+from dataclasses import asdict, dataclass, field
+
+DISTRIBUTIONS = ("fixed", "uniform", "normal", "lognormal", "exponential")
+
+
+@dataclass
+class Latency:
+    """
+    Added response latency, in seconds, drawn from a distribution.
+
+    ``fixed`` waits ``a``; ``uniform`` draws from ``[a, b]``; ``normal`` and ``lognormal``
+    use mean (of the log for ``lognormal``) ``a`` and standard deviation ``b``;
+    ``exponential`` has mean ``a``. Negative draws wait zero.
+    """
+
+    distribution: str = "fixed"
+    a: float = 0.0
+    b: float = 0.0
+
+    def __post_init__(self) -> None:
+        if self.distribution not in DISTRIBUTIONS:
+            raise ValueError(f"Unknown latency distribution: {self.distribution}")
+
+    def sample(self, rng: random.Random) -> float:
+        """
+        Draw one latency.
+
+        :param rng: Random generator of the fault model.
+        :type rng: random.Random
+        :returns: Seconds to wait.
+        :rtype: float
+        """
+        if self.distribution == "fixed":
+            value = self.a
+        elif self.distribution == "uniform":
+            value = rng.uniform(self.a, self.b)
+        elif self.distribution == "normal":
+            value = rng.gauss(self.a, self.b)
+        elif self.distribution == "lognormal":
+            value = rng.lognormvariate(self.a, self.b)
+        else:
+            value = rng.expovariate(1 / self.a) if self.a > 0 else 0.0
+        return max(0.0, value)
+
+
+@dataclass
+class RouteFaults:
+    """Faults injected into the responses of one route."""
+
+    latency: Latency | None = None
+    # Response body throughput in bytes per second, None for unthrottled
+    bandwidth: int | None = None
+    # Token bucket: at most ``rate_limit`` requests per ``rate_period`` seconds
+    rate_limit: int | None = None
+    rate_period: float = 1.0
+    error_ratio: float = 0.0
+    error_status: int = 503
+    drop_ratio: float = 0.0
+
+    @classmethod
+    def from_dict(cls, data: dict) -> RouteFaults:
+        """
+        Build route faults from their JSON form.
+
+        :param data: Field values; ``latency`` is a dict of :class:`Latency` fields.
+        :type data: dict
+        :returns: The route faults.
+        :rtype: RouteFaults
+        :raises ValueError: If a field is unknown or out of range.
+        """
+        data = dict(data)
+        latency = data.pop("latency", None)
+        try:
+            faults = cls(**data, latency=Latency(**latency) if latency else None)
+        except TypeError as e:
+            raise ValueError(str(e)) from None
+        for name in ("error_ratio", "drop_ratio"):
+            if not 0 <= getattr(faults, name) <= 1:
+                raise ValueError(f"{name} must be between 0 and 1")
+        if faults.bandwidth is not None and faults.bandwidth <= 0:
+            raise ValueError("bandwidth must be positive")
+        if faults.rate_limit is not None and (
+            faults.rate_limit <= 0 or faults.rate_period <= 0
+        ):
+            raise ValueError("rate_limit and rate_period must be positive")
+        return faults
+
+
+class TokenBucket:
+    """Rate limiter allowing bursts of ``capacity`` requests, refilled over ``period`` seconds."""
+
+    def __init__(self, capacity: int, period: float) -> None:
+        self.capacity = capacity
+        self.rate = capacity / period
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+
+    def acquire(self) -> float:
+        """
+        Take a token.
+
+        :returns: 0 if a token was taken, otherwise seconds until one is available.
+        :rtype: float
+        """
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+
+@dataclass
+class Decision:
+    """What to do with one request, decided before it is handled."""
+
+    latency: float = 0.0
+    retry_after: int | None = None
+    error_status: int | None = None
+    drop: bool = False
+    bandwidth: int | None = None
+
+
+@dataclass
+class FaultModel:
+    """
+    Per-route latency, throughput and fault settings of the mock API.
+
+    Routes are keyed by ``"<METHOD> <rule>"`` (e.g. ``"GET /users/<int:user_id>"``), by the
+    rule alone for every method, or by ``"*"`` for every route; the most specific key wins.
+    All random draws come from one generator seeded with ``seed``, so a sequence of
+    requests gets the same faults on every run.
+    """
+
+    routes: dict[str, RouteFaults] = field(default_factory=dict)
+    seed: int | None = None
+
+    def __post_init__(self) -> None:
+        self._rng = random.Random(self.seed)
+        self._buckets: dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_dict(cls, data: dict) -> FaultModel:
+        """
+        Build a fault model from its JSON form.
+
+        :param data: ``{"seed": int | None, "routes": {key: route faults}}``.
+        :type data: dict
+        :returns: The fault model.
+        :rtype: FaultModel
+        :raises ValueError: If the settings are invalid.
+        """
+        unknown = set(data) - {"seed", "routes"}
+        if unknown:
+            raise ValueError(f"Unknown settings: {', '.join(sorted(unknown))}")
+        routes = {
+            key: RouteFaults.from_dict(value)
+            for key, value in data.get("routes", {}).items()
+        }
+        return cls(routes, data.get("seed"))
+
+    def to_dict(self) -> dict:
+        """
+        Get the JSON form of the settings.
+
+        :returns: The settings, as accepted by :meth:`from_dict`.
+        :rtype: dict
+        """
+        return {
+            "seed": self.seed,
+            "routes": {key: asdict(faults) for key, faults in self.routes.items()},
+        }
+
+    def route(self, method: str, rule: str) -> tuple[str, RouteFaults] | None:
+        """
+        Find the settings of a route.
+
+        :param method: HTTP method of the request.
+        :type method: str
+        :param rule: URL rule the request matched, e.g. ``/users/<int:user_id>``.
+        :type rule: str
+        :returns: The matching key and its settings, or None if the route is unaffected.
+        :rtype: tuple[str, RouteFaults] or None
+        """
+        for key in (f"{method} {rule}", rule, "*"):
+            faults = self.routes.get(key)
+            if faults is not None:
+                return key, faults
+        return None
+
+    def decide(self, method: str, rule: str) -> Decision:
+        """
+        Draw the faults of one request.
+
+        Rate limiting is checked first, a limited request gets no other faults.
+
+        :param method: HTTP method of the request.
+        :type method: str
+        :param rule: URL rule the request matched.
+        :type rule: str
+        :returns: The faults to apply.
+        :rtype: Decision
+        """
+        match = self.route(method, rule)
+        if match is None:
+            return Decision()
+        key, faults = match
+        with self._lock:
+            if faults.rate_limit is not None:
+                bucket = self._buckets.get(key)
+                if bucket is None:
+                    bucket = self._buckets[key] = TokenBucket(
+                        faults.rate_limit, faults.rate_period
+                    )
+                wait = bucket.acquire()
+                if wait:
+                    return Decision(retry_after=max(1, math.ceil(wait)))
+            decision = Decision(bandwidth=faults.bandwidth)
+            if faults.latency is not None:
+                decision.latency = faults.latency.sample(self._rng)
+            # Always draw both, so changing one ratio does not shift the other's sequence
+            drop, error = self._rng.random(), self._rng.random()
+            if drop < faults.drop_ratio:
+                decision.drop = True
+            elif error < faults.error_ratio:
+                decision.error_status = faults.error_status
+        return decision
+
+
+def throttle(body: bytes, bandwidth: int, chunk_size: int = 1024) -> Iterator[bytes]:
+    """
+    Yield a response body in chunks, paced to a throughput.
+
+    :param body: The complete body.
+    :type body: bytes
+    :param bandwidth: Throughput in bytes per second.
+    :type bandwidth: int
+    :param chunk_size: Largest chunk yielded at once.
+    :type chunk_size: int, optional
+    :returns: Iterator over the chunks.
+    :rtype: Iterator[bytes]
+    """
+    chunk_size = max(1, min(chunk_size, bandwidth // 10 or 1))
+    started = time.monotonic()
+    for offset in range(0, len(body), chunk_size):
+        chunk = body[offset : offset + chunk_size]
+        due = started + (offset + len(chunk)) / bandwidth
+        delay = due - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        yield chunk
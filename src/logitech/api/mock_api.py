@@ -1,17 +1,41 @@
-from flask import Flask, jsonify, request
+import socket
+import time
+
+from flask import Flask, g, jsonify, request
+
+from .compression import ResponseCompressor
+from .faults import FaultModel, throttle
+from .user_store import DuplicateEmailError, UserStore
 
 app = Flask(__name__)
 
+# gzip/brotli compression of large responses, cached for unchanged bodies
+compressor = ResponseCompressor()
+
+# Latency, throughput and fault settings, changed at runtime through /admin/faults
+faults = FaultModel()
+
 # Sample data
-users = [
-    {"id": 1, "name": "Alice", "email": "alice@example.com"},
-    {"id": 2, "name": "Bob", "email": "bob@example.com"},
-]
+store = UserStore(
+    [
+        {"id": 1, "name": "Alice", "email": "alice@example.com"},
+        {"id": 2, "name": "Bob", "email": "bob@example.com"},
+    ]
+)
 
 
 @app.route("/users", methods=["GET"])
 def get_users():
-    return jsonify(users), 200
+    # Read before serializing: a concurrent change then causes a miss, never a stale body
+    version = ("users", store.version)
+    encoding = compressor.negotiate(request.accept_encodings)
+    compressed = compressor.cached(version, encoding) if encoding else None
+    if compressed is not None:
+        response = app.response_class(compressed, mimetype="application/json")
+        response.headers["Content-Encoding"] = encoding
+        return response, 200
+    g.body_version = version
+    return jsonify(store.users), 200
 
 
 @app.route("/users", methods=["POST"])
@@ -19,20 +43,148 @@ def create_user():
     data = request.json
     if not data or "name" not in data or "email" not in data:
         return jsonify({"error": "Invalid data"}), 400
-    new_user = {"id": len(users) + 1, "name": data["name"], "email": data["email"]}
-    users.append(new_user)
+    try:
+        new_user = store.add(data["name"], data["email"])
+    except DuplicateEmailError:
+        return jsonify({"error": "Email already exists"}), 409
     return jsonify(new_user), 201
 
 
+@app.route("/users/search", methods=["GET"])
+def search_users():
+    email, name = request.args.get("email"), request.args.get("name")
+    prefix = request.args.get("name_prefix")
+    if [email, name, prefix].count(None) != 2:
+        return jsonify({"error": "Expected one of email, name or name_prefix"}), 400
+    limit = request.args.get("limit", 100, type=int)
+    if email is not None:
+        user = store.by_email(email)
+        return jsonify([user] if user else []), 200
+    if name is not None:
+        return jsonify(store.by_name(name, limit=limit)), 200
+    return jsonify(store.by_name(prefix, prefix=True, limit=limit)), 200
+
+
 @app.route("/users/<int:user_id>", methods=["GET"])
 def get_user(user_id):
     if user_id == 999:
         return jsonify({"error": "Internal Server Error"}), 500
-    user = next((u for u in users if u["id"] == user_id), None)
+    user = store.get(user_id)
     if not user:
         return jsonify({"error": "User not found"}), 404
     return jsonify(user), 200
 
 
+def dropped_body():
+    # Servers send the headers only with the first non-empty chunk
+    yield b"{"
+    raise ConnectionAbortedError("Injected connection drop")
+
+
+@app.before_request
+def inject_faults():
+    if request.url_rule is None or request.path.startswith("/admin/"):
+        return None
+    decision = faults.decide(request.method, request.url_rule.rule)
+    g.fault_decision = decision
+    if decision.retry_after is not None:
+        return (
+            jsonify({"error": "Too Many Requests"}),
+            429,
+            {"Retry-After": str(decision.retry_after)},
+        )
+    if decision.latency:
+        time.sleep(decision.latency)
+    if decision.drop:
+        connection = request.environ.get("werkzeug.socket")
+        if connection is None:
+            # Other servers send the headers, then abort the connection mid-body
+            return app.response_class(dropped_body(), 200, {"Content-Length": "2"})
+        # The server's write then fails and it discards the connection without a response
+        connection.shutdown(socket.SHUT_RDWR)
+        return "", 200
+    if decision.error_status is not None:
+        return jsonify({"error": "Injected fault"}), decision.error_status
+    return None
+
+
+@app.after_request
+def finish_response(response):
+    if response.direct_passthrough or response.is_streamed:
+        return response
+    # Compress first, so throttling paces the bytes actually sent
+    response.vary.add("Accept-Encoding")
+    encoding = compressor.negotiate(request.accept_encodings)
+    if (
+        encoding is not None
+        and response.status_code == 200
+        and "Content-Encoding" not in response.headers
+        and compressor.compressible(
+            response.mimetype or "", response.content_length or 0
+        )
+    ):
+        response.set_data(
+            compressor.compress(
+                response.get_data(), encoding, version=g.get("body_version")
+            )
+        )
+        response.headers["Content-Encoding"] = encoding
+    decision = g.get("fault_decision")
+    if decision is not None and decision.bandwidth:
+        response.response = throttle(response.get_data(), decision.bandwidth)
+    return response
+
+
+@app.route("/admin/users/seed", methods=["POST"])
+def seed_users():
+    count = (request.json or {}).get("count")
+    if not isinstance(count, int) or count < 0:
+        return jsonify({"error": "Invalid data"}), 400
+    store.seed(count)
+    return jsonify({"users": len(store)}), 200
+
+
+@app.route("/admin/faults", methods=["GET"])
+def get_faults():
+    return jsonify(faults.to_dict()), 200
+
+
+@app.route("/admin/faults", methods=["PUT"])
+def set_faults():
+    global faults
+    try:
+        faults = FaultModel.from_dict(request.json or {})
+    except (TypeError, ValueError, AttributeError) as e:
+        return jsonify({"error": f"Invalid fault settings: {e}"}), 400
+    return jsonify(faults.to_dict()), 200
+
+
+@app.route("/admin/faults", methods=["DELETE"])
+def reset_faults():
+    global faults
+    faults = FaultModel()
+    return jsonify(faults.to_dict()), 200
+
+
+def serve(port: int = 5003) -> None:
+    """
+    Run the mock API, with keep-alive connections when waitress is installed.
+
+    Werkzeug's development server closes the connection after every response, so each
+    call pays a new TCP handshake. Waitress (``pip install .[api]``) keeps HTTP/1.1
+    connections open between requests.
+
+    :param port: Port to listen on.
+    :type port: int, optional
+    :returns: None
+    """
+    try:
+        import waitress
+    except ImportError:
+        app.run(debug=True, port=port)
+        return
+    waitress.serve(app, host="127.0.0.1", port=port, threads=8, channel_timeout=30)
+
+
 if __name__ == "__main__":
-    app.run(debug=True, port=5003)
+    serve()
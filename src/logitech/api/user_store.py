@@ -0,0 +1,155 @@
+from __future__ import annotations
+
+import bisect
+import threading
+from collections.abc import Iterable
+
+
+class DuplicateEmailError(ValueError):
+    """Raised when a user is added with an email address that is already taken."""
+
+
+class UserStore:
+    """
+    In-memory users with a unique email index and a sorted name index.
+
+    Emails are matched case-insensitively through a hash index. Names are kept as sorted
+    ``(casefolded name, id)`` keys, so exact and prefix lookups are a binary search plus
+    one step per match, independent of the number of users. Added names are appended
+    unsorted and sorted in by the next name lookup, once per batch of additions instead of
+    shifting the index on every addition. ``version`` is incremented on every change, so
+    responses derived from the users can be cached per version.
+    """
+
+    def __init__(self, users: Iterable[dict] = ()) -> None:
+        """
+        Initialize the store.
+
+        :param users: Initial users, each with ``id``, ``name`` and ``email``.
+        :type users: Iterable[dict], optional
+        :raises DuplicateEmailError: If two initial users share an email address.
+        """
+        self.users: list[dict] = []
+        self._by_id: dict[int, dict] = {}
+        self._by_email: dict[str, dict] = {}
+        self._names: list[tuple[str, int]] = []
+        self._names_sorted = True
+        self._lock = threading.Lock()
+        self.version = 0
+        self.extend(users)
+
+    def __len__(self) -> int:
+        return len(self.users)
+
+    def _index(self, user: dict) -> None:
+        # Called with the lock held, after the email was checked
+        self.users.append(user)
+        self._by_id[user["id"]] = user
+        self._by_email[user["email"].casefold()] = user
+        self._names.append((user["name"].casefold(), user["id"]))
+        self._names_sorted = False
+        self.version += 1
+
+    def add(self, name: str, email: str) -> dict:
+        """
+        Create a user with the next free id.
+
+        :param name: The user name.
+        :type name: str
+        :param email: The email address, unique regardless of case.
+        :type email: str
+        :returns: The created user.
+        :rtype: dict
+        :raises DuplicateEmailError: If the email address is already taken.
+        """
+        with self._lock:
+            if email.casefold() in self._by_email:
+                raise DuplicateEmailError(email)
+            user = {"id": len(self.users) + 1, "name": name, "email": email}
+            self._index(user)
+        return user
+
+    def extend(self, users: Iterable[dict]) -> None:
+        """
+        Bulk load users.
+
+        :param users: Users, each with ``id``, ``name`` and ``email``.
+        :type users: Iterable[dict]
+        :returns: None
+        :raises DuplicateEmailError: If an email address is already taken; users before it
+                                     are kept.
+        """
+        with self._lock:
+            for user in users:
+                if user["email"].casefold() in self._by_email:
+                    raise DuplicateEmailError(user["email"])
+                self._index(user)
+
+    def seed(self, count: int) -> None:
+        """
+        Add generated users ``User <id>`` / ``user<id>@example.com``, e.g. for load tests.
+
+        :param count: Number of users added.
+        :type count: int
+        :returns: None
+        """
+        first = len(self.users) + 1
+        self.extend(
+            {
+                "id": user_id,
+                "name": f"User {user_id}",
+                "email": f"user{user_id}@example.com",
+            }
+            for user_id in range(first, first + count)
+        )
+
+    def get(self, user_id: int) -> dict | None:
+        """
+        Look a user up by id.
+
+        :param user_id: The user id.
+        :type user_id: int
+        :returns: The user, or None if there is none.
+        :rtype: dict or None
+        """
+        return self._by_id.get(user_id)
+
+    def by_email(self, email: str) -> dict | None:
+        """
+        Look a user up by email address, ignoring case.
+
+        :param email: The email address.
+        :type email: str
+        :returns: The user, or None if there is none.
+        :rtype: dict or None
+        """
+        return self._by_email.get(email.casefold())
+
+    def by_name(self, name: str, prefix: bool = False, limit: int = 100) -> list[dict]:
+        """
+        Find users by name, ignoring case.
+
+        :param name: The name, or the start of it for a prefix search.
+        :type name: str
+        :param prefix: Match every name starting with ``name``.
+        :type prefix: bool, optional
+        :param limit: Largest number of users returned.
+        :type limit: int, optional
+        :returns: Matching users ordered by name, then id.
+        :rtype: list[dict]
+        """
+        key = name.casefold()
+        with self._lock:
+            if not self._names_sorted:
+                # Timsort sorts the appended names and merges them with the sorted rest
+                self._names.sort()
+                self._names_sorted = True
+            position = bisect.bisect_left(self._names, (key, 0))
+            matches = []
+            for indexed_name, user_id in self._names[position : position + limit]:
+                if indexed_name != key and not (
+                    prefix and indexed_name.startswith(key)
+                ):
+                    break
+                matches.append(self._by_id[user_id])
+        return matches
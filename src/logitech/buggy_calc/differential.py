@@ -0,0 +1,318 @@
+from __future__ import annotations
+
+import math
+import operator
+import random
+from collections import defaultdict
+from collections.abc import Callable, Iterable, Iterator
+from dataclasses import dataclass
+from decimal import Decimal, InvalidOperation
+
+from ..logger import configure_logger
+
+LOGGER = configure_logger("differential")
+
+OPERATIONS = ("+", "-", "*", "/")
+MISSING_INPUT_ERROR = "Error: provide numbers"
+INVALID_OPERATION_ERROR = "Error: invalid operation"
+
+# Magnitudes Double.toString writes in plain notation, others use E-notation
+PLAIN_NOTATION_MIN = 1e-3
+PLAIN_NOTATION_MAX = 1e7
+
+ARITHMETIC = {
+    "+": operator.add,
+    "-": operator.sub,
+    "*": operator.mul,
+    "/": operator.truediv,
+}
+
+
+@dataclass(frozen=True)
+class Case:
+    """Single ``input1 operation input2`` calculation; None marks a missing input."""
+
+    input1: str | None
+    operation: str
+    input2: str | None
+
+
+@dataclass(frozen=True)
+class Mismatch:
+    """Case whose displayed result differs from the oracle."""
+
+    case: Case
+    expected: str
+    actual: str
+
+
+def _random_operand(rng: random.Random) -> str | None:
+    kind = rng.choices(
+        [
+            "int",
+            "large",
+            "decimal",
+            "small",
+            "zero",
+            "leading_zero",
+            "trailing_dot",
+            "missing",
+        ],
+        weights=[30, 10, 25, 10, 8, 7, 7, 3],
+    )[0]
+    sign = "-" if rng.random() < 0.3 else ""
+    if kind == "missing":
+        return None
+    if kind == "zero":
+        return rng.choice(["0", "-0", "0.0", "00"])
+    if kind == "int":
+        return f"{sign}{rng.randint(1, 9999)}"
+    if kind == "large":
+        return f"{sign}{rng.randint(10**8, 10**10)}"
+    if kind == "decimal":
+        fraction = str(rng.randint(1, 99999)).zfill(rng.randint(1, 5))
+        return f"{sign}{rng.randint(0, 999)}.{fraction}"
+    if kind == "small":
+        return f"{sign}0.{'0' * rng.randint(3, 8)}{rng.randint(1, 9)}"
+    if kind == "leading_zero":
+        return f"{sign}00{rng.randint(0, 99)}.{rng.randint(0, 99)}"
+    return f"{sign}{rng.randint(0, 999)}."
+
+
+def generate_cases(count: int, seed: int = 0) -> list[Case]:
+    """
+    Generate random calculations covering integers, decimals, zeros and formatting edge cases.
+
+    :param count: Number of cases to generate.
+    :type count: int
+    :param seed: Seed making the generated cases reproducible.
+    :type seed: int, optional
+    :returns: The generated cases.
+    :rtype: list[Case]
+    """
+    rng = random.Random(seed)
+    return [
+        Case(_random_operand(rng), rng.choice(OPERATIONS), _random_operand(rng))
+        for _ in range(count)
+    ]
+
+
+def format_display(value: float) -> str:
+    """
+    Format a number the way the calculator displays results, i.e. like Java's ``Double.toString``.
+
+    The shortest digits that round-trip (as in ``repr``) are written in plain notation with
+    at least one fractional digit (``3.0``, ``0.30000000000000004``) for magnitudes from
+    10^-3 up to 10^7, and in E-notation (``1.0E10``, ``-2.5E-4``) otherwise.
+
+    :param value: The number to format.
+    :type value: float
+    :returns: The displayed text.
+    :rtype: str
+    """
+    if math.isnan(value):
+        return "NaN"
+    if math.isinf(value):
+        return "Infinity" if value > 0 else "-Infinity"
+    sign = "-" if math.copysign(1.0, value) < 0 else ""
+    if value == 0:
+        return f"{sign}0.0"
+    _, digit_tuple, exponent = Decimal(repr(abs(value))).as_tuple()
+    digits = "".join(map(str, digit_tuple))
+    # Position of the decimal point relative to the first digit
+    point = len(digits) + exponent
+    digits = digits.rstrip("0")
+    if PLAIN_NOTATION_MIN <= abs(value) < PLAIN_NOTATION_MAX:
+        if point <= 0:
+            return f"{sign}0.{'0' * -point}{digits}"
+        if point >= len(digits):
+            return f"{sign}{digits}{'0' * (point - len(digits))}.0"
+        return f"{sign}{digits[:point]}.{digits[point:]}"
+    return f"{sign}{digits[0]}.{digits[1:] or '0'}E{point - 1}"
+
+
+def expected_results(cases: list[Case]) -> list[str]:
+    """
+    Compute the expected display strings of a batch of cases in bulk.
+
+    Operands are parsed once per distinct string and each operation is applied column-wise
+    over its cases. Like the app, operands are parsed into doubles, calculated in binary
+    floating point and formatted with :func:`format_display`.
+
+    :param cases: The cases to evaluate.
+    :type cases: list[Case]
+    :returns: Expected display strings, in the order of ``cases``.
+    :rtype: list[str]
+    """
+    operands = {
+        text: float(text)
+        for case in cases
+        for text in (case.input1, case.input2)
+        if text is not None
+    }
+    results = [MISSING_INPUT_ERROR] * len(cases)
+    by_operation: dict[str, list[int]] = defaultdict(list)
+    for index, case in enumerate(cases):
+        if case.input1 is not None and case.input2 is not None:
+            by_operation[case.operation].append(index)
+
+    for operation, indexes in by_operation.items():
+        if operation == "/":
+            # Division by (negative) zero is reported instead of showing Infinity or NaN
+            valid = []
+            for index in indexes:
+                if operands[cases[index].input2] == 0:
+                    results[index] = INVALID_OPERATION_ERROR
+                else:
+                    valid.append(index)
+            indexes = valid
+        left = [operands[cases[index].input1] for index in indexes]
+        right = [operands[cases[index].input2] for index in indexes]
+        for index, value in zip(indexes, map(ARITHMETIC[operation], left, right)):
+            results[index] = format_display(value)
+    return results
+
+
+def _operand_shape(text: str | None) -> str:
+    if text is None:
+        return "missing"
+    value = Decimal(text)
+    if value.is_zero():
+        return "zero"
+    shape = "neg-" if value < 0 else ""
+    digits = text.lstrip("-")
+    if len(digits) > 1 and digits[0] == "0" and digits[1] != ".":
+        shape += "leading-zero-"
+    if digits.endswith("."):
+        shape += "trailing-dot-"
+    if abs(value) >= 10**8:
+        return f"{shape}large"
+    return f"{shape}{'int' if value == value.to_integral_value() else 'decimal'}"
+
+
+def _deviation(expected: str, actual: str) -> str:
+    if expected.startswith("Error") or actual.startswith("Error"):
+        return "error-expected" if expected.startswith("Error") else "unexpected-error"
+    try:
+        expected_value, actual_value = Decimal(expected), Decimal(actual)
+    except InvalidOperation:
+        return "unparsable"
+    if expected_value == actual_value:
+        return "format"
+    if abs(expected_value - actual_value) <= abs(expected_value) * Decimal("1e-9"):
+        return "precision"
+    return "wrong-value"
+
+
+def signature(mismatch: Mismatch) -> tuple[str, str, str, str]:
+    """
+    Describe the pattern of a mismatch, used to cluster similar failures.
+
+    :param mismatch: The mismatch to describe.
+    :type mismatch: Mismatch
+    :returns: ``(operation, first operand shape, second operand shape, deviation kind)``.
+    :rtype: tuple[str, str, str, str]
+    """
+    case = mismatch.case
+    return (
+        case.operation,
+        _operand_shape(case.input1),
+        _operand_shape(case.input2),
+        _deviation(mismatch.expected, mismatch.actual),
+    )
+
+
+def cluster_mismatches(
+    mismatches: Iterable[Mismatch],
+) -> dict[tuple[str, str, str, str], list[Mismatch]]:
+    """
+    Group mismatches by their :func:`signature`, largest cluster first.
+
+    :param mismatches: The mismatches to group.
+    :type mismatches: Iterable[Mismatch]
+    :returns: Mapping of signatures to their mismatches.
+    :rtype: dict[tuple[str, str, str, str], list[Mismatch]]
+    """
+    clusters: dict[tuple[str, str, str, str], list[Mismatch]] = defaultdict(list)
+    for mismatch in mismatches:
+        clusters[signature(mismatch)].append(mismatch)
+    return dict(sorted(clusters.items(), key=lambda item: -len(item[1])))
+
+
+class DifferentialRunner:
+    """
+    Stream generated cases through a calculator and compare them with the oracle.
+
+    The ``run_case`` callable receives ``(operation, input1, input2)``, so
+    :meth:`Calculator.perform_calculation` can be passed directly, as can any fake device.
+    """
+
+    def __init__(
+        self,
+        run_case: Callable[[str, str | None, str | None], str],
+        batch_size: int = 100,
+    ) -> None:
+        """
+        Initialize the differential runner.
+
+        :param run_case: Callable performing one calculation and returning the displayed result.
+        :type run_case: Callable[[str, str or None, str or None], str]
+        :param batch_size: Number of cases evaluated by the oracle at once.
+        :type batch_size: int, optional
+        """
+        self.run_case = run_case
+        self.batch_size = batch_size
+        self.executed = 0
+
+    def run(self, cases: Iterable[Case]) -> Iterator[Mismatch]:
+        """
+        Execute the cases batch by batch, yielding every mismatch as soon as it is found.
+
+        :param cases: The cases to execute.
+        :type cases: Iterable[Case]
+        :returns: Iterator over the mismatches.
+        :rtype: Iterator[Mismatch]
+        """
+        batch: list[Case] = []
+        for case in cases:
+            batch.append(case)
+            if len(batch) == self.batch_size:
+                yield from self._run_batch(batch)
+                batch = []
+        if batch:
+            yield from self._run_batch(batch)
+
+    def _run_batch(self, batch: list[Case]) -> Iterator[Mismatch]:
+        for case, expected in zip(batch, expected_results(batch)):
+            actual = self.run_case(case.operation, case.input1, case.input2)
+            self.executed += 1
+            if actual != expected:
+                LOGGER.debug(
+                    f"Mismatch for {case}: expected {expected!r}, got {actual!r}"
+                )
+                yield Mismatch(case, expected, actual)
+
+
+def format_report(
+    clusters: dict[tuple[str, str, str, str], list[Mismatch]], executed: int
+) -> str:
+    """
+    Render clustered mismatches as a human-readable summary with one example per cluster.
+
+    :param clusters: Output of :func:`cluster_mismatches`.
+    :type clusters: dict[tuple[str, str, str, str], list[Mismatch]]
+    :param executed: Total number of executed cases.
+    :type executed: int
+    :returns: The report text.
+    :rtype: str
+    """
+    total = sum(len(mismatches) for mismatches in clusters.values())
+    lines = [f"{total} mismatches in {executed} cases, {len(clusters)} clusters"]
+    for (operation, shape1, shape2, deviation), mismatches in clusters.items():
+        example = mismatches[0]
+        lines.append(
+            f"{len(mismatches):6d}  {shape1} {operation} {shape2} -> {deviation}: "
+            f"{example.case.input1} {operation} {example.case.input2} "
+            f"expected {example.expected!r}, got {example.actual!r}"
+        )
+    return "\n".join(lines)
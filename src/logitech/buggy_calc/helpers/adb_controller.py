@@ -1,9 +1,18 @@
 from __future__ import annotations
 
+import shlex
 import subprocess
+import time
 from pathlib import Path
+from typing import TYPE_CHECKING
 
+from ... import metrics
 from ...logger import configure_logger
+from .exceptions import DeadlineExceededError
+from .timeouts import CircuitBreaker, LatencyTracker, command_type, remaining_time
+
+if TYPE_CHECKING:
+    from .dump_archive import DumpArchive
 
 LOGGER = configure_logger("adb_controller")
 
@@ -11,36 +20,166 @@ LOGGER = configure_logger("adb_controller")
 class ADBController:
     """Controller class for ADB operations and device communication."""
 
-    @staticmethod
+    def __init__(
+        self,
+        dump_archive: DumpArchive | None = None,
+        latency: LatencyTracker | None = None,
+        breaker: CircuitBreaker | None = None,
+    ) -> None:
+        """
+        Initialize the ADB controller.
+
+        :param dump_archive: Archive storing every retrieved UI dump, or None to disable archiving.
+        :type dump_archive: DumpArchive or None, optional
+        :param latency: Tracker learning per-command-type timeouts. Defaults to a new one.
+        :type latency: LatencyTracker or None, optional
+        :param breaker: Circuit breaker rejecting commands to an unresponsive device.
+                        Defaults to a new one.
+        :type breaker: CircuitBreaker or None, optional
+        """
+        self.dump_archive = dump_archive
+        self.latency = latency or LatencyTracker()
+        self.breaker = breaker or CircuitBreaker()
+
     def execute_command(
-        command: list[str], capture_output: bool = True
+        self, command: list[str], capture_output: bool = True
     ) -> subprocess.CompletedProcess:
         """
         Execute a shell command using subprocess.
 
+        The timeout is learned from earlier latencies of the same command type (30 s until
+        then) and shortened to the current deadline, see :func:`timeouts.deadline`.
+
         :param command: List of command arguments to execute.
         :type command: list[str]
         :param capture_output: Whether to capture the command's output. Defaults to True.
         :type capture_output: bool, optional
         :returns: The completed process object containing execution results.
         :rtype: subprocess.CompletedProcess
+        :raises DeadlineExceededError: If the command cannot finish before the deadline.
+        :raises DeviceUnavailableError: If the device stopped responding to earlier commands.
         :raises RuntimeError: If the command times out or fails to execute.
         """
+        self.breaker.check()
+        kind = command_type(command)
+        timeout = self.latency.timeout_for(kind)
+        remaining = remaining_time()
+        limited_by_deadline = remaining is not None and remaining < timeout
+        if limited_by_deadline:
+            if remaining <= 0:
+                raise DeadlineExceededError(
+                    f"Deadline exceeded before: {' '.join(command)}"
+                )
+            timeout = remaining
+
+        started = time.monotonic()
         try:
             LOGGER.debug(f"Executing command: {command}")
-            result = subprocess.run(
-                command,
-                capture_output=capture_output,
-                text=True,
-                check=True,
-                timeout=30,
-            )
-            LOGGER.debug("Finished succesfully")
-            return result
+            result = self._run(command, capture_output, timeout)
         except subprocess.TimeoutExpired:
-            raise RuntimeError(f"Command timed out: {' '.join(command)}")
+            metrics.ADB_COMMANDS.inc(1, kind, "timeout")
+            if limited_by_deadline:
+                raise DeadlineExceededError(f"Deadline exceeded: {' '.join(command)}")
+            self.breaker.record_timeout()
+            raise RuntimeError(
+                f"Command timed out after {timeout:.1f}s: {' '.join(command)}"
+            )
         except subprocess.CalledProcessError as e:
+            # The device answered, so the latency is still representative
+            self._record_latency(kind, started, "failed")
             raise RuntimeError(f"ADB command failed: {e}")
+        self._record_latency(kind, started, "ok")
+        LOGGER.debug("Finished succesfully")
+        return result
+
+    def _run(
+        self, command: list[str], capture_output: bool, timeout: float
+    ) -> subprocess.CompletedProcess:
+        """Transport of :meth:`execute_command`, replaced when recording or replaying a trace."""
+        return subprocess.run(
+            command,
+            capture_output=capture_output,
+            text=True,
+            check=True,
+            timeout=timeout,
+        )
+
+    def _record_latency(self, kind: str, started: float, outcome: str) -> None:
+        duration = time.monotonic() - started
+        self.latency.record(kind, duration)
+        self.breaker.record_success()
+        metrics.ADB_COMMANDS.inc(1, kind, outcome)
+        metrics.ADB_COMMAND_SECONDS.observe(duration, kind)
+
+    @staticmethod
+    def start_process(command: list[str]) -> subprocess.Popen:
+        """
+        Start a long-running shell command whose output is streamed line by line.
+
+        :param command: List of command arguments to execute.
+        :type command: list[str]
+        :returns: The started process with a text-mode ``stdout`` pipe.
+        :rtype: subprocess.Popen
+        """
+        LOGGER.debug(f"Starting process: {command}")
+        return subprocess.Popen(
+            command,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+            errors="replace",
+        )
+
+    def get_devices(self) -> list[str]:
+        """
+        List serial numbers of connected and authorized Android devices.
+
+        :returns: Serial numbers of devices in the ``device`` state.
+        :rtype: list[str]
+        :raises RuntimeError: If the ADB command fails or times out.
+        """
+        result = self.execute_command(["adb", "devices"])
+        devices = []
+        for line in result.stdout.splitlines()[1:]:
+            fields = line.split()
+            if len(fields) == 2 and fields[1] == "device":
+                devices.append(fields[0])
+        return devices
+
+    def get_package_details(self, app_name: str) -> str:
+        """
+        Retrieve ``dumpsys package`` information of an Android application.
+
+        :param app_name: The package name of the application.
+        :type app_name: str
+        :returns: The raw ``dumpsys package`` output.
+        :rtype: str
+        :raises RuntimeError: If the ADB command fails or times out.
+        """
+        result = self.execute_command(["adb", "shell", "dumpsys", "package", app_name])
+        return result.stdout
+
+    def get_apk_sha256(self, app_name: str) -> str:
+        """
+        Compute the SHA-256 of the installed base APK of an Android application.
+
+        :param app_name: The package name of the application.
+        :type app_name: str
+        :returns: Hex digest of the APK.
+        :rtype: str
+        :raises RuntimeError: If the ADB command fails or times out.
+        :raises ValueError: If the application is not installed.
+        """
+        result = self.execute_command(["adb", "shell", "pm", "path", app_name])
+        apk_paths = [
+            line.removeprefix("package:")
+            for line in result.stdout.split()
+            if line.startswith("package:")
+        ]
+        if not apk_paths:
+            raise ValueError(f"Package '{app_name}' is not installed")
+        result = self.execute_command(["adb", "shell", "sha256sum", apk_paths[0]])
+        return result.stdout.split()[0]
 
     def launch_app(self, app_name: str, activity_name: str) -> None:
         """
@@ -64,6 +203,44 @@ class ADBController:
             capture_output=False,
         )
 
+    def restart_activity(self, app_name: str, activity_name: str) -> None:
+        """
+        Start an activity in a freshly cleared task and wait until it is displayed.
+
+        :param app_name: The package name of the application.
+        :type app_name: str
+        :param activity_name: The name of the activity to start within the application.
+        :type activity_name: str
+        :returns: None
+        """
+        self.execute_command(
+            [
+                "adb",
+                "shell",
+                "am",
+                "start",
+                "-W",
+                "--activity-clear-task",
+                "--activity-new-task",
+                "-n",
+                f"{app_name}/{activity_name}",
+            ],
+            capture_output=False,
+        )
+
+    def clear_app_data(self, app_name: str) -> None:
+        """
+        Stop an Android application and wipe all of its data.
+
+        :param app_name: The package name of the application.
+        :type app_name: str
+        :returns: None
+        """
+        self.execute_command(
+            ["adb", "shell", "pm", "clear", app_name],
+            capture_output=False,
+        )
+
     def close_app(self, app_name: str) -> None:
         """
         Close an Android application by its package name.
@@ -77,6 +254,22 @@ class ADBController:
             capture_output=False,
         )
 
+    def get_app_pid(self, app_name: str) -> int | None:
+        """
+        Get the process id of a running Android application.
+
+        :param app_name: The package name of the application.
+        :type app_name: str
+        :returns: The process id, or None if the application is not running.
+        :rtype: int | None
+        """
+        try:
+            result = self.execute_command(["adb", "shell", "pidof", app_name])
+        except RuntimeError:
+            return None
+        pids = result.stdout.split()
+        return int(pids[0]) if pids else None
+
     def get_ui_dump(self) -> str:
         """
         Retrieve the current UI hierarchy dump from the connected Android device.
@@ -88,6 +281,11 @@ class ADBController:
         result = self.execute_command(
             ["adb", "exec-out", "uiautomator", "dump", "/dev/tty"]
         )
+        if metrics.enabled():
+            metrics.UI_DUMP_BYTES.observe(len(result.stdout.encode()))
+        if self.dump_archive is not None:
+            step = self.dump_archive.append(result.stdout)
+            LOGGER.debug(f"UI dump archived as step {step}")
         return result.stdout
 
     def tap_coordinates(self, x: int, y: int) -> None:
@@ -126,6 +324,38 @@ class ADBController:
             ["adb", "shell", "input", "keyevent", "67"], capture_output=False
         )
 
+    def run_batch(self, commands: list[list[str]]) -> None:
+        """
+        Run several device shell commands in a single ADB round-trip.
+
+        The commands are chained with ``&&`` inside one ``adb shell`` invocation, so the
+        batch stops at the first failing command.
+
+        :param commands: Device-side commands, each given as a list of arguments
+                         (e.g. ``["input", "tap", "10", "20"]``).
+        :type commands: list[list[str]]
+        :returns: None
+        """
+        if not commands:
+            return
+        self.execute_command(
+            ["adb", "shell", " && ".join(shlex.join(command) for command in commands)],
+            capture_output=False,
+        )
+
+    def get_sdk_version(self) -> int:
+        """
+        Retrieve the Android API level of the connected device.
+
+        :returns: The SDK version reported by ``ro.build.version.sdk``.
+        :rtype: int
+        :raises RuntimeError: If the ADB command fails or times out.
+        """
+        result = self.execute_command(
+            ["adb", "shell", "getprop", "ro.build.version.sdk"]
+        )
+        return int(result.stdout.strip())
+
     def take_screenshot(self, screenshot_name: str) -> None:
         """
         Captures a screenshot on the connected Android device.
@@ -177,3 +407,46 @@ class ADBController:
             ["adb", "shell", "rm", f"/sdcard/{screenshot_name}.png"],
             capture_output=False,
         )
+
+    def pull_file(self, device_path: str, local_path: Path) -> None:
+        """
+        Pull any file from the connected Android device to the local machine.
+
+        :param device_path: Absolute path of the file on the device.
+        :type device_path: str
+        :param local_path: Destination path on the local machine.
+        :type local_path: pathlib.Path
+        :returns: None
+        """
+        self.execute_command(
+            ["adb", "pull", device_path, str(local_path)], capture_output=False
+        )
+
+    def remove_file(self, device_path: str) -> None:
+        """
+        Delete a file from the connected Android device.
+
+        :param device_path: Absolute path of the file on the device.
+        :type device_path: str
+        :returns: None
+        """
+        self.execute_command(
+            ["adb", "shell", "rm", "-f", device_path], capture_output=False
+        )
+
+    def interrupt_process(self, process_name: str) -> None:
+        """
+        Send SIGINT to a device process, e.g. to make ``screenrecord`` finish its file early.
+
+        A missing process is not an error.
+
+        :param process_name: Name of the process on the device.
+        :type process_name: str
+        :returns: None
+        """
+        try:
+            self.execute_command(
+                ["adb", "shell", "pkill", "-INT", process_name], capture_output=False
+            )
+        except RuntimeError as e:
+            LOGGER.debug(f"No {process_name} process interrupted: {e}")
@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+
+# Android key codes used by the clearing strategies
+KEYCODE_A = "29"
+KEYCODE_DEL = "67"
+KEYCODE_MOVE_END = "123"
+KEYCODE_CTRL_LEFT = "113"
+
+
+class ClearStrategy(ABC):
+    """
+    Base class for input field clearing mechanisms.
+
+    A strategy translates "clear the field centered at (x, y)" into device shell commands
+    that are sent as a single batch via :meth:`ADBController.run_batch`.
+    """
+
+    name = "base"
+    min_sdk = 0
+    needs_length = True
+
+    def is_available(self, sdk_version: int) -> bool:
+        """
+        Check whether the strategy is supported by the device.
+
+        :param sdk_version: Android API level of the connected device.
+        :type sdk_version: int
+        :returns: True if the device supports the strategy.
+        :rtype: bool
+        """
+        return sdk_version >= self.min_sdk
+
+    @abstractmethod
+    def commands(self, x: int, y: int, length: int) -> list[list[str]]:
+        """
+        Build the device shell commands clearing the field.
+
+        :param x: The x-coordinate of the field center.
+        :type x: int
+        :param y: The y-coordinate of the field center.
+        :type y: int
+        :param length: Number of characters currently in the field.
+        :type length: int
+        :returns: Device-side commands to run as one batch.
+        :rtype: list[list[str]]
+        """
+
+
+class SelectAllClear(ClearStrategy):
+    """Focus the field, select its whole content with CTRL+A and delete it (Android 13+)."""
+
+    name = "select_all"
+    min_sdk = 33
+    needs_length = False
+
+    def commands(self, x: int, y: int, length: int) -> list[list[str]]:
+        return [
+            ["input", "tap", str(x), str(y)],
+            ["input", "keycombination", KEYCODE_CTRL_LEFT, KEYCODE_A],
+            ["input", "keyevent", KEYCODE_DEL],
+        ]
+
+
+class KeyeventClear(ClearStrategy):
+    """Focus the field, move the cursor to the end and send all deletes in one keyevent call."""
+
+    name = "keyevent"
+
+    def commands(self, x: int, y: int, length: int) -> list[list[str]]:
+        return [
+            ["input", "tap", str(x), str(y)],
+            ["input", "keyevent", KEYCODE_MOVE_END],
+            ["input", "keyevent", *[KEYCODE_DEL] * length],
+        ]
+
+
+# Ordered from the fastest to the most widely supported mechanism
+CLEAR_STRATEGIES: tuple[ClearStrategy, ...] = (SelectAllClear(), KeyeventClear())
+
+
+def available_strategies(
+    sdk_version: int, excluded: set[str] | frozenset[str] = frozenset()
+) -> list[ClearStrategy]:
+    """
+    Get the clearing strategies usable on a device, fastest first.
+
+    :param sdk_version: Android API level of the connected device.
+    :type sdk_version: int
+    :param excluded: Names of strategies to skip (e.g., ones that failed verification).
+    :type excluded: set[str]
+    :returns: The usable strategies ordered by preference.
+    :rtype: list[ClearStrategy]
+    """
+    return [
+        strategy
+        for strategy in CLEAR_STRATEGIES
+        if strategy.name not in excluded and strategy.is_available(sdk_version)
+    ]
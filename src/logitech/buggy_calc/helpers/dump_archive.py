@@ -0,0 +1,176 @@
+from __future__ import annotations
+
+import hashlib
+import mmap
+import struct
+import sys
+import threading
+import time
+import zlib
+from datetime import datetime
+from pathlib import Path
+
+from ...logger import LOG_DIR, configure_logger
+
+LOGGER = configure_logger("dump_archive")
+
+BLOBS_FILE = "dumps.bin"
+INDEX_FILE = "index.bin"
+
+# timestamp, blob offset, compressed blob length, blake2b digest of the dump
+INDEX_RECORD = struct.Struct("<dQI16s")
+
+
+class DumpArchive:
+    """
+    Append-only, per-run archive of UI hierarchy dumps.
+
+    Each dump is stored once (deduplicated by content digest) as a zlib-compressed blob in
+    ``dumps.bin``. Every archived step appends a fixed-size record to ``index.bin``, so any
+    step can later be located with a single seek, see :class:`DumpArchiveReader`.
+    """
+
+    def __init__(self, directory: Path) -> None:
+        """
+        Open (or create) an archive for writing.
+
+        :param directory: Directory holding the archive files.
+        :type directory: pathlib.Path
+        """
+        self.directory = directory
+        directory.mkdir(parents=True, exist_ok=True)
+        self._blobs = open(directory / BLOBS_FILE, "ab")
+        self._index = open(directory / INDEX_FILE, "ab")
+        self._known: dict[bytes, tuple[int, int]] = {}
+        self._steps = self._index.tell() // INDEX_RECORD.size
+        self._lock = threading.Lock()
+
+    @classmethod
+    def for_run(cls) -> DumpArchive:
+        """
+        Create an archive for the current run under ``logs/archive/<YYYYMMDD_HHMMSS>``.
+
+        :returns: The new archive.
+        :rtype: DumpArchive
+        """
+        run_id = datetime.now().strftime("%Y%m%d_%H%M%S")
+        return cls(LOG_DIR / "archive" / run_id)
+
+    def append(self, ui_dump: str, timestamp: float | None = None) -> int:
+        """
+        Archive a UI dump as the next step.
+
+        :param ui_dump: The UI hierarchy XML.
+        :type ui_dump: str
+        :param timestamp: Capture time, defaults to now.
+        :type timestamp: float or None, optional
+        :returns: Step number of the archived dump.
+        :rtype: int
+        """
+        data = ui_dump.encode()
+        digest = hashlib.blake2b(data, digest_size=16).digest()
+        with self._lock:
+            if digest not in self._known:
+                blob = zlib.compress(data, 6)
+                offset = self._blobs.tell()
+                self._blobs.write(blob)
+                self._blobs.flush()
+                self._known[digest] = (offset, len(blob))
+            offset, length = self._known[digest]
+            self._index.write(
+                INDEX_RECORD.pack(
+                    time.time() if timestamp is None else timestamp,
+                    offset,
+                    length,
+                    digest,
+                )
+            )
+            self._index.flush()
+            step = self._steps
+            self._steps += 1
+        return step
+
+    def close(self) -> None:
+        """
+        Close the archive files.
+
+        :returns: None
+        """
+        self._blobs.close()
+        self._index.close()
+
+
+class DumpArchiveReader:
+    """Random-access reader of a :class:`DumpArchive` backed by memory-mapped files."""
+
+    def __init__(self, directory: Path) -> None:
+        """
+        Open an archive for reading.
+
+        :param directory: Directory holding the archive files.
+        :type directory: pathlib.Path
+        """
+        self._files = []
+        self._maps = []
+        for name in (BLOBS_FILE, INDEX_FILE):
+            file = open(directory / name, "rb")
+            self._files.append(file)
+            size = (directory / name).stat().st_size
+            self._maps.append(
+                mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+            )
+        self._blobs, self._index = self._maps
+
+    def __enter__(self) -> DumpArchiveReader:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self._index) // INDEX_RECORD.size
+
+    def record(self, step: int) -> tuple[float, int, int, bytes]:
+        """
+        Get the index record of a step.
+
+        :param step: Step number.
+        :type step: int
+        :returns: ``(timestamp, blob offset, blob length, digest)``.
+        :rtype: tuple[float, int, int, bytes]
+        :raises IndexError: If the step is not archived.
+        """
+        if not 0 <= step < len(self):
+            raise IndexError(f"Step {step} not in archive of {len(self)} steps")
+        return INDEX_RECORD.unpack_from(self._index, step * INDEX_RECORD.size)
+
+    def __getitem__(self, step: int) -> str:
+        """
+        Load the UI dump of a step, decompressing only its blob.
+
+        :param step: Step number.
+        :type step: int
+        :returns: The UI hierarchy XML.
+        :rtype: str
+        :raises IndexError: If the step is not archived.
+        """
+        _, offset, length, _ = self.record(step)
+        return zlib.decompress(self._blobs[offset : offset + length]).decode()
+
+    def close(self) -> None:
+        """
+        Unmap and close the archive files.
+
+        :returns: None
+        """
+        for archive_map in self._maps:
+            if isinstance(archive_map, mmap.mmap):
+                archive_map.close()
+        for file in self._files:
+            file.close()
+
+
+if __name__ == "__main__":
+    # Usage: python -m logitech.buggy_calc.helpers.dump_archive <archive-dir> <step>
+    with DumpArchiveReader(Path(sys.argv[1])) as reader:
+        print(reader[int(sys.argv[2])])
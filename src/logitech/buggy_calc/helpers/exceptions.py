@@ -4,3 +4,27 @@ class ResultNotFoundError(Exception):
 
 class InvalidAppFieldError(Exception):
     """Raised when an invalid app field is referenced."""
+
+
+class FieldNotClearedError(Exception):
+    """Raised when no clearing strategy managed to empty an input field."""
+
+
+class ResultTimeoutError(ResultNotFoundError):
+    """Raised when a displayed value does not settle or match before the timeout."""
+
+    def __init__(self, message: str, last_value: str | None = None):
+        super().__init__(message)
+        self.last_value = last_value
+
+
+class DeadlineExceededError(RuntimeError):
+    """Raised when an ADB command cannot finish within the current test deadline."""
+
+
+class DeviceUnavailableError(RuntimeError):
+    """Raised without contacting the device while the circuit breaker considers it unhealthy."""
+
+
+class TraceMismatchError(RuntimeError):
+    """Raised when a replayed run issues ADB commands other than, or more often than, recorded."""
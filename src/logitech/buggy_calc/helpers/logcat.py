@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+import re
+import threading
+from collections import deque
+from pathlib import Path
+
+from ...logger import configure_logger
+from .adb_controller import ADBController
+
+LOGGER = configure_logger("logcat")
+
+# "MM-DD HH:MM:SS.mmm  PID  TID LEVEL TAG: message" as printed by `logcat -v threadtime`
+THREADTIME_PATTERN = re.compile(
+    r"^\d{2}-\d{2} \d{2}:\d{2}:\d{2}\.\d{3}\s+(?P<pid>\d+)\s+\d+\s+[VDIWEFS]\s"
+)
+
+
+class LogcatCollector:
+    """
+    Background collector streaming ``adb logcat -v threadtime`` into a bounded ring buffer.
+
+    Only lines emitted by the application's process(es) are kept. Every kept line gets a
+    sequence number, so callers can :meth:`mark` the start of a test or scenario and later
+    fetch just the lines emitted since then.
+    """
+
+    def __init__(
+        self,
+        package_name: str,
+        adb: ADBController | None = None,
+        capacity: int = 10000,
+    ) -> None:
+        """
+        Initialize the logcat collector.
+
+        :param package_name: The package name of the application to collect logs for.
+        :type package_name: str
+        :param adb: Controller used to talk to the device. Defaults to a new one.
+        :type adb: ADBController or None, optional
+        :param capacity: Maximum number of log lines kept in memory.
+        :type capacity: int, optional
+        """
+        self.package_name = package_name
+        self.adb = adb or ADBController()
+        self._buffer: deque[tuple[int, str]] = deque(maxlen=capacity)
+        self._pids: set[str] = set()
+        self._seq = 0
+        self._lock = threading.Lock()
+        self._process = None
+        self._thread: threading.Thread | None = None
+
+    @property
+    def running(self) -> bool:
+        """Whether the logcat stream is being collected."""
+        return self._thread is not None and self._thread.is_alive()
+
+    def refresh_pid(self) -> None:
+        """
+        Start tracking the current process id of the application.
+
+        Ids of earlier processes stay tracked, so lines of a restarted app are kept too.
+
+        :returns: None
+        """
+        pid = self.adb.get_app_pid(self.package_name)
+        if pid is not None:
+            self._pids.add(str(pid))
+
+    def start(self) -> None:
+        """
+        Start streaming logcat in a background thread.
+
+        Only lines logged from now on are collected.
+
+        :returns: None
+        """
+        if self.running:
+            return
+        self.refresh_pid()
+        LOGGER.debug(f"Starting logcat collector for {self.package_name}")
+        self._process = self.adb.start_process(
+            ["adb", "logcat", "-v", "threadtime", "-T", "1"]
+        )
+        self._thread = threading.Thread(
+            target=self._read, name="logcat-collector", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """
+        Stop streaming logcat and wait for the reader thread to finish.
+
+        :returns: None
+        """
+        if self._process is not None:
+            LOGGER.debug("Stopping logcat collector")
+            self._process.terminate()
+            self._process.wait()
+            self._process = None
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _read(self) -> None:
+        for line in self._process.stdout:
+            self.feed(line.rstrip("\n"))
+
+    def feed(self, line: str) -> None:
+        """
+        Add a raw logcat line to the buffer if it belongs to the application.
+
+        :param line: A single line in ``threadtime`` format.
+        :type line: str
+        :returns: None
+        """
+        match = THREADTIME_PATTERN.match(line)
+        if not match or match.group("pid") not in self._pids:
+            return
+        with self._lock:
+            self._seq += 1
+            self._buffer.append((self._seq, line))
+
+    def mark(self) -> int:
+        """
+        Mark the current position of the stream, e.g. at the start of a test.
+
+        :returns: Sequence number to pass to :meth:`lines_since`.
+        :rtype: int
+        """
+        try:
+            self.refresh_pid()
+        except RuntimeError as e:
+            LOGGER.warning(f"Unable to refresh app pid: {e}")
+        with self._lock:
+            return self._seq
+
+    def lines_since(self, mark: int) -> list[str]:
+        """
+        Get the application's log lines collected after a mark.
+
+        :param mark: Sequence number returned by :meth:`mark`.
+        :type mark: int
+        :returns: Log lines in arrival order. Lines already evicted from the ring buffer are missing.
+        :rtype: list[str]
+        """
+        with self._lock:
+            return [line for seq, line in self._buffer if seq > mark]
+
+    def save_since(self, mark: int, name: str, log_dir: Path) -> Path:
+        """
+        Write the application's log lines collected after a mark to a file.
+
+        :param mark: Sequence number returned by :meth:`mark`.
+        :type mark: int
+        :param name: Name of the test or scenario, used as the file name.
+        :type name: str
+        :param log_dir: Directory the log slice is written to.
+        :type log_dir: pathlib.Path
+        :returns: Path of the written file.
+        :rtype: pathlib.Path
+        """
+        log_dir.mkdir(parents=True, exist_ok=True)
+        file_name = re.sub(r"[^\w.-]+", "_", name)
+        log_file = log_dir / f"{file_name}.log"
+        lines = self.lines_since(mark)
+        log_file.write_text("".join(f"{line}\n" for line in lines))
+        LOGGER.debug(f"Saved {len(lines)} logcat lines to: {log_file}")
+        return log_file
@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import re
 
+from ... import metrics
 from ...logger import configure_logger
 from .exceptions import InvalidAppFieldError, ResultNotFoundError
 
@@ -24,6 +25,7 @@ class UIParser:
     def __init__(self, package_name: str):
         self.package_name = package_name
 
+    @metrics.timed(metrics.UI_PARSE_SECONDS, "element_bounds")
     def parse_element_bounds(
         self, xml_dump: str, text: str
     ) -> tuple[int, int, int, int] | None:
@@ -38,13 +40,20 @@ class UIParser:
         :rtype: tuple[int, int, int, int] | None
         :raises InvalidAppFieldError: If the provided text does not correspond to a valid app field.
         """
+        return self._element_bounds(xml_dump, text)
+
+    def _element_bounds(
+        self, xml_dump: str, text: str
+    ) -> tuple[int, int, int, int] | None:
+        # Undecorated, so parse_all_bounds is timed once rather than once per field as well
         if text not in self._APP_FIELDS:
             raise InvalidAppFieldError(
                 f"Invalid app field: '{text}'. Valid fields are: {list(self._APP_FIELDS.keys())}"
             )
         field_name = self._APP_FIELDS[text]
         LOGGER.debug(f"Starting element parse operation for: {field_name}")
-        LOGGER.debug(f"Processing XML content: {xml_dump}")
+        # Log the size only, records holding whole dumps kept them alive (e.g. in caplog)
+        LOGGER.debug(f"Processing XML content ({len(xml_dump)} chars)")
         pattern = rf'resource-id="{self.package_name}:id/{field_name}".*?bounds="\[(\d+),(\d+)\]\[(\d+),(\d+)\]"'
         LOGGER.debug(f"Searching for pattern: '{pattern}'")
 
@@ -58,6 +67,25 @@ class UIParser:
             )
         return None
 
+    @metrics.timed(metrics.UI_PARSE_SECONDS, "all_bounds")
+    def parse_all_bounds(self, xml_dump: str) -> dict[str, tuple[int, int, int, int]]:
+        """
+        Parse the bounds of every known app field from a single UIAutomator XML dump.
+
+        :param xml_dump: The XML dump string obtained from the Android device UI.
+        :type xml_dump: str
+        :returns: Mapping of symbolic field names to their bounds (x1, y1, x2, y2).
+                  Fields missing from the dump are omitted.
+        :rtype: dict[str, tuple[int, int, int, int]]
+        """
+        all_bounds = {}
+        for text in self._APP_FIELDS:
+            bounds = self._element_bounds(xml_dump, text)
+            if bounds:
+                all_bounds[text] = bounds
+        return all_bounds
+
+    @metrics.timed(metrics.UI_PARSE_SECONDS, "result_text")
     def parse_result_text(self, xml_dump: str, text: str = "=") -> str:
         """
         Parse the bounds of a UI element from a UIAutomator XML dump.
@@ -78,7 +106,8 @@ class UIParser:
             )
         field_name = self._APP_FIELDS[text]
         LOGGER.debug(f"Starting result parse operation for: {field_name}")
-        LOGGER.debug(f"Processing XML content: {xml_dump}")
+        # Log the size only, records holding whole dumps kept them alive (e.g. in caplog)
+        LOGGER.debug(f"Processing XML content ({len(xml_dump)} chars)")
         pattern = rf'text="([^"]*)" resource-id="{self.package_name}:id/{field_name}"'
         LOGGER.debug(f"Searching for pattern: '{pattern}'")
 
@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+
+from ...logger import configure_logger
+
+LOGGER = configure_logger("planner")
+
+INPUT_FIELDS = ("first_number", "second_number")
+OPERATIONS = ("+", "-", "*", "/")
+
+
+@dataclass(frozen=True)
+class Action:
+    """
+    Single device-level action of an :class:`ActionPlan`.
+
+    :param kind: Type of the action: ``"clear"``, ``"input"`` or ``"tap"``.
+    :type kind: str
+    :param field: Symbolic name of the UI element the action targets.
+    :type field: str
+    :param value: Text to type for ``"input"`` actions, otherwise None.
+    :type value: str or None
+    """
+
+    kind: str
+    field: str
+    value: str | None = None
+
+
+@dataclass
+class ActionPlan:
+    """
+    Compiled, batched sequence of actions for one calculation.
+
+    Every stage of the plan costs exactly one ADB round-trip:
+
+    * ``refresh`` - a single UI dump used to learn element bounds and field texts,
+    * ``batch`` - all clears, inputs and taps sent as one shell invocation,
+    * ``read`` - a single UI dump to read the displayed result.
+    """
+
+    refresh: bool = False
+    batch: list[Action] = field(default_factory=list)
+    read: str | None = "="
+    expected_state: dict[str, str] = field(default_factory=dict)
+
+    @property
+    def round_trips(self) -> int:
+        """
+        Number of ADB round-trips needed to execute the plan.
+
+        :returns: Count of executed stages.
+        :rtype: int
+        """
+        return int(self.refresh) + int(bool(self.batch)) + int(self.read is not None)
+
+
+class CalculationPlanner:
+    """Compiler turning a ``(input1, operation, input2)`` calculation into an :class:`ActionPlan`."""
+
+    def compile(
+        self,
+        operation: str,
+        input1: str | None,
+        input2: str | None,
+        field_state: dict[str, str | None],
+        known_bounds: set[str] | frozenset[str] = frozenset(),
+    ) -> ActionPlan:
+        """
+        Compile a calculation into a minimal action plan.
+
+        Clears are skipped for fields known to be empty, and both the clear and the input
+        are skipped when a field already holds the requested value. A refresh stage is
+        only emitted when a field state or an element bound is not known yet.
+
+        :param operation: The symbolic name of the operation button (e.g., "+", "-", "*", "/").
+        :type operation: str
+        :param input1: The value for the first input field, or None to leave it empty.
+        :type input1: str or None
+        :param input2: The value for the second input field, or None to leave it empty.
+        :type input2: str or None
+        :param field_state: Known text per input field, "" for empty, None when unknown.
+        :type field_state: dict[str, str or None]
+        :param known_bounds: Names of the elements whose bounds are already cached.
+        :type known_bounds: set[str]
+        :returns: The compiled action plan.
+        :rtype: ActionPlan
+        :raises ValueError: If the operation is not supported.
+        """
+        if operation not in OPERATIONS:
+            raise ValueError(
+                f"Invalid operation: '{operation}'. Valid operations are: {list(OPERATIONS)}"
+            )
+
+        desired = {
+            field_name: "" if value is None else str(value)
+            for field_name, value in zip(INPUT_FIELDS, (input1, input2))
+        }
+        plan = ActionPlan(expected_state=desired)
+
+        for field_name in INPUT_FIELDS:
+            current = field_state.get(field_name)
+            if current is None:
+                plan.refresh = True
+            if current == desired[field_name]:
+                continue
+            if current != "":
+                plan.batch.append(Action("clear", field_name))
+            if desired[field_name]:
+                plan.batch.append(Action("input", field_name, desired[field_name]))
+        plan.batch.append(Action("tap", operation))
+
+        if not {action.field for action in plan.batch} <= set(known_bounds):
+            plan.refresh = True
+
+        LOGGER.debug(f"Compiled plan ({plan.round_trips} round-trips): {plan}")
+        return plan
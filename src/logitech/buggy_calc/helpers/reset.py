@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+import time
+from abc import ABC, abstractmethod
+from typing import TYPE_CHECKING
+
+from ...logger import configure_logger
+
+if TYPE_CHECKING:
+    from ..pages.calculator import Calculator
+
+LOGGER = configure_logger("reset")
+
+
+class ResetStrategy(ABC):
+    """Base class for mechanisms bringing the calculator back to its initial state."""
+
+    name = "base"
+
+    @abstractmethod
+    def run(self, calculator: Calculator) -> None:
+        """
+        Reset the calculator application.
+
+        :param calculator: The calculator page object to reset.
+        :type calculator: Calculator
+        :returns: None
+        """
+
+
+class ClearInputsReset(ResetStrategy):
+    """Empty both input fields in-app; free when the fields are already known to be empty."""
+
+    name = "clear_inputs"
+
+    def run(self, calculator: Calculator) -> None:
+        calculator.clear_inputs()
+
+
+class RestartActivityReset(ResetStrategy):
+    """Recreate the main activity in a cleared task with ``am start -W``, without killing the process."""
+
+    name = "restart_activity"
+
+    def run(self, calculator: Calculator) -> None:
+        calculator.adb.restart_activity(
+            calculator.package_name, calculator.activity_name
+        )
+
+
+class ClearDataReset(ResetStrategy):
+    """Wipe the application data with ``pm clear`` and relaunch it with ``am start -W``."""
+
+    name = "clear_data"
+
+    def run(self, calculator: Calculator) -> None:
+        calculator.adb.clear_app_data(calculator.package_name)
+        calculator.adb.restart_activity(
+            calculator.package_name, calculator.activity_name
+        )
+
+
+# Ordered from the least to the most invasive mechanism
+RESET_STRATEGIES: tuple[ResetStrategy, ...] = (
+    ClearInputsReset(),
+    RestartActivityReset(),
+    ClearDataReset(),
+)
+
+
+class AppResetter:
+    """
+    Pick the cheapest correct reset strategy for the connected device.
+
+    Every strategy is calibrated once: it is run and timed, then verified with a single UI
+    dump that is not part of its cost, as later resets are not verified. Strategies that
+    do not leave both input fields empty are dropped. Once all strategies
+    are calibrated, each reset uses the one with the lowest observed cost, and its cost
+    estimate keeps being updated with an exponential moving average.
+    """
+
+    def __init__(
+        self,
+        strategies: tuple[ResetStrategy, ...] = RESET_STRATEGIES,
+        smoothing: float = 0.3,
+    ) -> None:
+        """
+        Initialize the resetter.
+
+        :param strategies: Candidate strategies, in calibration order.
+        :type strategies: tuple[ResetStrategy, ...], optional
+        :param smoothing: Weight of the newest measurement in the cost average.
+        :type smoothing: float, optional
+        """
+        self.strategies = strategies
+        self.smoothing = smoothing
+        self.costs: dict[str, float] = {}
+        self.failed: set[str] = set()
+
+    def _candidates(self) -> list[ResetStrategy]:
+        return [
+            strategy for strategy in self.strategies if strategy.name not in self.failed
+        ]
+
+    def _is_reset(self, calculator: Calculator) -> bool:
+        calculator.refresh_ui_state()
+        return calculator.inputs_known_empty()
+
+    def _record(self, strategy: ResetStrategy, cost: float) -> None:
+        previous = self.costs.get(strategy.name)
+        self.costs[strategy.name] = (
+            cost
+            if previous is None
+            else self.smoothing * cost + (1 - self.smoothing) * previous
+        )
+        LOGGER.debug(f"Reset '{strategy.name}' took {cost:.3f}s")
+
+    def reset(self, calculator: Calculator) -> str:
+        """
+        Reset the calculator using the cheapest strategy known to be correct.
+
+        :param calculator: The calculator page object to reset.
+        :type calculator: Calculator
+        :returns: Name of the strategy that performed the reset, or "none" when the
+                  input fields are already known to be empty.
+        :rtype: str
+        :raises RuntimeError: If no strategy is able to reset the application.
+        """
+        if calculator.inputs_known_empty():
+            return "none"
+
+        candidates = self._candidates()
+        uncalibrated = [s for s in candidates if s.name not in self.costs]
+        if not uncalibrated and candidates:
+            strategy = min(candidates, key=lambda s: self.costs[s.name])
+            started = time.monotonic()
+            strategy.run(calculator)
+            self._record(strategy, time.monotonic() - started)
+            return strategy.name
+
+        for strategy in uncalibrated:
+            LOGGER.debug(f"Calibrating reset strategy '{strategy.name}'")
+            started = time.monotonic()
+            try:
+                strategy.run(calculator)
+                cost = time.monotonic() - started
+                is_reset = self._is_reset(calculator)
+            except (RuntimeError, ValueError) as e:
+                LOGGER.warning(f"Reset strategy '{strategy.name}' failed: {e}")
+                is_reset = False
+            if is_reset:
+                self._record(strategy, cost)
+                return strategy.name
+            self.failed.add(strategy.name)
+
+        raise RuntimeError("No reset strategy was able to reset the application")
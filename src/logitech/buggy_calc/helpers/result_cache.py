@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import re
+from pathlib import Path
+
+from ...logger import configure_logger
+from .adb_controller import ADBController
+
+LOGGER = configure_logger("result_cache")
+
+
+def resolve_build_id(adb: ADBController, app_name: str) -> str:
+    """
+    Identify the installed build of an application.
+
+    The SHA-256 of the installed APK is used. On devices without ``sha256sum`` the version
+    code and last update time from ``dumpsys package`` are hashed instead.
+
+    :param adb: Controller used to talk to the device.
+    :type adb: ADBController
+    :param app_name: The package name of the application.
+    :type app_name: str
+    :returns: Hex digest identifying the build.
+    :rtype: str
+    """
+    try:
+        return adb.get_apk_sha256(app_name)
+    except (RuntimeError, ValueError, IndexError) as e:
+        LOGGER.warning(f"Unable to hash APK, falling back to dumpsys package: {e}")
+    details = adb.get_package_details(app_name)
+    version_lines = re.findall(r"(versionCode=\S+|lastUpdateTime=.+)", details)
+    return hashlib.sha256("\n".join(version_lines).encode()).hexdigest()
+
+
+class ResultCache:
+    """
+    Persistent cache of displayed results for deterministic cases of one application build.
+
+    Entries are keyed by (test id, inputs) and stored in one JSON file per build, so a new
+    build starts with an empty cache and unchanged builds only re-run new cases.
+    """
+
+    def __init__(self, cache_dir: Path, build_id: str, force: bool = False) -> None:
+        """
+        Initialize the result cache.
+
+        :param cache_dir: Directory holding the per-build cache files.
+        :type cache_dir: pathlib.Path
+        :param build_id: Identifier of the application build (e.g. APK SHA-256).
+        :type build_id: str
+        :param force: Ignore cached results (they are still refreshed with new ones).
+        :type force: bool, optional
+        """
+        self.path = cache_dir / f"{build_id}.json"
+        self.force = force
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self._entries: dict[str, str] = {}
+        if self.path.exists():
+            self._entries = json.loads(self.path.read_text())
+
+    @staticmethod
+    def _key(test_id: str, inputs: tuple) -> str:
+        return json.dumps([test_id, list(inputs)])
+
+    def get(self, test_id: str, inputs: tuple) -> str | None:
+        """
+        Get the cached result of a case.
+
+        :param test_id: Identifier of the test (e.g., the test function name).
+        :type test_id: str
+        :param inputs: Inputs of the case, e.g. ``(operation, input1, input2)``.
+        :type inputs: tuple
+        :returns: The cached result, or None on a miss or when re-running is forced.
+        :rtype: str or None
+        """
+        result = None if self.force else self._entries.get(self._key(test_id, inputs))
+        if result is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return result
+
+    def put(self, test_id: str, inputs: tuple, result: str) -> None:
+        """
+        Store the result of a case.
+
+        :param test_id: Identifier of the test (e.g., the test function name).
+        :type test_id: str
+        :param inputs: Inputs of the case, e.g. ``(operation, input1, input2)``.
+        :type inputs: tuple
+        :param result: The displayed result.
+        :type result: str
+        :returns: None
+        """
+        self._entries[self._key(test_id, inputs)] = result
+        self.stores += 1
+
+    def save(self) -> None:
+        """
+        Write the cache to disk.
+
+        :returns: None
+        """
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.path.write_text(json.dumps(self._entries, indent=1, sort_keys=True))
+        LOGGER.debug(f"Saved {len(self._entries)} cached results to: {self.path}")
+
+    @property
+    def stats(self) -> dict[str, int]:
+        """Hit, miss, store and entry counts of the current run."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "stores": self.stores,
+            "entries": len(self._entries),
+        }
@@ -0,0 +1,247 @@
+from __future__ import annotations
+
+import re
+import shutil
+import subprocess
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from pathlib import Path
+
+from ...logger import configure_logger
+from .adb_controller import ADBController
+
+LOGGER = configure_logger("screen_recorder")
+
+# Interrupts sent by ScreenRecorder.stop before giving up on the recording thread, and
+# seconds waited for the thread after each of them
+STOP_ATTEMPTS = 5
+STOP_WAIT_SECONDS = 2.0
+
+
+@dataclass(frozen=True)
+class Segment:
+    """Recorded video segment stored on the device, with host-side start and end times."""
+
+    device_path: str
+    started: float
+    ended: float
+
+
+class ScreenRecorder:
+    """
+    Background ``adb shell screenrecord`` capture in rolling, fixed-length segments.
+
+    Only the newest segments are kept on the device. Scenarios only record their start and
+    end timestamps; video is pulled and clipped just for the scenarios that failed.
+    """
+
+    def __init__(
+        self,
+        adb: ADBController | None = None,
+        segment_seconds: int = 20,
+        max_segments: int = 6,
+        device_dir: str = "/sdcard",
+    ) -> None:
+        """
+        Initialize the screen recorder.
+
+        :param adb: Controller used to talk to the device. Defaults to a new one.
+        :type adb: ADBController or None, optional
+        :param segment_seconds: Length of a single segment, in seconds (at most 180).
+        :type segment_seconds: int, optional
+        :param max_segments: Number of newest segments kept on the device.
+        :type max_segments: int, optional
+        :param device_dir: Device directory the segments are written to.
+        :type device_dir: str, optional
+        """
+        self.adb = adb or ADBController()
+        self.segment_seconds = segment_seconds
+        self.device_dir = device_dir
+        self._segments: deque[Segment] = deque()
+        self._max_segments = max_segments
+        self._lock = threading.Lock()
+        self._segment_done = threading.Condition(self._lock)
+        self._recording_since: float | None = None
+        self._stopping = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        """
+        Start recording segments in a background thread.
+
+        :returns: None
+        """
+        if self._thread is not None:
+            return
+        LOGGER.debug("Starting screen recorder")
+        self._stopping.clear()
+        self._thread = threading.Thread(
+            target=self._record, name="screen-recorder", daemon=True
+        )
+        self._thread.start()
+
+    def _record(self) -> None:
+        index = 0
+        while True:
+            device_path = f"{self.device_dir}/logitech_segment_{index}.mp4"
+            # stop() sets the flag under the lock, so no segment starts after it
+            with self._lock:
+                if self._stopping.is_set():
+                    break
+                self._recording_since = time.time()
+                process = self.adb.start_process(
+                    [
+                        "adb",
+                        "shell",
+                        "screenrecord",
+                        "--time-limit",
+                        str(self.segment_seconds),
+                        device_path,
+                    ]
+                )
+            process.wait()
+            with self._lock:
+                self._segments.append(
+                    Segment(device_path, self._recording_since, time.time())
+                )
+                self._recording_since = None
+                evicted = (
+                    self._segments.popleft()
+                    if len(self._segments) > self._max_segments
+                    else None
+                )
+                self._segment_done.notify_all()
+            if evicted is not None:
+                self._remove(evicted)
+            index += 1
+
+    def _remove(self, segment: Segment) -> None:
+        try:
+            self.adb.remove_file(segment.device_path)
+        except RuntimeError as e:
+            LOGGER.warning(f"Unable to remove segment {segment.device_path}: {e}")
+
+    def _finish_current_segment(self, until: float) -> None:
+        """Make the running segment end now if it overlaps ``until`` and wait until it is saved."""
+        with self._lock:
+            if self._recording_since is None or self._recording_since > until:
+                return
+        self.adb.interrupt_process("screenrecord")
+        with self._segment_done:
+            self._segment_done.wait_for(
+                lambda: self._recording_since is None or self._recording_since > until,
+                timeout=10,
+            )
+
+    def save_clip(
+        self, name: str, started: float, ended: float, out_dir: Path
+    ) -> list[Path]:
+        """
+        Pull the video covering a time range, e.g. of a failed scenario.
+
+        The running segment is finished early if it overlaps the range. With ``ffmpeg``
+        available the overlapping segments are joined and trimmed into ``<name>.mp4``,
+        otherwise the raw segments are kept as ``<name>_partN.mp4``.
+
+        :param name: Name of the clip, e.g. the scenario name.
+        :type name: str
+        :param started: Host timestamp (``time.time()``) of the range start.
+        :type started: float
+        :param ended: Host timestamp (``time.time()``) of the range end.
+        :type ended: float
+        :param out_dir: Directory the clip is written to.
+        :type out_dir: pathlib.Path
+        :returns: Paths of the written video files.
+        :rtype: list[pathlib.Path]
+        """
+        self._finish_current_segment(ended)
+        with self._lock:
+            segments = [
+                segment
+                for segment in self._segments
+                if segment.ended >= started and segment.started <= ended
+            ]
+        if not segments:
+            LOGGER.warning(f"No recorded video covers '{name}'")
+            return []
+
+        out_dir.mkdir(parents=True, exist_ok=True)
+        file_name = re.sub(r"[^\w.-]+", "_", name)
+        parts = []
+        for number, segment in enumerate(segments):
+            part = out_dir / f"{file_name}_part{number}.mp4"
+            self.adb.pull_file(segment.device_path, part)
+            parts.append(part)
+
+        ffmpeg = shutil.which("ffmpeg")
+        if ffmpeg is None:
+            return parts
+        clip = out_dir / f"{file_name}.mp4"
+        concat_list = out_dir / f"{file_name}.txt"
+        concat_list.write_text("".join(f"file '{part.resolve()}'\n" for part in parts))
+        offset = max(0.0, started - segments[0].started)
+        try:
+            subprocess.run(
+                [
+                    ffmpeg,
+                    "-y",
+                    "-loglevel",
+                    "error",
+                    "-f",
+                    "concat",
+                    "-safe",
+                    "0",
+                    "-i",
+                    str(concat_list),
+                    "-ss",
+                    f"{offset:.3f}",
+                    "-t",
+                    f"{ended - started:.3f}",
+                    "-c",
+                    "copy",
+                    str(clip),
+                ],
+                check=True,
+                capture_output=True,
+                timeout=60,
+            )
+        except (subprocess.CalledProcessError, subprocess.TimeoutExpired) as e:
+            LOGGER.warning(f"Unable to cut clip '{clip}', keeping raw segments: {e}")
+            return parts
+        finally:
+            concat_list.unlink()
+        for part in parts:
+            part.unlink()
+        LOGGER.debug(f"Saved clip '{name}' to: {clip}")
+        return [clip]
+
+    def stop(self) -> None:
+        """
+        Stop recording and remove all segments from the device.
+
+        :returns: None
+        """
+        if self._thread is None:
+            return
+        LOGGER.debug("Stopping screen recorder")
+        with self._lock:
+            self._stopping.set()
+        # The last segment may not be running on the device yet when it is first
+        # interrupted, so interrupt again until the recording thread saw it end
+        for _ in range(STOP_ATTEMPTS):
+            self.adb.interrupt_process("screenrecord")
+            self._thread.join(timeout=STOP_WAIT_SECONDS)
+            if not self._thread.is_alive():
+                break
+        else:
+            LOGGER.warning(
+                "Screen recording did not stop, a device recording may be left"
+            )
+        self._thread = None
+        with self._lock:
+            segments = list(self._segments)
+            self._segments.clear()
+        for segment in segments:
+            self._remove(segment)
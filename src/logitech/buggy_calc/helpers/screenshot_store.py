@@ -0,0 +1,311 @@
+from __future__ import annotations
+
+import contextlib
+import hashlib
+import json
+import os
+import shutil
+import sys
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # Windows: only the threads of one process are serialized
+    fcntl = None
+
+from ...logger import LOG_DIR, configure_logger
+
+LOGGER = configure_logger("screenshot_store")
+
+MANIFEST_FILE = "manifest.json"
+LOCK_FILE = ".manifest.lock"
+BLOBS_DIR = "blobs"
+
+
+class ScreenshotStore:
+    """
+    Content-addressed store of scenario screenshots.
+
+    Every frame is stored once under ``blobs/<aa>/<sha256>.<ext>``, no matter how many
+    scenarios captured it, and ``manifest.json`` maps scenario names to blobs. Blobs can be
+    re-encoded to a smaller format on a background thread, and retention removes the least
+    recently used blobs once they are too old or the store grows too large.
+
+    Several processes (e.g. the shards of a run) can share a store: the manifest is
+    re-read, changed and saved under a file lock, so no process overwrites the entries of
+    another, and retention only removes blobs that no scenario of any process still uses
+    within the limits.
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        max_bytes: int | None = 512 * 1024 * 1024,
+        max_age: float | None = 7 * 24 * 3600,
+        reencode: str | None = None,
+    ) -> None:
+        """
+        Open (or create) a screenshot store.
+
+        :param directory: Directory holding the manifest and the blobs.
+        :type directory: pathlib.Path
+        :param max_bytes: Total blob size kept, None for no limit.
+        :type max_bytes: int or None, optional
+        :param max_age: Seconds a blob is kept after it was last captured, None for no limit.
+        :type max_age: float or None, optional
+        :param reencode: Pillow format blobs are re-encoded to (e.g. ``"webp"``, lossless),
+                         None to keep PNGs. Requires ``pip install .[visual]``.
+        :type reencode: str or None, optional
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.reencode = reencode
+        self._lock = threading.Lock()
+        self._executor: ThreadPoolExecutor | None = None
+        self.scenarios: dict[str, dict] = {}
+        self.blobs: dict[str, dict] = {}
+        self._load_manifest()
+
+    @classmethod
+    def default(cls) -> ScreenshotStore:
+        """
+        Open the store under ``logs/screenshots``.
+
+        :returns: The store.
+        :rtype: ScreenshotStore
+        """
+        return cls(LOG_DIR / "screenshots")
+
+    @contextlib.contextmanager
+    def _locked(self):
+        # Holds the thread and file locks with the manifest freshly loaded
+        with self._lock:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            with open(self.directory / LOCK_FILE, "a") as lock_file:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    self._load_manifest()
+                    yield
+                finally:
+                    if fcntl is not None:
+                        fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _load_manifest(self) -> None:
+        # The manifest is replaced atomically, so reading needs no lock
+        manifest_file = self.directory / MANIFEST_FILE
+        if manifest_file.exists():
+            manifest = json.loads(manifest_file.read_text())
+        else:
+            manifest = {"scenarios": {}, "blobs": {}}
+        self.scenarios = manifest["scenarios"]
+        self.blobs = manifest["blobs"]
+
+    def _save_manifest(self) -> None:
+        # Called with the locks held
+        self.directory.mkdir(parents=True, exist_ok=True)
+        temporary = self.directory / f".{MANIFEST_FILE}.{os.getpid()}"
+        temporary.write_text(
+            json.dumps({"scenarios": self.scenarios, "blobs": self.blobs}, indent=1)
+        )
+        os.replace(temporary, self.directory / MANIFEST_FILE)
+
+    def add(self, name: str, capture: Path) -> str:
+        """
+        Store a captured PNG for a scenario, moving it into the store.
+
+        :param name: Scenario name the capture belongs to.
+        :type name: str
+        :param capture: Path of the captured PNG; it is moved or deleted.
+        :type capture: pathlib.Path
+        :returns: Content digest of the stored frame.
+        :rtype: str
+        """
+        data = capture.read_bytes()
+        digest = hashlib.sha256(data).hexdigest()
+        now = time.time()
+        with self._locked():
+            blob = self.blobs.get(digest)
+            if blob is None:
+                relative = Path(BLOBS_DIR) / digest[:2] / f"{digest}.png"
+                (self.directory / relative).parent.mkdir(parents=True, exist_ok=True)
+                shutil.move(capture, self.directory / relative)
+                blob = self.blobs[digest] = {
+                    "file": relative.as_posix(),
+                    "bytes": len(data),
+                }
+                new_blob = True
+            else:
+                capture.unlink()
+                new_blob = False
+            blob["last_used"] = now
+            self.scenarios[name] = {"blob": digest, "saved": now}
+            self._enforce_retention(now)
+            self._save_manifest()
+        LOGGER.debug(
+            f"Screenshot '{name}' stored as {'new' if new_blob else 'existing'} blob {digest}"
+        )
+        if new_blob and self.reencode:
+            self._submit_reencode(digest)
+        return digest
+
+    def _submit_reencode(self, digest: str) -> Future:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix="screenshot-reencode"
+            )
+        return self._executor.submit(self._reencode, digest)
+
+    def _reencode(self, digest: str) -> None:
+        try:
+            from PIL import Image
+        except ImportError:
+            LOGGER.warning("Pillow is not installed, screenshots are kept as PNG")
+            return
+        with self._locked():
+            blob = self.blobs.get(digest)
+            if blob is None:
+                return
+            source = self.directory / blob["file"]
+        target = source.with_suffix(f".{self.reencode}")
+        try:
+            with Image.open(source) as image:
+                image.save(target, format=self.reencode.upper(), lossless=True)
+        except FileNotFoundError:
+            # Retention of another process removed the blob meanwhile
+            target.unlink(missing_ok=True)
+            return
+        size = target.stat().st_size
+        with self._locked():
+            blob = self.blobs.get(digest)
+            if (
+                blob is None
+                or blob["file"] != self._relative(source)
+                or size >= blob["bytes"]
+            ):
+                target.unlink()
+                return
+            blob["file"] = self._relative(target)
+            blob["bytes"] = size
+            self._save_manifest()
+        source.unlink()
+
+    def _relative(self, path: Path) -> str:
+        return path.relative_to(self.directory).as_posix()
+
+    def _enforce_retention(self, now: float) -> None:
+        # Called with the locks held
+        removed = set()
+        if self.max_age is not None:
+            removed.update(
+                digest
+                for digest, blob in self.blobs.items()
+                if now - blob["last_used"] > self.max_age
+            )
+        if self.max_bytes is not None:
+            total = sum(
+                blob["bytes"]
+                for digest, blob in self.blobs.items()
+                if digest not in removed
+            )
+            by_age = sorted(self.blobs.items(), key=lambda item: item[1]["last_used"])
+            for digest, blob in by_age:
+                if total <= self.max_bytes:
+                    break
+                if digest not in removed:
+                    removed.add(digest)
+                    total -= blob["bytes"]
+        for digest in removed:
+            blob = self.blobs.pop(digest)
+            (self.directory / blob["file"]).unlink(missing_ok=True)
+        if removed:
+            LOGGER.debug(f"Retention removed {len(removed)} screenshot blobs")
+            self.scenarios = {
+                name: entry
+                for name, entry in self.scenarios.items()
+                if entry["blob"] not in removed
+            }
+
+    def enforce_retention(self) -> None:
+        """
+        Remove blobs exceeding the age or size limit, and the scenarios pointing to them.
+
+        :returns: None
+        """
+        with self._locked():
+            self._enforce_retention(time.time())
+            self._save_manifest()
+
+    def path(self, name: str) -> Path | None:
+        """
+        Get the stored frame of a scenario.
+
+        :param name: The scenario name.
+        :type name: str
+        :returns: Path of the blob, or None if the scenario has no stored frame.
+        :rtype: pathlib.Path or None
+        """
+        with self._locked():
+            entry = self.scenarios.get(name)
+            if entry is None:
+                return None
+            return self.directory / self.blobs[entry["blob"]]["file"]
+
+    def export(self, out_dir: Path) -> list[Path]:
+        """
+        Write every scenario's frame as ``<scenario>.png``, e.g. for visual regression.
+
+        PNG blobs are hard-linked where possible; re-encoded blobs are decoded with Pillow.
+        Scenarios whose frame the retention of another process removed meanwhile are
+        skipped.
+
+        :param out_dir: Destination directory.
+        :type out_dir: pathlib.Path
+        :returns: Paths of the exported PNGs.
+        :rtype: list[pathlib.Path]
+        """
+        self.flush()
+        out_dir.mkdir(parents=True, exist_ok=True)
+        exported = []
+        with self._locked():
+            names = sorted(self.scenarios)
+        for name in names:
+            source, target = self.path(name), out_dir / f"{name}.png"
+            if source is None:
+                continue
+            target.unlink(missing_ok=True)
+            try:
+                if source.suffix == ".png":
+                    try:
+                        os.link(source, target)
+                    except OSError:
+                        shutil.copyfile(source, target)
+                else:
+                    from PIL import Image
+
+                    with Image.open(source) as image:
+                        image.save(target, format="PNG")
+            except FileNotFoundError:
+                continue
+            exported.append(target)
+        return exported
+
+    def flush(self) -> None:
+        """
+        Wait until all pending re-encodes finished.
+
+        :returns: None
+        """
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+
+if __name__ == "__main__":
+    # Usage: python -m logitech.buggy_calc.helpers.screenshot_store <store-dir> <out-dir>
+    for exported in ScreenshotStore(Path(sys.argv[1])).export(Path(sys.argv[2])):
+        print(exported)
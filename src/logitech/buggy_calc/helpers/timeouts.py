@@ -0,0 +1,216 @@
+from __future__ import annotations
+
+import time
+from collections import defaultdict, deque
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+
+from .exceptions import DeviceUnavailableError
+
+# Monotonic time by which every ADB call of the current test or scenario must finish
+_DEADLINE: ContextVar[float | None] = ContextVar("adb_deadline", default=None)
+
+
+def command_type(command: list[str]) -> str:
+    """
+    Classify an ADB command for latency tracking, e.g. ``shell uiautomator`` or ``pull``.
+
+    :param command: The command arguments, starting with ``adb``.
+    :type command: list[str]
+    :returns: The command type.
+    :rtype: str
+    """
+    if len(command) < 2:
+        return command[0] if command else ""
+    if command[1] != "shell" or len(command) < 3:
+        return command[1]
+    if " && " in command[2]:
+        return "shell batch"
+    return f"shell {command[2].split()[0]}"
+
+
+def start_deadline(seconds: float) -> Token:
+    """
+    Limit all ADB calls of the current context to finish within ``seconds`` from now.
+
+    An enclosing, earlier deadline is kept.
+
+    :param seconds: Time budget, in seconds.
+    :type seconds: float
+    :returns: Token restoring the previous deadline, see :func:`clear_deadline`.
+    :rtype: contextvars.Token
+    """
+    new_deadline = time.monotonic() + seconds
+    current = _DEADLINE.get()
+    return _DEADLINE.set(
+        new_deadline if current is None else min(current, new_deadline)
+    )
+
+
+def clear_deadline(token: Token) -> None:
+    """
+    Restore the deadline active before :func:`start_deadline`.
+
+    :param token: Token returned by :func:`start_deadline`.
+    :type token: contextvars.Token
+    :returns: None
+    """
+    _DEADLINE.reset(token)
+
+
+@contextmanager
+def deadline(seconds: float) -> Iterator[None]:
+    """
+    Context manager form of :func:`start_deadline` and :func:`clear_deadline`.
+
+    :param seconds: Time budget, in seconds.
+    :type seconds: float
+    """
+    token = start_deadline(seconds)
+    try:
+        yield
+    finally:
+        clear_deadline(token)
+
+
+def remaining_time() -> float | None:
+    """
+    Get the time left until the current deadline.
+
+    :returns: Seconds left (possibly negative), or None without a deadline.
+    :rtype: float or None
+    """
+    current = _DEADLINE.get()
+    return None if current is None else current - time.monotonic()
+
+
+class LatencyTracker:
+    """
+    Learn per-command-type timeouts from the latencies of recent successful commands.
+
+    Until enough samples are observed, the default timeout is used. Afterwards the timeout
+    is a multiple of a high percentile, clamped between a floor and the default.
+    """
+
+    def __init__(
+        self,
+        default: float = 30.0,
+        floor: float = 2.0,
+        multiplier: float = 3.0,
+        percentile: float = 0.95,
+        window: int = 50,
+        min_samples: int = 5,
+    ) -> None:
+        """
+        Initialize the latency tracker.
+
+        :param default: Timeout used for unknown command types and as the upper bound.
+        :type default: float, optional
+        :param floor: Lower bound of a learned timeout.
+        :type floor: float, optional
+        :param multiplier: Factor applied to the latency percentile.
+        :type multiplier: float, optional
+        :param percentile: Latency percentile the timeout is based on.
+        :type percentile: float, optional
+        :param window: Number of most recent latencies kept per command type.
+        :type window: int, optional
+        :param min_samples: Samples needed before a timeout is learned.
+        :type min_samples: int, optional
+        """
+        self.default = default
+        self.floor = floor
+        self.multiplier = multiplier
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self._samples: defaultdict[str, deque[float]] = defaultdict(
+            lambda: deque(maxlen=window)
+        )
+
+    def record(self, kind: str, seconds: float) -> None:
+        """
+        Record the latency of a finished command.
+
+        :param kind: The command type, see :func:`command_type`.
+        :type kind: str
+        :param seconds: Wall time of the command.
+        :type seconds: float
+        :returns: None
+        """
+        self._samples[kind].append(seconds)
+
+    def timeout_for(self, kind: str) -> float:
+        """
+        Get the timeout for a command type.
+
+        :param kind: The command type, see :func:`command_type`.
+        :type kind: str
+        :returns: Timeout in seconds.
+        :rtype: float
+        """
+        samples = self._samples.get(kind)
+        if samples is None or len(samples) < self.min_samples:
+            return self.default
+        ordered = sorted(samples)
+        value = ordered[min(len(ordered) - 1, int(self.percentile * len(ordered)))]
+        return min(self.default, max(self.floor, value * self.multiplier))
+
+
+class CircuitBreaker:
+    """
+    Fail fast once the device stopped responding.
+
+    After ``threshold`` consecutive timeouts the breaker opens and commands are rejected
+    for ``cooldown`` seconds. Then a single trial command is let through: success closes
+    the breaker, another timeout opens it again.
+    """
+
+    def __init__(self, threshold: int = 3, cooldown: float = 30.0) -> None:
+        """
+        Initialize the circuit breaker.
+
+        :param threshold: Consecutive timeouts that open the breaker.
+        :type threshold: int, optional
+        :param cooldown: Seconds commands are rejected for once the breaker is open.
+        :type cooldown: float, optional
+        """
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at: float | None = None
+
+    def check(self) -> None:
+        """
+        Reject a command while the breaker is open.
+
+        :returns: None
+        :raises DeviceUnavailableError: If the breaker is open and still cooling down.
+        """
+        if self.opened_at is None:
+            return
+        if time.monotonic() - self.opened_at < self.cooldown:
+            raise DeviceUnavailableError(
+                f"Device unresponsive after {self.failures} consecutive timeouts"
+            )
+        # Half-open: let this command through as a trial
+        self.opened_at = None
+        self.failures = self.threshold - 1
+
+    def record_success(self) -> None:
+        """
+        Close the breaker after a command finished.
+
+        :returns: None
+        """
+        self.failures = 0
+        self.opened_at = None
+
+    def record_timeout(self) -> None:
+        """
+        Count a timed out command, opening the breaker at the threshold.
+
+        :returns: None
+        """
+        self.failures += 1
+        if self.failures >= self.threshold:
+            self.opened_at = time.monotonic()
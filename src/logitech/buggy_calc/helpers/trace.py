@@ -0,0 +1,376 @@
+from __future__ import annotations
+
+import contextlib
+import gzip
+import io
+import json
+import subprocess
+import threading
+import time
+from collections import defaultdict, deque
+from pathlib import Path
+
+from ...logger import configure_logger
+from .adb_controller import ADBController
+from .exceptions import TraceMismatchError
+
+LOGGER = configure_logger("trace")
+
+TRACE_VERSION = 1
+
+
+class TraceWriter:
+    """
+    Gzip-compressed JSON lines trace of ADB commands.
+
+    The first line is a header, every further line one command with its argv, outcome
+    (``ok``, ``failed`` or ``timeout``), return code, stdout, stderr and duration. Repeated
+    UI dumps compress well, so a whole run stays small.
+    """
+
+    def __init__(self, path: Path) -> None:
+        """
+        Create the trace file.
+
+        :param path: Path of the trace file, conventionally ``*.jsonl.gz``.
+        :type path: pathlib.Path
+        """
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self._file = gzip.open(path, "wt", encoding="utf-8")
+        self._lock = threading.Lock()
+        self._write({"version": TRACE_VERSION, "created": time.time()})
+
+    def _write(self, entry: dict) -> None:
+        with self._lock:
+            self._file.write(json.dumps(entry, separators=(",", ":")) + "\n")
+
+    def record(
+        self,
+        command: list[str],
+        outcome: str,
+        duration: float,
+        returncode: int | None = None,
+        stdout: str | None = None,
+        stderr: str | None = None,
+    ) -> None:
+        """
+        Append one command to the trace.
+
+        :param command: The command arguments.
+        :type command: list[str]
+        :param outcome: ``ok``, ``failed`` or ``timeout``.
+        :type outcome: str
+        :param duration: Wall time of the command, in seconds.
+        :type duration: float
+        :param returncode: Exit code of the command, None after a timeout.
+        :type returncode: int or None, optional
+        :param stdout: Captured standard output.
+        :type stdout: str or None, optional
+        :param stderr: Captured standard error.
+        :type stderr: str or None, optional
+        :returns: None
+        """
+        self._write(
+            {
+                "argv": command,
+                "outcome": outcome,
+                "returncode": returncode,
+                "stdout": stdout,
+                "stderr": stderr,
+                "duration": round(duration, 6),
+            }
+        )
+
+    def close(self) -> None:
+        """
+        Flush and close the trace file.
+
+        :returns: None
+        """
+        with self._lock:
+            self._file.close()
+
+
+def read_trace(path: Path) -> list[dict]:
+    """
+    Load the command entries of a trace file.
+
+    :param path: Path of the trace file.
+    :type path: pathlib.Path
+    :returns: Command entries in recorded order.
+    :rtype: list[dict]
+    :raises ValueError: If the file is not a trace of a supported version.
+    """
+    with gzip.open(path, "rt", encoding="utf-8") as file:
+        header = json.loads(file.readline() or "{}")
+        if header.get("version") != TRACE_VERSION:
+            raise ValueError(f"Unsupported trace file: {path}")
+        return [json.loads(line) for line in file]
+
+
+class RecordingADBController(ADBController):
+    """ADB controller that executes commands on the device and records each one to a trace."""
+
+    def __init__(self, trace: TraceWriter, **kwargs) -> None:
+        """
+        Initialize the recording controller.
+
+        :param trace: Trace the commands are written to.
+        :type trace: TraceWriter
+        :param kwargs: Passed on to :class:`ADBController`.
+        """
+        super().__init__(**kwargs)
+        self.trace = trace
+
+    def _run(
+        self, command: list[str], capture_output: bool, timeout: float
+    ) -> subprocess.CompletedProcess:
+        started = time.monotonic()
+        try:
+            result = super()._run(command, capture_output, timeout)
+        except subprocess.TimeoutExpired:
+            self.trace.record(command, "timeout", time.monotonic() - started)
+            raise
+        except subprocess.CalledProcessError as e:
+            self.trace.record(
+                command,
+                "failed",
+                time.monotonic() - started,
+                e.returncode,
+                e.stdout,
+                e.stderr,
+            )
+            raise
+        self.trace.record(
+            command,
+            "ok",
+            time.monotonic() - started,
+            result.returncode,
+            result.stdout,
+            result.stderr,
+        )
+        return result
+
+
+class _ReplayProcess:
+    """Stand-in for a streaming process (e.g. logcat), which is not part of a trace."""
+
+    def __init__(self) -> None:
+        self.stdout = io.StringIO("")
+        self.returncode = 0
+
+    def poll(self) -> int:
+        return self.returncode
+
+    def wait(self, timeout: float | None = None) -> int:
+        return self.returncode
+
+    def terminate(self) -> None:
+        pass
+
+    def kill(self) -> None:
+        pass
+
+
+class ReplayClock:
+    """
+    Virtual clock of a full-speed replay.
+
+    While installed, ``time.monotonic`` and ``time.sleep`` of the installing thread read
+    and advance a virtual time instead of waiting. Time passes only by the recorded
+    durations of replayed commands and by the sleeps of the replayed code. Time-bounded
+    polls (e.g. result awaits, retries with backoff) therefore see the elapsed time of
+    the recorded run and issue as many commands as it did. Other threads keep the real
+    clock.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the clock; it is inactive until installed."""
+        self._now = 0.0
+        self._thread: int | None = None
+        self._real_monotonic = time.monotonic
+        self._real_sleep = time.sleep
+
+    def _owned(self) -> bool:
+        return self._thread == threading.get_ident()
+
+    def monotonic(self) -> float:
+        """
+        Get the virtual time in the installing thread, the real monotonic time elsewhere.
+
+        :returns: Seconds, comparable with values read before the clock was installed.
+        :rtype: float
+        """
+        return self._now if self._owned() else self._real_monotonic()
+
+    def sleep(self, seconds: float) -> None:
+        """
+        Advance the virtual time in the installing thread, sleep for real elsewhere.
+
+        :param seconds: Seconds to sleep.
+        :type seconds: float
+        :returns: None
+        """
+        if self._owned():
+            self.advance(seconds)
+        else:
+            self._real_sleep(seconds)
+
+    def advance(self, seconds: float) -> None:
+        """
+        Let virtual time pass, e.g. the recorded duration of a command.
+
+        Ignored outside the installing thread, whose commands overlapped with it in the
+        recorded run.
+
+        :param seconds: Seconds to pass.
+        :type seconds: float
+        :returns: None
+        """
+        if self._owned():
+            self._now += max(seconds, 0.0)
+
+    @contextlib.contextmanager
+    def installed(self):
+        """
+        Replace ``time.monotonic`` and ``time.sleep`` with the clock in the calling thread.
+
+        :returns: Context manager restoring the real clock on exit.
+        """
+        self._real_monotonic, self._real_sleep = time.monotonic, time.sleep
+        self._now = self._real_monotonic()
+        self._thread = threading.get_ident()
+        time.monotonic, time.sleep = self.monotonic, self.sleep
+        try:
+            yield self
+        finally:
+            time.monotonic, time.sleep = self._real_monotonic, self._real_sleep
+            self._thread = None
+
+
+class ReplayADBController(ADBController):
+    """
+    ADB controller serving recorded command outcomes instead of talking to a device.
+
+    Each distinct argv replays its recorded outcomes in order, so commands issued by
+    different threads may interleave differently than in the recorded run. A command
+    issued more often than recorded raises :class:`TraceMismatchError` instead of
+    replaying a wrong outcome (e.g. the last UI dump again), and :meth:`verify_complete`
+    reports commands recorded but never replayed. Both mean the replayed code does not
+    behave like the recorded run, e.g. it takes more or fewer UI dumps.
+
+    Code polling the device until a timeout must run under :meth:`recorded_time`. Without
+    it, a full-speed replay polls more often than the recorded run within the same
+    timeout.
+    """
+
+    def __init__(self, entries: list[dict], realtime: bool = False, **kwargs) -> None:
+        """
+        Initialize the replay controller.
+
+        :param entries: Command entries, see :func:`read_trace`.
+        :type entries: list[dict]
+        :param realtime: Sleep for each recorded duration instead of replaying at full speed.
+        :type realtime: bool, optional
+        :param kwargs: Passed on to :class:`ADBController`.
+        """
+        super().__init__(**kwargs)
+        self.realtime = realtime
+        self._entries: defaultdict[tuple[str, ...], deque[dict]] = defaultdict(deque)
+        for entry in entries:
+            self._entries[tuple(entry["argv"])].append(entry)
+        self._lock = threading.Lock()
+        self.clock = ReplayClock()
+        self.replayed = 0
+        self.mismatches: list[str] = []
+
+    @classmethod
+    def from_file(
+        cls, path: Path, realtime: bool = False, **kwargs
+    ) -> ReplayADBController:
+        """
+        Create a replay controller from a trace file.
+
+        :param path: Path of the trace file.
+        :type path: pathlib.Path
+        :param realtime: Sleep for each recorded duration instead of replaying at full speed.
+        :type realtime: bool, optional
+        :returns: The replay controller.
+        :rtype: ReplayADBController
+        """
+        return cls(read_trace(path), realtime=realtime, **kwargs)
+
+    def recorded_time(self):
+        """
+        Let the calling thread experience the timing of the recorded run.
+
+        At full speed the :attr:`clock` is installed, so waits and sleeps take no real
+        time. In realtime mode the recorded durations are really slept, so real time is
+        used.
+
+        :returns: Context manager for the replayed code.
+        """
+        if self.realtime:
+            return contextlib.nullcontext()
+        return self.clock.installed()
+
+    def _run(
+        self, command: list[str], capture_output: bool, timeout: float
+    ) -> subprocess.CompletedProcess:
+        with self._lock:
+            queue = self._entries.get(tuple(command))
+            if not queue:
+                # Callers may handle the error like any failed command, so keep it too
+                mismatch = (
+                    f"Command not in trace: {command}"
+                    if queue is None
+                    else f"Command issued more often than recorded: {command}"
+                )
+                self.mismatches.append(mismatch)
+                raise TraceMismatchError(mismatch)
+            entry = queue.popleft()
+            self.replayed += 1
+        if self.realtime:
+            time.sleep(min(entry["duration"], timeout))
+        else:
+            self.clock.advance(min(entry["duration"], timeout))
+        if entry["outcome"] == "timeout":
+            raise subprocess.TimeoutExpired(command, timeout)
+        stdout = entry["stdout"] if capture_output else None
+        stderr = entry["stderr"] if capture_output else None
+        if entry["outcome"] == "failed":
+            raise subprocess.CalledProcessError(
+                entry["returncode"], command, stdout, stderr
+            )
+        return subprocess.CompletedProcess(command, entry["returncode"], stdout, stderr)
+
+    def unreplayed(self) -> dict[tuple[str, ...], int]:
+        """
+        Count the recorded commands that were not replayed (yet).
+
+        :returns: Number of left outcomes per argv.
+        :rtype: dict[tuple[str, ...], int]
+        """
+        with self._lock:
+            return {argv: len(queue) for argv, queue in self._entries.items() if queue}
+
+    def verify_complete(self) -> None:
+        """
+        Check that the replayed run issued exactly the recorded commands.
+
+        :returns: None
+        :raises TraceMismatchError: If a command was issued that the trace does not hold, or
+                                    more or fewer times than recorded.
+        """
+        problems = list(self.mismatches)
+        problems.extend(
+            f"Command recorded {count} more time(s) than replayed: {list(argv)}"
+            for argv, count in self.unreplayed().items()
+        )
+        if problems:
+            raise TraceMismatchError("; ".join(problems))
+
+    def start_process(self, command: list[str]) -> _ReplayProcess:
+        LOGGER.debug(f"Not replaying streaming process: {command}")
+        return _ReplayProcess()
@@ -0,0 +1,385 @@
+from __future__ import annotations
+
+import re
+import threading
+import time
+from collections.abc import Callable
+
+from ...logger import configure_logger
+from .adb_controller import ADBController
+from .exceptions import ResultNotFoundError, ResultTimeoutError
+from .parser import UIParser
+from .planner import INPUT_FIELDS
+
+LOGGER = configure_logger("ui_mirror")
+
+PLACEHOLDER_PATTERN = re.compile(r"Enter the (first|second) number")
+
+EVENT_PATTERN = re.compile(
+    r"EventType: (?P<type>\w+);.*?PackageName: (?P<package>[\w.]+);"
+)
+CLASS_PATTERN = re.compile(r"ClassName: (?P<class>[\w.$]+);")
+TEXT_PATTERN = re.compile(r"Text: \[(?P<text>.*?)\]; ContentDescription:")
+BEFORE_TEXT_PATTERN = re.compile(r"BeforeText: (?P<before>.*?); FromIndex:")
+CONTENT_CHANGE_PATTERN = re.compile(r"ContentChangeTypes: \[(?P<types>[^\]]*)\]")
+
+# Fields whose text changes are reported with the widget class of the event source; the
+# result is the app's only TextView
+TEXT_FIELDS = {
+    "android.widget.EditText": INPUT_FIELDS,
+    "android.widget.TextView": ("=",),
+}
+
+# Events that never change field texts or bounds
+BENIGN_EVENTS = frozenset(
+    {
+        "TYPE_VIEW_CLICKED",
+        "TYPE_VIEW_LONG_CLICKED",
+        "TYPE_VIEW_FOCUSED",
+        "TYPE_VIEW_SELECTED",
+        "TYPE_VIEW_HOVER_ENTER",
+        "TYPE_VIEW_HOVER_EXIT",
+        "TYPE_VIEW_ACCESSIBILITY_FOCUSED",
+        "TYPE_VIEW_ACCESSIBILITY_FOCUS_CLEARED",
+        "TYPE_VIEW_TEXT_SELECTION_CHANGED",
+        "TYPE_TOUCH_INTERACTION_START",
+        "TYPE_TOUCH_INTERACTION_END",
+        "TYPE_TOUCH_EXPLORATION_GESTURE_START",
+        "TYPE_TOUCH_EXPLORATION_GESTURE_END",
+        "TYPE_GESTURE_DETECTION_START",
+        "TYPE_GESTURE_DETECTION_END",
+        "TYPE_ANNOUNCEMENT",
+    }
+)
+
+
+def _empty(text: str | None) -> str | None:
+    return "" if text is not None and PLACEHOLDER_PATTERN.match(text) else text
+
+
+class UIStateMirror:
+    """
+    Live in-memory copy of the calculator's field texts and bounds.
+
+    A background thread follows ``adb shell uiautomator events``. Text changes of input
+    fields, and content changes carrying the new text of a field (how the result view
+    reports updates), are applied to the mirror directly; any other change of the app's
+    UI (or an event that cannot be attributed to one field) marks the mirror stale, and
+    the next read re-syncs it from one full UI dump. Reads after an action wait until the event
+    stream reported it and went quiet, and fall back to a dump if no event arrives or the
+    stream is not running.
+    """
+
+    def __init__(
+        self,
+        package_name: str,
+        adb: ADBController | None = None,
+        quiet: float = 0.15,
+        event_timeout: float = 0.5,
+    ) -> None:
+        """
+        Initialize the UI state mirror.
+
+        :param package_name: The package name of the calculator application.
+        :type package_name: str
+        :param adb: Controller used to talk to the device. Defaults to a new one.
+        :type adb: ADBController or None, optional
+        :param quiet: Seconds without events after which the UI is considered settled.
+        :type quiet: float, optional
+        :param event_timeout: Seconds to wait for the first event after an action before
+                              falling back to a dump.
+        :type event_timeout: float, optional
+        """
+        self.package_name = package_name
+        self.adb = adb or ADBController()
+        self.parser = UIParser(package_name)
+        self.quiet = quiet
+        self.event_timeout = event_timeout
+        self._texts: dict[str, str] = {}
+        self._bounds: dict[str, tuple[int, int, int, int]] = {}
+        self._stale = True
+        self._focused: str | None = None
+        self._changed_at: float | None = None
+        self._last_event = 0.0
+        self._lock = threading.Lock()
+        self._event = threading.Condition(self._lock)
+        self._process = None
+        self._thread: threading.Thread | None = None
+        self.hits = 0
+        self.dumps = 0
+
+    @property
+    def running(self) -> bool:
+        """Whether the event stream is being followed."""
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        """
+        Start following the accessibility event stream in a background thread.
+
+        :returns: None
+        """
+        if self.running:
+            return
+        LOGGER.debug("Starting UI state mirror")
+        self._process = self.adb.start_process(
+            ["adb", "shell", "uiautomator", "events"]
+        )
+        self._thread = threading.Thread(
+            target=self._read, name="ui-mirror", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """
+        Stop following the event stream; reads fall back to UI dumps.
+
+        :returns: None
+        """
+        if self._process is not None:
+            LOGGER.debug("Stopping UI state mirror")
+            self._process.terminate()
+            self._process.wait()
+            self._process = None
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _read(self) -> None:
+        for line in self._process.stdout:
+            self.feed(line.rstrip("\n"))
+        LOGGER.warning("UI event stream ended, reads fall back to UI dumps")
+        with self._event:
+            self._event.notify_all()
+
+    def feed(self, line: str) -> None:
+        """
+        Apply one line of ``uiautomator events`` output to the mirror.
+
+        :param line: A single printed accessibility event.
+        :type line: str
+        :returns: None
+        """
+        match = EVENT_PATTERN.search(line)
+        if match is None:
+            return
+        event_type, package = match.group("type", "package")
+        if package != self.package_name and event_type != "TYPE_WINDOW_STATE_CHANGED":
+            return
+        with self._event:
+            self._last_event = time.monotonic()
+            if event_type == "TYPE_VIEW_TEXT_CHANGED":
+                self._apply_text_change(line)
+            elif event_type == "TYPE_WINDOW_CONTENT_CHANGED":
+                self._apply_content_change(line)
+            elif event_type == "TYPE_WINDOW_STATE_CHANGED":
+                # A new window or activity, the layout may have changed too
+                self._stale = True
+                self._bounds = {}
+            elif event_type not in BENIGN_EVENTS:
+                self._stale = True
+            self._event.notify_all()
+
+    def _apply_text_change(self, line: str) -> None:
+        # Called with the lock held
+        class_match = CLASS_PATTERN.search(line)
+        text_match = TEXT_PATTERN.search(line)
+        before_match = BEFORE_TEXT_PATTERN.search(line)
+        if class_match is None or text_match is None or before_match is None:
+            self._stale = True
+            return
+        before = before_match.group("before")
+        before = "" if before == "null" else before
+        candidates = [
+            field_name
+            for field_name in TEXT_FIELDS.get(class_match.group("class"), ())
+            if _empty(self._texts.get(field_name)) == before
+        ]
+        if self._focused in candidates:
+            candidates = [self._focused]
+        if len(candidates) != 1:
+            self._stale = True
+            return
+        self._texts[candidates[0]] = text_match.group("text")
+
+    def _apply_content_change(self, line: str) -> None:
+        # Called with the lock held
+        class_match = CLASS_PATTERN.search(line)
+        text_match = TEXT_PATTERN.search(line)
+        types_match = CONTENT_CHANGE_PATTERN.search(line)
+        field_names = (
+            TEXT_FIELDS.get(class_match.group("class")) if class_match else None
+        )
+        if (
+            not field_names
+            or text_match is None
+            or types_match is None
+            or "CONTENT_CHANGE_TYPE_TEXT" not in types_match.group("types")
+        ):
+            # E.g. a subtree change of a layout, its source holds no field text
+            self._stale = True
+            return
+        text = text_match.group("text")
+        if any(self._texts.get(field_name) == text for field_name in field_names):
+            # Already applied, e.g. from the text change event of an input field
+            return
+        if len(field_names) == 1:
+            self._texts[field_names[0]] = text
+        elif self._focused in field_names:
+            self._texts[self._focused] = text
+        else:
+            self._stale = True
+
+    def expect_change(self, field_name: str | None = None) -> None:
+        """
+        Note that an action just changed the UI, e.g. a tap or typed text.
+
+        :param field_name: Field the action focused or typed into, if known.
+        :type field_name: str or None, optional
+        :returns: None
+        """
+        with self._lock:
+            self._changed_at = time.monotonic()
+            self._focused = field_name if field_name in INPUT_FIELDS else None
+
+    def invalidate(self) -> None:
+        """
+        Mark the mirror stale, e.g. after the app was restarted.
+
+        :returns: None
+        """
+        with self._lock:
+            self._stale = True
+            self._bounds = {}
+            self._focused = None
+
+    def _current(self) -> bool:
+        """Wait until the events of the last action arrived and settled, True if usable."""
+        if not self.running:
+            return False
+        with self._event:
+            if self._changed_at is not None:
+                arrived = self._event.wait_for(
+                    lambda: self._last_event > self._changed_at or not self.running,
+                    timeout=self.event_timeout,
+                )
+                if not arrived or not self.running:
+                    LOGGER.debug(
+                        "No UI event arrived for the last action, mirror out of sync"
+                    )
+                    return False
+                self._changed_at = None
+            while True:
+                remaining = self._last_event + self.quiet - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._event.wait(remaining)
+            return not self._stale
+
+    def sync(self) -> None:
+        """
+        Re-read every field's text and bounds from one full UI dump.
+
+        :returns: None
+        """
+        with self._lock:
+            # Events arriving while the dump is taken mark it stale again
+            self._stale = False
+            self._changed_at = None
+        ui_dump = self.adb.get_ui_dump()
+        self.dumps += 1
+        bounds = self.parser.parse_all_bounds(ui_dump)
+        texts = {}
+        for field_names in TEXT_FIELDS.values():
+            for field_name in field_names:
+                try:
+                    texts[field_name] = self.parser.parse_result_text(
+                        ui_dump, text=field_name
+                    )
+                except ResultNotFoundError:
+                    pass
+        with self._lock:
+            self._bounds, self._texts = bounds, texts
+
+    def text(self, field_name: str) -> str:
+        """
+        Get the text of a field, from the mirror when it is current.
+
+        :param field_name: The symbolic name of the field (e.g., "=", "first_number").
+        :type field_name: str
+        :returns: The text displayed in the field.
+        :rtype: str
+        :raises ResultNotFoundError: If the field is not on screen.
+        """
+        if self._current() and field_name in self._texts:
+            self.hits += 1
+            return self._texts[field_name]
+        self.sync()
+        if field_name not in self._texts:
+            raise ResultNotFoundError(
+                f"Result text not found for element with text '{field_name}'"
+            )
+        return self._texts[field_name]
+
+    def await_text(
+        self,
+        field_name: str,
+        predicate: Callable[[str], bool] | None = None,
+        timeout: float = 5.0,
+    ) -> str:
+        """
+        Wait until the text of a field matches, re-checking whenever the app reports events.
+
+        :param field_name: The symbolic name of the field (e.g., "=", "first_number").
+        :type field_name: str
+        :param predicate: Condition the text must satisfy; None returns the settled text.
+        :type predicate: Callable[[str], bool] or None, optional
+        :param timeout: Maximum time to wait, in seconds.
+        :type timeout: float, optional
+        :returns: The text displayed in the field.
+        :rtype: str
+        :raises ResultTimeoutError: If the text does not match before the timeout.
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            with self._lock:
+                seen = self._last_event
+            try:
+                value = self.text(field_name)
+            except ResultNotFoundError:
+                value = None
+            if value is not None and (predicate is None or predicate(value)):
+                return value
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise ResultTimeoutError(
+                    f"Value of '{field_name}' did not match within {timeout}s "
+                    f"(last value: {value!r})",
+                    last_value=value,
+                )
+            with self._event:
+                # Re-read after the next event, or after event_timeout without one (or a stream)
+                self._event.wait_for(
+                    lambda: self._last_event > seen and self.running,
+                    timeout=min(remaining, self.event_timeout),
+                )
+
+    def bounds(self, element: str) -> tuple[int, int, int, int] | None:
+        """
+        Get the bounds of an element, re-syncing only if it is unknown.
+
+        Bounds change only with the layout, i.e. when a new window is shown or the mirror
+        is invalidated, so known bounds are served without waiting for the event stream.
+
+        :param element: The symbolic name of the element (e.g., "+", "first_number").
+        :type element: str
+        :returns: The element bounds (x1, y1, x2, y2), or None if not on screen.
+        :rtype: tuple[int, int, int, int] or None
+        """
+        with self._lock:
+            known = element in self._bounds
+        if known:
+            self.hits += 1
+        else:
+            self.sync()
+        return self._bounds.get(element)
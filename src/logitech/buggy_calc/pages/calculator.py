@@ -1,15 +1,33 @@
 from __future__ import annotations
 
+import hashlib
 import re
 import time
-from pathlib import Path
+from collections.abc import Callable
 
+from ... import metrics
 from ...logger import configure_logger
+from ...structured_log import span
 from ..helpers.adb_controller import ADBController
+from ..helpers.clearing import ClearStrategy, KeyeventClear, available_strategies
+from ..helpers.exceptions import (
+    FieldNotClearedError,
+    ResultNotFoundError,
+    ResultTimeoutError,
+)
 from ..helpers.parser import UIParser
+from ..helpers.planner import INPUT_FIELDS, ActionPlan, CalculationPlanner
+from ..helpers.reset import AppResetter
+from ..helpers.screenshot_store import ScreenshotStore
+from ..helpers.ui_mirror import UIStateMirror
 
 LOGGER = configure_logger("calculator")
 
+PLACEHOLDER_PATTERN = re.compile(r"Enter the (first|second) number")
+
+# Seconds the UI may take to show the outcome of a batched calculation
+BATCH_RESULT_TIMEOUT = 5.0
+
 
 class Calculator:
     """
@@ -19,7 +37,9 @@ class Calculator:
     following the Page Object Model design pattern for maintainable test code.
     """
 
-    def __init__(self, package_name: str, activity_name: str) -> None:
+    def __init__(
+        self, package_name: str, activity_name: str, adb: ADBController | None = None
+    ) -> None:
         """
         Initialize the Calculator page object.
 
@@ -27,11 +47,81 @@ class Calculator:
         :type package_name: str
         :param activity_name: The activity name of the calculator application.
         :type activity_name: str
+        :param adb: Controller used to talk to the device, e.g. a recording or replaying one.
+                    Defaults to a new :class:`ADBController`.
+        :type adb: ADBController or None, optional
         """
         self.package_name = package_name
         self.activity_name = activity_name
-        self.adb = ADBController()
+        self.adb = adb or ADBController()
         self.parser = UIParser(package_name)
+        self.planner = CalculationPlanner()
+        self.resetter = AppResetter()
+        self._bounds: dict[str, tuple[int, int, int, int]] = {}
+        self._field_state: dict[str, str | None] = {}
+        self._result: str | None = None
+        self._sdk_version: int | None = None
+        self._failed_clear_strategies: set[str] = set()
+        self._verified_clear_strategies: set[str] = set()
+        self.screenshot_store: ScreenshotStore | None = None
+        self.ui_mirror: UIStateMirror | None = None
+
+    def _forget_ui_state(self) -> None:
+        """
+        Drop the cached element bounds and input field texts.
+
+        :returns: None
+        """
+        self._bounds.clear()
+        self._field_state.clear()
+        self._result = None
+        if self.ui_mirror is not None:
+            self.ui_mirror.invalidate()
+
+    def _ui_changed(self, field_name: str | None = None) -> None:
+        """
+        Note that an action just changed the UI, e.g. the displayed result.
+
+        The known result is dropped and the UI state mirror (if any) is told to wait for
+        the action's events.
+
+        :param field_name: Field the action focused or typed into, if known.
+        :type field_name: str or None, optional
+        :returns: None
+        """
+        self._result = None
+        if self.ui_mirror is not None:
+            self.ui_mirror.expect_change(field_name)
+
+    def refresh_ui_state(self) -> None:
+        """
+        Learn element bounds, input field texts and the result from a single UI dump.
+
+        :returns: None
+        """
+        LOGGER.debug("Refreshing cached UI state")
+        ui_dump = self.adb.get_ui_dump()
+        self._bounds.update(self.parser.parse_all_bounds(ui_dump))
+        for field_name in INPUT_FIELDS:
+            field_value = self.parser.parse_result_text(ui_dump, text=field_name)
+            self._field_state[field_name] = (
+                "" if PLACEHOLDER_PATTERN.match(field_value) else field_value
+            )
+        try:
+            self._result = self.parser.parse_result_text(ui_dump, text="=")
+        except ResultNotFoundError:
+            self._result = None
+
+    def inputs_known_empty(self) -> bool:
+        """
+        Check whether both input fields are known to be empty without querying the device.
+
+        :returns: True if both fields were last seen or left empty, False if non-empty or unknown.
+        :rtype: bool
+        """
+        return all(
+            self._field_state.get(field_name) == "" for field_name in INPUT_FIELDS
+        )
 
     def launch_app(self) -> None:
         """
@@ -43,6 +133,7 @@ class Calculator:
         :returns: None
         """
         LOGGER.debug(f"Launching app: {self.package_name}")
+        self._forget_ui_state()
         self.adb.launch_app(
             app_name=self.package_name, activity_name=self.activity_name
         )
@@ -50,6 +141,7 @@ class Calculator:
         # Wait for app to fully load
 
         time.sleep(2)
+        metrics.SLEEP_SECONDS.inc(2, "launch")
 
     def close_app(self) -> None:
         """
@@ -60,6 +152,7 @@ class Calculator:
         :returns: None
         """
         LOGGER.debug(f"Closing app: {self.package_name}")
+        self._forget_ui_state()
         self.adb.close_app(app_name=self.package_name)
 
     def tap_button(self, button_text: str) -> None:
@@ -76,8 +169,11 @@ class Calculator:
         :returns: None
         """
         LOGGER.debug(f"Taping button: {button_text}")
-        ui_dump = self.adb.get_ui_dump()
-        bounds = self.parser.parse_element_bounds(ui_dump, button_text)
+        if self.ui_mirror is not None:
+            bounds = self.ui_mirror.bounds(button_text)
+        else:
+            ui_dump = self.adb.get_ui_dump()
+            bounds = self.parser.parse_element_bounds(ui_dump, button_text)
         LOGGER.debug(f"Button bounds: {bounds}")
 
         if not bounds or len(bounds) != 4:
@@ -88,24 +184,97 @@ class Calculator:
 
         LOGGER.debug(f"Tapping in: x={center_x}, y={center_y}")
         self.adb.tap_coordinates(center_x, center_y)
+        self._ui_changed(button_text)
 
         # Small delay to allow UI to respond
 
         time.sleep(0.5)
+        metrics.SLEEP_SECONDS.inc(0.5, "tap")
 
     def get_display_result(self, field_name: str = "=") -> str:
         """
         Retrieve the displayed result or value from the calculator UI.
 
+        With a running :class:`UIStateMirror` the value is served from memory, otherwise
+        it is read from a UI dump.
+
         :param field_name: The symbolic name of the field to extract the result from (default is "=").
         :type field_name: str, optional
         :returns: The text value currently displayed in the specified field.
         :rtype: str
         """
         LOGGER.debug(f"Getting display value for '{field_name}'")
+        if self.ui_mirror is not None:
+            return self.ui_mirror.text(field_name)
         ui_dump = self.adb.get_ui_dump()
         return self.parser.parse_result_text(ui_dump, text=field_name)
 
+    def await_display_result(
+        self,
+        field_name: str = "=",
+        predicate: Callable[[str], bool] | None = None,
+        timeout: float = 5.0,
+        initial_delay: float = 0.05,
+        max_delay: float = 0.5,
+    ) -> str:
+        """
+        Poll the calculator UI until the displayed value matches or settles.
+
+        The UI is dumped with exponential backoff between polls. A dump whose hash did not
+        change since the previous poll is not parsed again. Without a predicate the value
+        is returned as soon as two consecutive dumps are identical, i.e. the UI settled.
+        With a running :class:`UIStateMirror` the value is re-checked whenever the event
+        stream reports a change instead, see :meth:`UIStateMirror.await_text`.
+
+        :param field_name: The symbolic name of the field to read (default is "=").
+        :type field_name: str, optional
+        :param predicate: Condition the value must satisfy; None waits for the UI to settle.
+        :type predicate: Callable[[str], bool] or None, optional
+        :param timeout: Maximum time to wait, in seconds.
+        :type timeout: float, optional
+        :param initial_delay: Delay before the second poll, in seconds.
+        :type initial_delay: float, optional
+        :param max_delay: Upper bound of the delay between polls, in seconds.
+        :type max_delay: float, optional
+        :returns: The text value displayed in the specified field.
+        :rtype: str
+        :raises ResultTimeoutError: If the value does not match or settle before the timeout.
+        """
+        LOGGER.debug(f"Awaiting display value for '{field_name}'")
+        if self.ui_mirror is not None and self.ui_mirror.running:
+            return self.ui_mirror.await_text(
+                field_name, predicate=predicate, timeout=timeout
+            )
+        deadline = time.monotonic() + timeout
+        delay = initial_delay
+        last_digest = None
+        value = None
+
+        while True:
+            ui_dump = self.adb.get_ui_dump()
+            digest = hashlib.blake2b(ui_dump.encode(), digest_size=16).digest()
+            if digest != last_digest:
+                try:
+                    value = self.parser.parse_result_text(ui_dump, text=field_name)
+                except ResultNotFoundError:
+                    value = None
+                if predicate is not None and value is not None and predicate(value):
+                    return value
+            elif predicate is None and value is not None:
+                return value
+            last_digest = digest
+
+            if time.monotonic() + delay > deadline:
+                raise ResultTimeoutError(
+                    f"Value of '{field_name}' did not settle within {timeout}s "
+                    f"(last value: {value!r})",
+                    last_value=value,
+                )
+            time.sleep(delay)
+            metrics.SLEEP_SECONDS.inc(delay, "await_result")
+            metrics.RETRIES.inc(1, "await_result")
+            delay = min(delay * 2, max_delay)
+
     def _get_input_value_length(self, field_name: str) -> int:
         """
         Get the length of the input value for a given field.
@@ -121,29 +290,86 @@ class Calculator:
         """
         field_value = self.get_display_result(field_name)
 
-        if re.match(r"Enter the (first|second) number", field_value):
+        if PLACEHOLDER_PATTERN.match(field_value):
             return 0
         return len(field_value)
 
+    def _clear_strategies(self) -> list[ClearStrategy]:
+        """
+        Get the clearing strategies usable on the connected device, fastest first.
+
+        The device SDK version is queried once and cached. Strategies that failed
+        verification earlier in the session are skipped.
+
+        :returns: The usable strategies ordered by preference.
+        :rtype: list[ClearStrategy]
+        """
+        if self._sdk_version is None:
+            try:
+                self._sdk_version = self.adb.get_sdk_version()
+            except (RuntimeError, ValueError):
+                LOGGER.warning("Unable to read device SDK version, assuming oldest")
+                self._sdk_version = 0
+        strategies = available_strategies(
+            self._sdk_version, self._failed_clear_strategies
+        )
+        return strategies or [KeyeventClear()]
+
+    def _verified_clear_strategy(self) -> ClearStrategy | None:
+        """
+        Get the fastest clearing strategy that already emptied a field on this device.
+
+        Clears inside a batch are not checked, so only a verified strategy may be batched.
+
+        :returns: The strategy, or None if no clear was verified yet in this session.
+        :rtype: ClearStrategy or None
+        """
+        for strategy in self._clear_strategies():
+            if strategy.name in self._verified_clear_strategies:
+                return strategy
+        return None
+
     def clear_input_field(self, field_name: str) -> None:
         """
         Clear the value in the specified input field.
 
-        This method checks the current value length of the input field. If the field is not empty,
-        it taps the field to focus it and simulates delete key events to remove all characters.
+        The fastest available clearing strategy is sent to the device as a single batch
+        and the result is verified with one UI dump. If the field is still not empty,
+        the strategy is disabled for the session and the next one is tried.
 
         :param field_name: The symbolic name of the input field to clear.
         :type field_name: str
+        :raises FieldNotClearedError: If none of the strategies emptied the field.
         :returns: None
         """
         LOGGER.debug(f"Clearing input from '{field_name}' field")
-        field_value_len = self._get_input_value_length(field_name)
-
-        if field_value_len:
-            self.tap_button(button_text=field_name)
-
-            for _ in range(field_value_len):
-                self.adb.del_value()
+        if self._field_state.get(field_name) == "":
+            return
+
+        for strategy in self._clear_strategies():
+            if field_name not in self._bounds or (
+                strategy.needs_length and self._field_state.get(field_name) is None
+            ):
+                self.refresh_ui_state()
+            field_value = self._field_state.get(field_name)
+            if field_value == "":
+                return
+
+            LOGGER.debug(f"Clearing '{field_name}' using '{strategy.name}' strategy")
+            x, y = self._center(field_name)
+            self.adb.run_batch(strategy.commands(x, y, len(field_value or "")))
+            self._ui_changed(field_name)
+
+            if self._get_input_value_length(field_name) == 0:
+                self._field_state[field_name] = ""
+                self._verified_clear_strategies.add(strategy.name)
+                return
+            LOGGER.warning(f"Strategy '{strategy.name}' did not clear '{field_name}'")
+            metrics.RETRIES.inc(1, "clear_field")
+            self._failed_clear_strategies.add(strategy.name)
+            self._field_state[field_name] = None
+
+        raise FieldNotClearedError(f"Unable to clear '{field_name}' field")
 
     def clear_inputs(self):
         """
@@ -158,6 +384,28 @@ class Calculator:
         for input in ("first_number", "second_number"):
             self.clear_input_field(input)
 
+    def reset_app_state(self) -> str:
+        """
+        Bring the calculator back to its initial state using the cheapest correct reset.
+
+        Available resets (in-app clearing, activity restart, data wipe) are measured on the
+        connected device and the fastest one that leaves both input fields empty is used.
+
+        :returns: Name of the reset strategy that was used.
+        :rtype: str
+        """
+        if not self.inputs_known_empty():
+            # A reset may clear the result too; calibration re-reads it
+            self._result = None
+        with span():
+            LOGGER.debug("Resetting app state")
+            strategy_name = self.resetter.reset(self)
+        if self.ui_mirror is not None:
+            self.ui_mirror.invalidate()
+        for field_name in INPUT_FIELDS:
+            self._field_state[field_name] = ""
+        return strategy_name
+
     def input_value(self, field_name: str, value: str | float) -> None:
         """
         Input a value into the specified calculator input field.
@@ -174,19 +422,232 @@ class Calculator:
         LOGGER.debug(f"Input value '{value}' to '{field_name}' field")
         self.tap_button(button_text=field_name)
         self.adb.input_value(value)
+        self._ui_changed(field_name)
+        previous = self._field_state.get(field_name)
+        self._field_state[field_name] = str(value) if previous == "" else None
+
+    def _center(self, element: str) -> tuple[int, int]:
+        """
+        Get the center coordinates of an element from the cached bounds.
 
-    def save_screenshot(self, screenshot_name: str) -> None:
-        main_project_path = Path(__file__).parents[4].resolve()
-        log_dir = main_project_path / "logs" / "screenshots"
-        log_dir.mkdir(parents=True, exist_ok=True)
+        :param element: The symbolic name of the element.
+        :type element: str
+        :returns: The (x, y) center of the element.
+        :rtype: tuple[int, int]
+        :raises ValueError: If the element bounds are not known.
+        """
+        if element not in self._bounds:
+            raise ValueError(f"Button '{element}' not found in UI")
+        left, top, right, bottom = self._bounds[element]
+        return (left + right) // 2, (top + bottom) // 2
+
+    def _plan_to_commands(self, plan: ActionPlan) -> list[list[str]]:
+        """
+        Translate the batch stage of a plan into device shell commands.
+
+        :param plan: Compiled plan whose field states and bounds are fully known.
+        :type plan: ActionPlan
+        :returns: Device-side commands ready for :meth:`ADBController.run_batch`.
+        :rtype: list[list[str]]
+        :raises FieldNotClearedError: If the plan clears a field but no clearing strategy
+                                      was verified on the device yet.
+        """
+        commands = []
+        for action in plan.batch:
+            x, y = self._center(action.field)
+            if action.kind == "clear":
+                strategy = self._verified_clear_strategy()
+                if strategy is None:
+                    raise FieldNotClearedError(
+                        "No clearing strategy verified on the device"
+                    )
+                length = len(self._field_state[action.field])
+                commands.extend(strategy.commands(x, y, length))
+                continue
+            commands.append(["input", "tap", str(x), str(y)])
+            if action.kind == "input":
+                commands.append(["input", "text", action.value])
+        return commands
+
+    def perform_calculation(
+        self,
+        operation: str,
+        input1: str | None = None,
+        input2: str | None = None,
+    ) -> str:
+        """
+        Perform a complete calculation using a compiled, batched action plan.
+
+        Known field texts and element bounds are reused between calls, so a calculation
+        costs at most three ADB round-trips (refresh, batch, read) and usually two. Until a
+        clearing strategy was verified on the device, the first field to clear is cleared
+        and checked on its own before the batch.
+
+        The result is read once the UI shows the outcome of the batch, see
+        :meth:`_await_batch_result`, so a display the app has not redrawn yet is never
+        returned. The previous result is known from the last calculation or refresh,
+        otherwise it is read before the batch.
+
+        :param operation: The symbolic name of the operation button (e.g., "+", "-", "*", "/").
+        :type operation: str
+        :param input1: The value to input into the first field, or None to leave it empty.
+        :type input1: str or None, optional
+        :param input2: The value to input into the second field, or None to leave it empty.
+        :type input2: str or None, optional
+        :returns: The result displayed by the calculator after performing the operation.
+        :rtype: str
+        """
+        with span():
+            LOGGER.debug(f"Performing calculation: {input1} {operation} {input2}")
+            plan = self.planner.compile(
+                operation, input1, input2, self._field_state, set(self._bounds)
+            )
+            if plan.refresh:
+                self.refresh_ui_state()
+                plan = self.planner.compile(
+                    operation, input1, input2, self._field_state, set(self._bounds)
+                )
+            clears = [action.field for action in plan.batch if action.kind == "clear"]
+            if clears and self._verified_clear_strategy() is None:
+                self.clear_input_field(clears[0])
+                plan = self.planner.compile(
+                    operation, input1, input2, self._field_state, set(self._bounds)
+                )
+            previous = self._result
+            if previous is None:
+                try:
+                    previous = self.get_display_result(plan.read)
+                except ResultNotFoundError:
+                    pass
+
+            try:
+                self.adb.run_batch(self._plan_to_commands(plan))
+            except Exception:
+                self._forget_ui_state()
+                raise
+            self._ui_changed()
+            self._field_state.update(plan.expected_state)
+
+            result = self._await_batch_result(plan, previous)
+            self._result = result
+            return result
+
+    def _shows_inputs(self, ui_dump: str, expected_state: dict[str, str]) -> bool:
+        """
+        Check whether a UI dump shows the expected input field texts.
+
+        :param ui_dump: The UI hierarchy XML.
+        :type ui_dump: str
+        :param expected_state: Expected text per input field, "" for empty.
+        :type expected_state: dict[str, str]
+        :returns: True if every input field holds its expected text.
+        :rtype: bool
+        """
+        for field_name, expected in expected_state.items():
+            try:
+                field_value = self.parser.parse_result_text(ui_dump, text=field_name)
+            except ResultNotFoundError:
+                return False
+            if PLACEHOLDER_PATTERN.match(field_value):
+                field_value = ""
+            if field_value != expected:
+                return False
+        return True
+
+    def _await_batch_result(
+        self,
+        plan: ActionPlan,
+        previous: str | None,
+        initial_delay: float = 0.05,
+        max_delay: float = 0.5,
+    ) -> str:
+        """
+        Wait until the UI shows the outcome of a batch and read the result.
+
+        A UI dump reflects the batch once the input fields hold the texts it typed. A result
+        differing from the previous one is returned from the first such dump. An unchanged
+        result (two calculations can have the same result) is returned once the next dump
+        is identical, i.e. the UI settled after the batch. With a running
+        :class:`UIStateMirror` the result is read once the batch's events went quiet.
+
+        :param plan: The executed plan.
+        :type plan: ActionPlan
+        :param previous: Result displayed before the batch, None if unknown.
+        :type previous: str or None
+        :param initial_delay: Delay before the second poll, in seconds.
+        :type initial_delay: float, optional
+        :param max_delay: Upper bound of the delay between polls, in seconds.
+        :type max_delay: float, optional
+        :returns: The displayed result.
+        :rtype: str
+        :raises ResultTimeoutError: If the UI does not show the outcome within
+                                    :data:`BATCH_RESULT_TIMEOUT` seconds.
+        """
+        if self.ui_mirror is not None and self.ui_mirror.running:
+            return self.ui_mirror.await_text(plan.read, timeout=BATCH_RESULT_TIMEOUT)
+        deadline = time.monotonic() + BATCH_RESULT_TIMEOUT
+        delay = initial_delay
+        last_digest = None
+        value = None
+
+        while True:
+            ui_dump = self.adb.get_ui_dump()
+            digest = hashlib.blake2b(ui_dump.encode(), digest_size=16).digest()
+            if digest != last_digest and self._shows_inputs(
+                ui_dump, plan.expected_state
+            ):
+                try:
+                    value = self.parser.parse_result_text(ui_dump, text=plan.read)
+                except ResultNotFoundError:
+                    value = None
+                if value is not None and value != previous:
+                    return value
+            elif digest == last_digest and value is not None:
+                LOGGER.debug(f"Result stayed '{value}' after the batch")
+                return value
+            else:
+                value = None
+            last_digest = digest
+
+            if time.monotonic() + delay > deadline:
+                raise ResultTimeoutError(
+                    f"UI did not show the outcome of the batch within "
+                    f"{BATCH_RESULT_TIMEOUT}s (last value: {value!r})",
+                    last_value=value,
+                )
+            time.sleep(delay)
+            metrics.SLEEP_SECONDS.inc(delay, "await_result")
+            metrics.RETRIES.inc(1, "await_result")
+            delay = min(delay * 2, max_delay)
+
+    def save_screenshot(self, screenshot_name: str) -> str:
+        """
+        Capture the screen into the screenshot store under the given scenario name.
+
+        Identical frames are stored only once, see :class:`ScreenshotStore`.
+
+        :param screenshot_name: Name the frame is stored under, e.g. the scenario name.
+        :type screenshot_name: str
+        :returns: Content digest of the stored frame.
+        :rtype: str
+        """
+        if self.screenshot_store is None:
+            self.screenshot_store = ScreenshotStore.default()
+        incoming_dir = self.screenshot_store.directory / "incoming"
+        incoming_dir.mkdir(parents=True, exist_ok=True)
 
         LOGGER.debug("Taking screenshot...")
         self.adb.take_screenshot(screenshot_name)
 
         LOGGER.debug(f"Pulling {screenshot_name}.png from device...")
-        self.adb.pull_screenshot(screenshot_name, log_dir)
+        self.adb.pull_screenshot(screenshot_name, incoming_dir)
+        capture = incoming_dir / f"{screenshot_name}.png"
+        if metrics.enabled() and capture.exists():
+            metrics.SCREENSHOT_BYTES.inc(capture.stat().st_size)
 
         LOGGER.debug(f"Removing {screenshot_name}.png from device...")
         self.adb.del_screenshot_from_device(screenshot_name)
 
-        LOGGER.debug(f"Screenshot '{screenshot_name}.png' saved to: {log_dir}")
+        digest = self.screenshot_store.add(screenshot_name, capture)
+        LOGGER.debug(f"Screenshot '{screenshot_name}' saved as blob {digest}")
+        return digest
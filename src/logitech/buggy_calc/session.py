@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+from ..logger import configure_logger
+from .helpers.adb_controller import ADBController
+from .helpers.dump_archive import DumpArchive
+from .helpers.logcat import LogcatCollector
+from .pages.calculator import Calculator
+
+LOGGER = configure_logger("session")
+
+PACKAGE_NAME = "com.admsqa.buggycalc"
+ACTIVITY_NAME = ".MainActivity"
+
+_active_session: DeviceSession | None = None
+
+
+class DeviceSession:
+    """
+    Device resources shared by every suite of a run: one calculator page object, one logcat
+    collector and one UI dump archive.
+
+    A session started by the orchestrator is registered as active, so the E2E fixtures and
+    the behave environment reuse it instead of relaunching the app and their own collectors.
+    """
+
+    def __init__(
+        self,
+        package_name: str = PACKAGE_NAME,
+        activity_name: str = ACTIVITY_NAME,
+        adb: ADBController | None = None,
+    ) -> None:
+        """
+        Initialize the device session.
+
+        :param package_name: The package name of the calculator application.
+        :type package_name: str, optional
+        :param activity_name: The activity name of the calculator application.
+        :type activity_name: str, optional
+        :param adb: Controller used to talk to the device. Defaults to a new one.
+        :type adb: ADBController or None, optional
+        """
+        self.calculator = Calculator(package_name, activity_name, adb=adb)
+        self.logcat = LogcatCollector(package_name, adb=self.calculator.adb)
+        self.dump_archive: DumpArchive | None = None
+
+    def start(self) -> None:
+        """
+        Open the dump archive, launch the app, start collecting logcat and register the session as active.
+
+        :returns: None
+        """
+        global _active_session
+        LOGGER.debug("Starting device session")
+        self.dump_archive = DumpArchive.for_run()
+        self.calculator.adb.dump_archive = self.dump_archive
+        self.calculator.launch_app()
+        self.logcat.start()
+        _active_session = self
+
+    def stop(self) -> None:
+        """
+        Stop collecting logcat, close the app and the dump archive, and unregister the session.
+
+        Safe to call on a session whose :meth:`start` failed partway, and more than once.
+
+        :returns: None
+        """
+        global _active_session
+        LOGGER.debug("Stopping device session")
+        if _active_session is self:
+            _active_session = None
+        try:
+            self.logcat.stop()
+            self.calculator.close_app()
+        finally:
+            if self.dump_archive is not None:
+                self.calculator.adb.dump_archive = None
+                self.dump_archive.close()
+                self.dump_archive = None
+
+
+def get_active_session() -> DeviceSession | None:
+    """
+    Get the device session started by the orchestrator, if any.
+
+    :returns: The active session, or None when suites run standalone.
+    :rtype: DeviceSession | None
+    """
+    return _active_session
@@ -0,0 +1,238 @@
+from __future__ import annotations
+
+import argparse
+import shutil
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+from ..logger import configure_logger
+
+LOGGER = configure_logger("visual")
+
+Bounds = tuple[int, int, int, int]
+
+
+def load_image(path: Path) -> np.ndarray:
+    """
+    Decode a PNG capture into an RGB array (alpha is dropped, grayscale is expanded).
+
+    :param path: Path of the PNG file.
+    :type path: pathlib.Path
+    :returns: Array of shape (height, width, 3) with dtype uint8.
+    :rtype: numpy.ndarray
+    """
+    with Image.open(path) as image:
+        return np.asarray(image.convert("RGB"))
+
+
+def downsample(image: np.ndarray, factor: int) -> np.ndarray:
+    """
+    Shrink an image by averaging ``factor`` x ``factor`` blocks.
+
+    Edge pixels that do not fill a whole block are cropped.
+
+    :param image: Array of shape (height, width, channels).
+    :type image: numpy.ndarray
+    :param factor: Block size.
+    :type factor: int
+    :returns: Float array of shape (height // factor, width // factor, channels).
+    :rtype: numpy.ndarray
+    """
+    height, width, channels = image.shape
+    height, width = height // factor * factor, width // factor * factor
+    blocks = image[:height, :width].reshape(
+        height // factor, factor, width // factor, factor, channels
+    )
+    return blocks.mean(axis=(1, 3))
+
+
+def mask_from_bounds(
+    shape: tuple[int, int],
+    regions: list[Bounds],
+    factor: int = 1,
+    include: bool = False,
+) -> np.ndarray:
+    """
+    Build a comparison mask from element bounds, e.g. from :meth:`UIParser.parse_all_bounds`.
+
+    :param shape: Full-resolution (height, width) of the capture.
+    :type shape: tuple[int, int]
+    :param regions: Element bounds (x1, y1, x2, y2) in screen pixels.
+    :type regions: list[tuple[int, int, int, int]]
+    :param factor: Downsampling factor the mask is used with.
+    :type factor: int, optional
+    :param include: Compare only inside the regions instead of ignoring them.
+    :type include: bool, optional
+    :returns: Boolean array of the downsampled shape, True where pixels are compared.
+    :rtype: numpy.ndarray
+    """
+    mask = np.full((shape[0] // factor, shape[1] // factor), not include)
+    for left, top, right, bottom in regions:
+        rows = slice(top // factor, -(-bottom // factor))
+        columns = slice(left // factor, -(-right // factor))
+        mask[rows, columns] = include
+    return mask
+
+
+@dataclass(frozen=True)
+class DiffResult:
+    """Outcome of comparing one capture with its golden image."""
+
+    name: str
+    status: str
+    diff_ratio: float = 0.0
+    mean_abs_diff: float = 0.0
+
+
+def compare_images(
+    actual: np.ndarray,
+    golden: np.ndarray,
+    factor: int = 4,
+    pixel_tolerance: float = 16.0,
+    mask: np.ndarray | None = None,
+) -> tuple[float, float]:
+    """
+    Compare two images on a downsampled grid.
+
+    :param actual: The captured image.
+    :type actual: numpy.ndarray
+    :param golden: The reference image.
+    :type golden: numpy.ndarray
+    :param factor: Downsampling factor.
+    :type factor: int, optional
+    :param pixel_tolerance: Maximum per-channel difference of a block still considered equal.
+    :type pixel_tolerance: float, optional
+    :param mask: Downsampled boolean mask, True where blocks are compared.
+    :type mask: numpy.ndarray or None, optional
+    :returns: Ratio of differing blocks and mean absolute difference over compared blocks.
+    :rtype: tuple[float, float]
+    """
+    difference = np.abs(downsample(actual, factor) - downsample(golden, factor))
+    block_difference = difference.max(axis=2)
+    if mask is None:
+        mask = np.ones(block_difference.shape, dtype=bool)
+    compared = block_difference[mask]
+    if not compared.size:
+        return 0.0, 0.0
+    return (
+        float(np.count_nonzero(compared > pixel_tolerance) / compared.size),
+        float(difference[mask].mean()),
+    )
+
+
+@dataclass
+class VisualRegression:
+    """
+    Compare scenario captures with golden images, in parallel worker processes.
+
+    :param golden_dir: Directory of golden PNGs, matched to captures by file name.
+    :type golden_dir: pathlib.Path
+    :param factor: Downsampling factor used before comparing.
+    :type factor: int
+    :param pixel_tolerance: Maximum per-channel difference of a block still considered equal.
+    :type pixel_tolerance: float
+    :param max_diff_ratio: Maximum ratio of differing blocks for a capture to pass.
+    :type max_diff_ratio: float
+    :param ignore_regions: Screen regions (x1, y1, x2, y2) excluded from comparison,
+                           e.g. the status bar clock.
+    :type ignore_regions: list[tuple[int, int, int, int]]
+    """
+
+    golden_dir: Path
+    factor: int = 4
+    pixel_tolerance: float = 16.0
+    max_diff_ratio: float = 0.001
+    ignore_regions: tuple[Bounds, ...] = ()
+
+    def check(self, capture: Path, update: bool = False) -> DiffResult:
+        """
+        Compare one capture with its golden image.
+
+        :param capture: Path of the captured PNG.
+        :type capture: pathlib.Path
+        :param update: Store the capture as golden image when none exists yet.
+        :type update: bool, optional
+        :returns: The comparison result (``passed``, ``failed``, ``size-mismatch`` or ``new``).
+        :rtype: DiffResult
+        """
+        golden_path = self.golden_dir / capture.name
+        if not golden_path.exists():
+            if update:
+                self.golden_dir.mkdir(parents=True, exist_ok=True)
+                shutil.copyfile(capture, golden_path)
+            return DiffResult(capture.name, "new")
+        actual, golden = load_image(capture), load_image(golden_path)
+        if actual.shape != golden.shape:
+            return DiffResult(capture.name, "size-mismatch", 1.0)
+        mask = mask_from_bounds(
+            actual.shape[:2], list(self.ignore_regions), self.factor
+        )
+        diff_ratio, mean_abs_diff = compare_images(
+            actual, golden, self.factor, self.pixel_tolerance, mask
+        )
+        status = "passed" if diff_ratio <= self.max_diff_ratio else "failed"
+        return DiffResult(capture.name, status, diff_ratio, mean_abs_diff)
+
+    def check_all(
+        self, captures_dir: Path, update: bool = False, max_workers: int | None = None
+    ) -> list[DiffResult]:
+        """
+        Compare every PNG of a directory with its golden image using a process pool.
+
+        :param captures_dir: Directory of captured PNGs (e.g. ``logs/screenshots``).
+        :type captures_dir: pathlib.Path
+        :param update: Store captures without a golden image as new golden images.
+        :type update: bool, optional
+        :param max_workers: Number of worker processes, defaults to the CPU count.
+        :type max_workers: int or None, optional
+        :returns: One result per capture, sorted by name.
+        :rtype: list[DiffResult]
+        """
+        captures = sorted(captures_dir.glob("*.png"))
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            results = list(executor.map(self.check, captures, [update] * len(captures)))
+        for result in results:
+            if result.status != "passed":
+                LOGGER.info(f"Visual check {result.status}: {result}")
+        return results
+
+
+def main(argv: list[str] | None = None) -> int:
+    """
+    Command line entry point comparing captures with golden images.
+
+    :param argv: Command line arguments. Defaults to ``sys.argv[1:]``.
+    :type argv: list[str] or None, optional
+    :returns: 0 if no capture failed, otherwise 1.
+    :rtype: int
+    """
+    parser = argparse.ArgumentParser(description="Visual regression of screenshots.")
+    parser.add_argument("captures", type=Path)
+    parser.add_argument("golden", type=Path)
+    parser.add_argument(
+        "--update", action="store_true", help="Store new golden images."
+    )
+    parser.add_argument(
+        "--ignore",
+        action="append",
+        default=[],
+        metavar="X1,Y1,X2,Y2",
+        help="Region excluded from comparison (repeatable).",
+    )
+    args = parser.parse_args(argv)
+    regions = tuple(tuple(map(int, region.split(","))) for region in args.ignore)
+    results = VisualRegression(args.golden, ignore_regions=regions).check_all(
+        args.captures, update=args.update
+    )
+    for result in results:
+        print(f"{result.status:<14} {result.diff_ratio:8.4%}  {result.name}")
+    return 0 if all(result.status != "failed" for result in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
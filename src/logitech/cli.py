@@ -0,0 +1,396 @@
+from __future__ import annotations
+
+import argparse
+import contextlib
+import contextvars
+import json
+import logging
+import os
+import subprocess
+import sys
+import threading
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+from . import log_shards, metrics, structured_log
+from .logger import LOG_DIR, SHARD_ENV, configure_logger
+
+LOGGER = configure_logger("cli")
+
+
+@dataclass(frozen=True)
+class Suite:
+    """
+    Test suite known to the orchestrator.
+
+    :param name: Short name used on the command line and in the report.
+    :type name: str
+    :param runner: ``"pytest"`` or ``"behave"``.
+    :type runner: str
+    :param args: Arguments passed to the runner.
+    :type args: tuple[str, ...]
+    :param needs_device: Whether the suite talks to the Android device.
+    :type needs_device: bool
+    """
+
+    name: str
+    runner: str
+    args: tuple[str, ...]
+    needs_device: bool
+
+
+@dataclass
+class SuiteResult:
+    """Outcome and timing of a single suite run."""
+
+    name: str
+    exit_code: int
+    started: float
+    duration: float
+
+
+SUITES = {
+    "api": Suite("api", "pytest", ("tests/api/test_user.py", "-v"), False),
+    "e2e": Suite("e2e", "pytest", ("tests/buggy_calc/test_e2e.py", "-v"), True),
+    "bdd": Suite(
+        "bdd",
+        "behave",
+        ("--format=pretty", "--outfile=logs/behave/bdd_calculator.txt"),
+        True,
+    ),
+}
+
+
+def run_in_subprocess(suite: Suite, start: float, root: Path) -> SuiteResult:
+    """
+    Run a device-free suite in a separate interpreter, logging its output to a file.
+
+    When the orchestrator's logs are sharded, the suite writes its own log shard.
+
+    :param suite: The suite to run.
+    :type suite: Suite
+    :param start: Monotonic timestamp of the orchestrator start.
+    :type start: float
+    :param root: Project checkout the suite paths are relative to.
+    :type root: pathlib.Path
+    :returns: The suite outcome.
+    :rtype: SuiteResult
+    """
+    log_dir = LOG_DIR / "suites"
+    log_dir.mkdir(parents=True, exist_ok=True)
+    env = None
+    if SHARD_ENV in os.environ:
+        env = {**os.environ, SHARD_ENV: suite.name}
+    started = time.monotonic()
+    with open(log_dir / f"{suite.name}.txt", "w") as output:
+        process = subprocess.run(
+            [sys.executable, "-m", suite.runner, *suite.args],
+            stdout=output,
+            stderr=subprocess.STDOUT,
+            cwd=root,
+            env=env,
+        )
+    return SuiteResult(
+        suite.name, process.returncode, started - start, time.monotonic() - started
+    )
+
+
+def _run_runner(suite: Suite) -> int:
+    if suite.runner == "pytest":
+        import pytest
+
+        return int(pytest.main(list(suite.args)))
+    from behave.__main__ import main as behave_main
+
+    return behave_main(list(suite.args))
+
+
+def run_in_process(suite: Suite, start: float, root: Path) -> SuiteResult:
+    """
+    Run a device suite in the orchestrator process, so it reuses the shared device session.
+
+    The suite runs in a copy of the current context, so context variables it sets (ADB
+    deadlines, structured log context) end with it, and handlers or the level it sets on
+    the root logger are undone afterwards. The working directory is the project checkout
+    only while the suite runs. Everything else is shared with the orchestrator and the
+    following suites: imported modules (a test module is not re-imported by a later
+    ``pytest.main``), the device session, the metrics registry (deliberately, the run's
+    metrics cover all suites), structured logging enabled by the orchestrator and the
+    framework loggers. Run a suite on its own (``pytest``/``behave``) for full isolation.
+
+    :param suite: The suite to run.
+    :type suite: Suite
+    :param start: Monotonic timestamp of the orchestrator start.
+    :type start: float
+    :param root: Project checkout the suite paths are relative to.
+    :type root: pathlib.Path
+    :returns: The suite outcome.
+    :rtype: SuiteResult
+    """
+    root_logger = logging.getLogger()
+    handlers, level = list(root_logger.handlers), root_logger.level
+    started = time.monotonic()
+    try:
+        with contextlib.chdir(root):
+            exit_code = contextvars.copy_context().run(_run_runner, suite)
+    finally:
+        for handler in root_logger.handlers[:]:
+            if handler not in handlers:
+                root_logger.removeHandler(handler)
+        root_logger.setLevel(level)
+    return SuiteResult(
+        suite.name, exit_code, started - start, time.monotonic() - started
+    )
+
+
+def collect_device_details(adb, package_name: str) -> None:
+    """
+    Save ``dumpsys package`` output of the application under ``logs/device``.
+
+    :param adb: Controller used to talk to the device.
+    :type adb: ADBController
+    :param package_name: The package name of the application.
+    :type package_name: str
+    :returns: None
+    """
+    device_dir = LOG_DIR / "device"
+    device_dir.mkdir(parents=True, exist_ok=True)
+    try:
+        details = adb.get_package_details(package_name)
+    except RuntimeError as e:
+        LOGGER.warning(f"Unable to collect package details: {e}")
+        return
+    (device_dir / "package_details.txt").write_text(details)
+
+
+def write_report(results: list[SuiteResult], total: float) -> Path:
+    """
+    Print the merged timing report and save it as ``logs/run_report.json``.
+
+    :param results: Outcomes of all suites.
+    :type results: list[SuiteResult]
+    :param total: Wall time of the whole run, in seconds.
+    :type total: float
+    :returns: Path of the saved report.
+    :rtype: pathlib.Path
+    """
+    print("========= Run report =========")
+    for result in sorted(results, key=lambda result: result.started):
+        status = "PASSED" if result.exit_code == 0 else f"FAILED ({result.exit_code})"
+        print(
+            f"{result.name:<6} {status:<12} "
+            f"start +{result.started:7.2f}s  duration {result.duration:7.2f}s"
+        )
+    print(f"Total wall time: {total:.2f}s")
+
+    LOG_DIR.mkdir(parents=True, exist_ok=True)
+    report_file = LOG_DIR / "run_report.json"
+    report_file.write_text(
+        json.dumps(
+            {"total": total, "suites": [asdict(result) for result in results]},
+            indent=2,
+        )
+    )
+    return report_file
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    """
+    Parse the orchestrator command line.
+
+    :param argv: Command line arguments. Defaults to ``sys.argv[1:]``.
+    :type argv: list[str] or None, optional
+    :returns: Parsed arguments with ``suites`` defaulting to all suites and ``root`` to
+              the current directory.
+    :rtype: argparse.Namespace
+    """
+    parser = argparse.ArgumentParser(
+        prog="logitech",
+        description="Run the API, E2E and BDD suites, overlapping device-free suites with device ones.",
+    )
+    parser.add_argument(
+        "suites",
+        nargs="*",
+        metavar="SUITE",
+        help=f"Suites to run, any of: {', '.join(SUITES)} (default: all).",
+    )
+    parser.add_argument(
+        "--root",
+        type=Path,
+        metavar="PATH",
+        help="Project checkout holding tests/ and behave.ini (default: the current directory).",
+    )
+    transport = parser.add_mutually_exclusive_group()
+    transport.add_argument(
+        "--record-trace",
+        type=Path,
+        metavar="PATH",
+        help="Record every ADB command of the device suites to a trace file (*.jsonl.gz).",
+    )
+    transport.add_argument(
+        "--replay-trace",
+        type=Path,
+        metavar="PATH",
+        help="Serve ADB commands from a recorded trace instead of a device.",
+    )
+    parser.add_argument(
+        "--replay-realtime",
+        action="store_true",
+        help="Replay at the recorded speed instead of full speed.",
+    )
+    parser.add_argument(
+        "--structured-logs",
+        action="store_true",
+        help="Also write JSON lines logs with an index under logs/structured/<run>.",
+    )
+    parser.add_argument(
+        "--log-shards",
+        action="store_true",
+        help="Write logs/automation per process (orchestrator and each background suite) "
+        "and merge them into logs/automation/combined after the run.",
+    )
+    parser.add_argument(
+        "--metrics-port",
+        type=int,
+        metavar="PORT",
+        help="Serve Prometheus metrics on http://127.0.0.1:PORT/metrics during the run.",
+    )
+    parser.add_argument(
+        "--metrics-textfile",
+        type=Path,
+        metavar="PATH",
+        help="Write Prometheus metrics to a textfile collector file (*.prom) after the run.",
+    )
+    args = parser.parse_args(argv)
+    unknown = set(args.suites) - set(SUITES)
+    if unknown:
+        parser.error(f"unknown suites: {', '.join(sorted(unknown))}")
+    args.suites = args.suites or list(SUITES)
+    args.root = (args.root or Path.cwd()).resolve()
+    if not (args.root / "tests").is_dir():
+        parser.error(f"{args.root} is not a project checkout, pass --root")
+    return args
+
+
+def main(argv: list[str] | None = None) -> int:
+    """
+    Console entry point running the selected suites and printing one merged timing report.
+
+    Device-free suites run in background interpreters while the device suites run one
+    after another in this process, sharing a single device session and logcat collector.
+
+    :param argv: Command line arguments. Defaults to ``sys.argv[1:]``.
+    :type argv: list[str] or None, optional
+    :returns: 0 if every suite passed, otherwise 1.
+    :rtype: int
+    """
+    args = parse_args(argv)
+    suites = [SUITES[name] for name in dict.fromkeys(args.suites)]
+    device_suites = [suite for suite in suites if suite.needs_device]
+    start = time.monotonic()
+    metrics_server = None
+    if args.metrics_port is not None:
+        metrics_server = metrics.start_http_server(args.metrics_port)
+    elif args.metrics_textfile is not None:
+        metrics.enable()
+    if args.structured_logs:
+        structured_log.enable_structured_logging()
+    if args.log_shards:
+        log_shards.clear_shards(LOG_DIR / "automation")
+        os.environ[SHARD_ENV] = "main"
+
+    session = None
+    trace = None
+    replay = None
+    if device_suites:
+        from .buggy_calc.helpers import trace as adb_trace
+        from .buggy_calc.session import DeviceSession
+
+        adb = None
+        if args.replay_trace:
+            adb = replay = adb_trace.ReplayADBController.from_file(
+                args.replay_trace, realtime=args.replay_realtime
+            )
+        elif args.record_trace:
+            trace = adb_trace.TraceWriter(args.record_trace)
+            adb = adb_trace.RecordingADBController(trace)
+        session = DeviceSession(adb=adb)
+        try:
+            devices = session.calculator.adb.get_devices()
+        except (RuntimeError, OSError) as e:
+            LOGGER.error(f"Unable to list devices: {e}")
+            devices = []
+        if not devices:
+            print("ERROR: No Android device connected or device not authorized")
+            if trace is not None:
+                trace.close()
+            if args.log_shards:
+                os.environ.pop(SHARD_ENV, None)
+            return 1
+        structured_log.set_device(devices[0])
+
+    results: list[SuiteResult] = []
+    threads = [
+        threading.Thread(
+            target=lambda suite=suite: results.append(
+                run_in_subprocess(suite, start, args.root)
+            ),
+            name=f"suite-{suite.name}",
+        )
+        for suite in suites
+        if not suite.needs_device
+    ]
+    for thread in threads:
+        thread.start()
+
+    if session is not None:
+        # Polls of a replayed run wait for the recorded, not the real, time
+        replay_time = (
+            replay.recorded_time() if replay is not None else contextlib.nullcontext()
+        )
+        try:
+            with replay_time:
+                session.start()
+                for suite in device_suites:
+                    print(f"========= Running {suite.name} suite =========")
+                    results.append(run_in_process(suite, start, args.root))
+                collect_device_details(
+                    session.calculator.adb, session.calculator.package_name
+                )
+        finally:
+            session.stop()
+            if trace is not None:
+                trace.close()
+
+    for thread in threads:
+        thread.join()
+
+    replay_matched = True
+    if replay is not None:
+        from .buggy_calc.helpers.exceptions import TraceMismatchError
+
+        try:
+            replay.verify_complete()
+        except TraceMismatchError as e:
+            print(f"ERROR: Replayed run does not match the trace: {e}")
+            replay_matched = False
+
+    write_report(results, time.monotonic() - start)
+    if args.log_shards:
+        os.environ.pop(SHARD_ENV, None)
+        for path in log_shards.merge_shards(LOG_DIR / "automation"):
+            LOGGER.debug(f"Merged log shards into {path}")
+    if args.structured_logs:
+        structured_log.disable_structured_logging()
+    if args.metrics_textfile is not None:
+        metrics.write_textfile(args.metrics_textfile)
+    if metrics_server is not None:
+        metrics_server.shutdown()
+    return (
+        0 if replay_matched and all(result.exit_code == 0 for result in results) else 1
+    )
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+import argparse
+import heapq
+import re
+import shutil
+import sys
+from collections.abc import Iterator
+from pathlib import Path
+
+from . import logger as logger_module
+
+# Start of a record written with logitech.logger.LOG_FORMAT; the timestamp sorts as text
+RECORD_PATTERN = re.compile(r"(\d{4}-\d\d-\d\d \d\d:\d\d:\d\d\.\d{3}) - ")
+
+
+def _directory(directory: Path | None) -> Path:
+    return logger_module.LOG_DIR / "automation" if directory is None else directory
+
+
+def shard_files(directory: Path | None = None) -> dict[str, dict[str, list[Path]]]:
+    """
+    Find the shard files of every log.
+
+    :param directory: Log directory holding ``shards/``, defaults to ``logs/automation``.
+    :type directory: pathlib.Path or None, optional
+    :returns: Log file name -> shard -> files of the shard, oldest rotated backup first.
+    :rtype: dict[str, dict[str, list[pathlib.Path]]]
+    """
+    logs: dict[str, dict[str, list[Path]]] = {}
+    shards_dir = _directory(directory) / "shards"
+    for shard_dir in sorted(path for path in shards_dir.glob("*") if path.is_dir()):
+        for log_file in sorted(shard_dir.glob("*.log")):
+            # RotatingFileHandler backups are <name>.log.1 (newest) to <name>.log.<n> (oldest)
+            backups = [
+                path
+                for path in shard_dir.glob(f"{log_file.name}.*")
+                if path.suffix[1:].isdigit()
+            ]
+            backups.sort(key=lambda path: -int(path.suffix[1:]))
+            logs.setdefault(log_file.name, {})[shard_dir.name] = [*backups, log_file]
+    return logs
+
+
+def read_records(paths: list[Path], shard: str) -> Iterator[tuple[str, str]]:
+    """
+    Read the records of one shard in order, tagging each with the shard name.
+
+    Lines not starting with a timestamp (e.g. tracebacks) belong to the record before them.
+
+    :param paths: Files of the shard, oldest first.
+    :type paths: list[pathlib.Path]
+    :param shard: The shard name.
+    :type shard: str
+    :returns: ``(timestamp, record text)`` pairs, the text ending with a newline.
+    :rtype: Iterator[tuple[str, str]]
+    """
+    timestamp, lines = "", []
+    for path in paths:
+        with open(path, encoding="utf-8", errors="replace") as log:
+            for line in log:
+                match = RECORD_PATTERN.match(line)
+                if match is None:
+                    lines.append(line if line.endswith("\n") else f"{line}\n")
+                    continue
+                if lines:
+                    yield timestamp, "".join(lines)
+                timestamp = match.group(1)
+                lines = [f"{timestamp} - [{shard}] {line[match.end():]}"]
+                if not lines[0].endswith("\n"):
+                    lines[0] += "\n"
+    if lines:
+        yield timestamp, "".join(lines)
+
+
+def merge_shards(directory: Path | None = None) -> list[Path]:
+    """
+    Interleave the shards of every log by timestamp into ``combined/<name>.log``.
+
+    Each shard is already in order, so the shards are merged in one streaming pass. Records
+    with the same timestamp keep the order of the shard names.
+
+    :param directory: Log directory holding ``shards/``, defaults to ``logs/automation``.
+    :type directory: pathlib.Path or None, optional
+    :returns: Paths of the combined logs.
+    :rtype: list[pathlib.Path]
+    """
+    combined_dir = _directory(directory) / "combined"
+    combined = []
+    for name, shards in shard_files(directory).items():
+        combined_dir.mkdir(parents=True, exist_ok=True)
+        path = combined_dir / name
+        records = heapq.merge(
+            *(read_records(paths, shard) for shard, paths in shards.items()),
+            key=lambda record: record[0],
+        )
+        with open(path, "w", encoding="utf-8") as output:
+            output.writelines(text for _, text in records)
+        combined.append(path)
+    return combined
+
+
+def clear_shards(directory: Path | None = None) -> None:
+    """
+    Remove the shards and combined logs of a previous run.
+
+    :param directory: Log directory holding ``shards/``, defaults to ``logs/automation``.
+    :type directory: pathlib.Path or None, optional
+    :returns: None
+    """
+    for name in ("shards", "combined"):
+        shutil.rmtree(_directory(directory) / name, ignore_errors=True)
+
+
+def main(argv: list[str] | None = None) -> int:
+    """
+    Command line entry point merging the log shards.
+
+    :param argv: Command line arguments. Defaults to ``sys.argv[1:]``.
+    :type argv: list[str] or None, optional
+    :returns: 0
+    :rtype: int
+    """
+    parser = argparse.ArgumentParser(description="Merge log shards by timestamp.")
+    parser.add_argument(
+        "directory",
+        type=Path,
+        nargs="?",
+        help="Log directory holding shards/ (default: logs/automation).",
+    )
+    args = parser.parse_args(argv)
+    for path in merge_shards(args.directory):
+        print(path)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
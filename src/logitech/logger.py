@@ -1,13 +1,102 @@
 import logging
-from logging.handlers import RotatingFileHandler
+import os
+import re
 from pathlib import Path
 
+LOG_DIR = Path(__file__).parents[2] / "logs"
+
+LOG_FORMAT = "%(asctime)s.%(msecs)03d - %(levelname)s - %(message)s"
+DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# Names of the framework loggers, see logitech.structured_log
+configured_loggers: set[str] = set()
+
+# Processes writing the same logs in parallel each get their own shard, see logitech.log_shards
+SHARD_ENV = "LOGITECH_LOG_SHARD"
+
+
+def log_shard() -> str | None:
+    """Get the log shard of this process.
+
+    The shard is taken from ``LOGITECH_LOG_SHARD`` (e.g. a suite name or device serial), or
+    else from the pytest-xdist worker id.
+
+    :returns: The shard name made safe for a directory name, or None if logs are not sharded.
+    :rtype: str or None
+    """
+    shard = os.environ.get(SHARD_ENV) or os.environ.get("PYTEST_XDIST_WORKER")
+    shard = re.sub(r"[^\w.-]+", "_", shard or "").strip(".")
+    return shard or None
+
+
+def shard_file(log_file: Path, shard: str | None) -> Path:
+    """Get the file a shard writes instead of a log file.
+
+    :param log_file: Path of the log file, e.g. ``logs/automation/calculator.log``.
+    :type log_file: pathlib.Path
+    :param shard: The shard name, None for the unsharded file.
+    :type shard: str or None
+    :returns: ``<log dir>/shards/<shard>/<log name>``, or the log file itself without a shard.
+    :rtype: pathlib.Path
+    """
+    if shard is None:
+        return log_file
+    return log_file.parent / "shards" / shard / log_file.name
+
+
+class LazyFileHandler(logging.Handler):
+    """Rotating file handler that creates its directory and opens its file on the first emit.
+
+    Configuring loggers at module level therefore does no I/O at import time, and a process
+    that never logs through a logger never touches its file. The file is opened in the
+    process's log shard, if any (see :func:`log_shard`), as rotation is not safe across
+    processes sharing one file.
+    """
+
+    def __init__(
+        self, log_file: Path, max_bytes: int = 1024 * 1024, backup_count: int = 5
+    ) -> None:
+        """Initialize the handler without touching the file system.
+
+        :param log_file: Path of the log file.
+        :type log_file: pathlib.Path
+        :param max_bytes: Size at which the file is rotated.
+        :type max_bytes: int, optional
+        :param backup_count: Number of rotated files kept.
+        :type backup_count: int, optional
+        """
+        super().__init__()
+        self.log_file = log_file
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.target: logging.Handler | None = None
+
+    def emit(self, record: logging.LogRecord) -> None:
+        # Handler.handle holds self.lock here, so the target is created only once
+        if self.target is None:
+            from logging.handlers import RotatingFileHandler
+
+            path = shard_file(self.log_file, log_shard())
+            path.parent.mkdir(parents=True, exist_ok=True)
+            self.target = RotatingFileHandler(
+                path, maxBytes=self.max_bytes, backupCount=self.backup_count
+            )
+            self.target.setFormatter(self.formatter)
+        self.target.emit(record)
+
+    def close(self) -> None:
+        if self.target is not None:
+            self.target.close()
+        super().close()
+
 
 def configure_logger(logger_name: str) -> logging.Logger:
     """Configure and return a logger with file handling and formatting.
 
     Creates a logger that writes to a rotating log file with a specific format.
-    The log file is created in the 'logs' directory relative to this module's location.
+    The log file is created in the 'logs' directory relative to this module's location,
+    lazily on the first logged record. Configuring the same logger again returns it
+    unchanged instead of adding another handler for the same file.
 
     :param logger_name: Name for the logger instance
     :type logger_name: str
@@ -16,18 +105,15 @@ def configure_logger(logger_name: str) -> logging.Logger:
     """
     logger = logging.getLogger(logger_name)
     logger.setLevel(logging.DEBUG)
+    configured_loggers.add(logger_name)
 
-    log_dir = Path(__file__).parents[2] / "logs" / "automation"
-    log_dir.mkdir(parents=True, exist_ok=True)
-    log_file = log_dir / f"{logger_name}.log"
-
-    file_handler = RotatingFileHandler(
-        log_file, maxBytes=1024 * 1024, backupCount=5  # 1MB
-    )
-    formatter = logging.Formatter(
-        "%(asctime)s.%(msecs)03d - %(levelname)s - %(message)s",
-        datefmt="%Y-%m-%d %H:%M:%S",
-    )
-    file_handler.setFormatter(formatter)
+    log_file = LOG_DIR / "automation" / f"{logger_name}.log"
+    if any(
+        isinstance(handler, LazyFileHandler) and handler.log_file == log_file
+        for handler in logger.handlers
+    ):
+        return logger
+    file_handler = LazyFileHandler(log_file)
+    file_handler.setFormatter(logging.Formatter(LOG_FORMAT, datefmt=DATE_FORMAT))
     logger.addHandler(file_handler)
     return logger
@@ -0,0 +1,306 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import tracemalloc
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+import pytest
+
+from .logger import configure_logger
+
+LOGGER = configure_logger("memory_profile")
+
+MIB = 1024 * 1024
+
+
+def count_handlers() -> int:
+    """
+    Count the handlers attached to all loggers, a growing count means leaked handlers.
+
+    :returns: Number of handlers of the root logger and every named logger.
+    :rtype: int
+    """
+    loggers = [logging.getLogger()] + [
+        logger
+        for logger in list(logging.Logger.manager.loggerDict.values())
+        if isinstance(logger, logging.Logger)
+    ]
+    return sum(len(logger.handlers) for logger in loggers)
+
+
+def count_open_fds() -> int | None:
+    """
+    Count the file descriptors open in this process.
+
+    :returns: The count, or None where ``/proc/self/fd`` (or ``/dev/fd``) is unavailable.
+    :rtype: int or None
+    """
+    for directory in ("/proc/self/fd", "/dev/fd"):
+        try:
+            # The listing itself opens one descriptor
+            return len(os.listdir(directory)) - 1
+        except OSError:
+            continue
+    return None
+
+
+def rss_bytes() -> int | None:
+    """
+    Get the resident set size of this process.
+
+    :returns: The size in bytes, or None where ``/proc/self/statm`` is unavailable.
+    :rtype: int or None
+    """
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return None
+
+
+@dataclass
+class MemorySample:
+    """Memory state after one test or scenario."""
+
+    test_id: str
+    traced: int
+    traced_delta: int
+    peak: int
+    rss: int | None
+    handlers: int
+    fds: int | None
+    top: list[str] = field(default_factory=list)
+
+
+class MemoryMonitor:
+    """
+    Tracemalloc snapshots around every test or scenario.
+
+    After each test the traced memory, the allocation sites that grew most during it, the
+    process RSS, the number of logging handlers and of open file descriptors are recorded.
+    Growth is measured against the state after the first test, so fixtures and imports
+    warming up are not counted; budgets turn excess growth into violations.
+    """
+
+    def __init__(
+        self,
+        top: int = 10,
+        frames: int = 1,
+        budget: int | None = None,
+        handler_budget: int | None = None,
+        fd_budget: int | None = None,
+    ) -> None:
+        """
+        Initialize the monitor.
+
+        :param top: Number of allocation sites recorded per test.
+        :type top: int, optional
+        :param frames: Stack frames stored per allocation; more give better sites but cost more.
+        :type frames: int, optional
+        :param budget: Allowed growth of traced memory over the run, in bytes.
+        :type budget: int or None, optional
+        :param handler_budget: Allowed growth of the number of logging handlers.
+        :type handler_budget: int or None, optional
+        :param fd_budget: Allowed growth of the number of open file descriptors.
+        :type fd_budget: int or None, optional
+        """
+        self.top = top
+        self.frames = frames
+        self.budget = budget
+        self.handler_budget = handler_budget
+        self.fd_budget = fd_budget
+        self.samples: list[MemorySample] = []
+        self._snapshot: tracemalloc.Snapshot | None = None
+        self._started_tracing = False
+
+    def start(self) -> None:
+        """
+        Start tracing allocations, unless already traced (e.g. ``python -X tracemalloc``).
+
+        :returns: None
+        """
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+            self._started_tracing = True
+
+    def stop(self) -> None:
+        """
+        Stop tracing allocations if :meth:`start` started it.
+
+        :returns: None
+        """
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+        self._snapshot = None
+
+    def _take_snapshot(self) -> tracemalloc.Snapshot:
+        return tracemalloc.take_snapshot().filter_traces(
+            (
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+            )
+        )
+
+    def begin(self) -> None:
+        """
+        Snapshot the allocations before a test.
+
+        :returns: None
+        """
+        tracemalloc.reset_peak()
+        self._snapshot = self._take_snapshot()
+
+    def end(self, test_id: str) -> MemorySample:
+        """
+        Snapshot the allocations after a test and record what grew.
+
+        :param test_id: Test node id or scenario name.
+        :type test_id: str
+        :returns: The recorded sample.
+        :rtype: MemorySample
+        """
+        current, peak = tracemalloc.get_traced_memory()
+        top = []
+        delta = 0
+        if self._snapshot is not None:
+            stats = self._take_snapshot().compare_to(self._snapshot, "lineno")
+            delta = sum(stat.size_diff for stat in stats)
+            top = [str(stat) for stat in stats[: self.top] if stat.size_diff > 0]
+            self._snapshot = None
+        sample = MemorySample(
+            test_id,
+            current,
+            delta,
+            peak,
+            rss_bytes(),
+            count_handlers(),
+            count_open_fds(),
+            top,
+        )
+        self.samples.append(sample)
+        return sample
+
+    def violations(self) -> list[str]:
+        """
+        Compare the growth since the first test with the budgets.
+
+        :returns: One message per exceeded budget.
+        :rtype: list[str]
+        """
+        if len(self.samples) < 2:
+            return []
+        first, last = self.samples[0], self.samples[-1]
+        messages = []
+        growth = last.traced - first.traced
+        if self.budget is not None and growth > self.budget:
+            messages.append(
+                f"traced memory grew by {growth / MIB:.1f} MiB "
+                f"(budget {self.budget / MIB:.1f} MiB)"
+            )
+        growth = last.handlers - first.handlers
+        if self.handler_budget is not None and growth > self.handler_budget:
+            messages.append(
+                f"logging handlers grew by {growth} (budget {self.handler_budget})"
+            )
+        if (
+            self.fd_budget is not None
+            and first.fds is not None
+            and last.fds is not None
+        ):
+            growth = last.fds - first.fds
+            if growth > self.fd_budget:
+                messages.append(
+                    f"open file descriptors grew by {growth} (budget {self.fd_budget})"
+                )
+        return messages
+
+    def write_report(self, path: Path) -> None:
+        """
+        Save every sample and the budget violations as JSON.
+
+        :param path: Destination file.
+        :type path: pathlib.Path
+        :returns: None
+        """
+        path.parent.mkdir(parents=True, exist_ok=True)
+        report = {
+            "samples": [asdict(sample) for sample in self.samples],
+            "violations": self.violations(),
+        }
+        path.write_text(json.dumps(report, indent=1))
+        LOGGER.debug(f"Saved memory report of {len(self.samples)} tests to {path}")
+
+    def summary(self, count: int = 5) -> list[str]:
+        """
+        Describe the run's memory behaviour for a terminal report.
+
+        :param count: Number of tests listed that grew the traced memory most.
+        :type count: int, optional
+        :returns: Report lines.
+        :rtype: list[str]
+        """
+        if not self.samples:
+            return []
+        first, last = self.samples[0], self.samples[-1]
+        line = (
+            f"traced {last.traced / MIB:.1f} MiB ({(last.traced - first.traced) / MIB:+.1f} MiB "
+            f"since the first test), handlers {last.handlers} "
+            f"({last.handlers - first.handlers:+d})"
+        )
+        if last.fds is not None and first.fds is not None:
+            line += f", open fds {last.fds} ({last.fds - first.fds:+d})"
+        lines = [line]
+        for sample in sorted(self.samples, key=lambda sample: -sample.traced_delta)[
+            :count
+        ]:
+            lines.append(f"{sample.traced_delta / 1024:+10.1f} KiB  {sample.test_id}")
+            lines.extend(f"    {site}" for site in sample.top[:3])
+        return lines
+
+
+class MemoryProfilePlugin:
+    """Pytest plugin sampling memory around every test and failing the run over budget."""
+
+    def __init__(self, monitor: MemoryMonitor, report_file: Path) -> None:
+        """
+        Initialize the plugin.
+
+        :param monitor: The monitor taking the samples.
+        :type monitor: MemoryMonitor
+        :param report_file: JSON file the samples are saved to at the end of the session.
+        :type report_file: pathlib.Path
+        """
+        self.monitor = monitor
+        self.report_file = report_file
+
+    def pytest_sessionstart(self, session: pytest.Session) -> None:
+        self.monitor.start()
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_protocol(self, item: pytest.Item, nextitem: pytest.Item | None):
+        self.monitor.begin()
+        yield
+        self.monitor.end(item.nodeid)
+
+    @pytest.hookimpl(trylast=True)
+    def pytest_sessionfinish(self, session: pytest.Session, exitstatus: int) -> None:
+        self.monitor.write_report(self.report_file)
+        self.monitor.stop()
+        if self.monitor.violations() and session.exitstatus == pytest.ExitCode.OK:
+            session.exitstatus = pytest.ExitCode.TESTS_FAILED
+
+    def pytest_terminal_summary(self, terminalreporter) -> None:
+        lines = self.monitor.summary()
+        if not lines:
+            return
+        terminalreporter.write_sep("-", "memory")
+        for line in lines:
+            terminalreporter.write_line(line)
+        for violation in self.monitor.violations():
+            terminalreporter.write_line(
+                f"MEMORY BUDGET EXCEEDED: {violation}", red=True
+            )
@@ -0,0 +1,343 @@
+from __future__ import annotations
+
+import bisect
+import functools
+import os
+import threading
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+_enabled = False
+
+
+def enable() -> None:
+    """
+    Start recording metric updates.
+
+    Metrics are disabled by default, so every update returns immediately until this is
+    called, e.g. by :func:`start_http_server` or the orchestrator's ``--metrics-*`` options.
+    """
+    global _enabled
+    _enabled = True
+
+
+def disable() -> None:
+    """Stop recording metric updates; recorded values are kept."""
+    global _enabled
+    _enabled = False
+
+
+def enabled() -> bool:
+    """
+    Check whether metric updates are recorded.
+
+    :returns: True once :func:`enable` was called.
+    :rtype: bool
+    """
+    return _enabled
+
+
+def _format_labels(
+    names: tuple[str, ...], values: tuple[str, ...], extra: str = ""
+) -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class Counter:
+    """Monotonically increasing value per label set."""
+
+    kind = "counter"
+
+    def __init__(
+        self, name: str, documentation: str, labels: tuple[str, ...] = ()
+    ) -> None:
+        """
+        Create a counter and register it for exposition.
+
+        :param name: Metric name, conventionally ending in ``_total``.
+        :type name: str
+        :param documentation: Help text.
+        :type documentation: str
+        :param labels: Label names.
+        :type labels: tuple[str, ...], optional
+        """
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self._values: dict[tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def inc(self, amount: float = 1, *label_values: str) -> None:
+        """
+        Increase the counter of a label set.
+
+        :param amount: Non-negative increment.
+        :type amount: float, optional
+        :param label_values: Values of the labels, in declaration order.
+        :type label_values: str
+        :returns: None
+        """
+        if not _enabled:
+            return
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def value(self, *label_values: str) -> float:
+        """
+        Get the current value of a label set.
+
+        :param label_values: Values of the labels, in declaration order.
+        :type label_values: str
+        :returns: The counter value, 0 if never increased.
+        :rtype: float
+        """
+        return self._values.get(label_values, 0)
+
+    def samples(self) -> list[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [
+            f"{self.name}{_format_labels(self.labels, values)} {_format_number(value)}"
+            for values, value in items
+        ]
+
+
+class Histogram:
+    """Distribution of observed values in cumulative buckets, per label set."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labels: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = (
+            0.005,
+            0.01,
+            0.025,
+            0.05,
+            0.1,
+            0.25,
+            0.5,
+            1,
+            2.5,
+            5,
+            10,
+        ),
+    ) -> None:
+        """
+        Create a histogram and register it for exposition.
+
+        :param name: Metric name.
+        :type name: str
+        :param documentation: Help text.
+        :type documentation: str
+        :param labels: Label names.
+        :type labels: tuple[str, ...], optional
+        :param buckets: Sorted upper bounds of the buckets; ``+Inf`` is implicit.
+        :type buckets: tuple[float, ...], optional
+        """
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self.buckets = buckets
+        # label values -> [per-bucket counts (last is +Inf), sum]
+        self._values: dict[tuple[str, ...], list] = {}
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def observe(self, value: float, *label_values: str) -> None:
+        """
+        Record one observation of a label set.
+
+        :param value: The observed value.
+        :type value: float
+        :param label_values: Values of the labels, in declaration order.
+        :type label_values: str
+        :returns: None
+        """
+        if not _enabled:
+            return
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(label_values)
+            if entry is None:
+                entry = self._values[label_values] = [
+                    [0] * (len(self.buckets) + 1),
+                    0.0,
+                ]
+            entry[0][index] += 1
+            entry[1] += value
+
+    def count(self, *label_values: str) -> int:
+        """
+        Get the number of observations of a label set.
+
+        :param label_values: Values of the labels, in declaration order.
+        :type label_values: str
+        :returns: The observation count.
+        :rtype: int
+        """
+        entry = self._values.get(label_values)
+        return sum(entry[0]) if entry else 0
+
+    def samples(self) -> list[str]:
+        with self._lock:
+            items = sorted(
+                (values, (list(counts), total))
+                for values, (counts, total) in self._values.items()
+            )
+        lines = []
+        for values, (counts, total) in items:
+            cumulative = 0
+            for bound, count in zip((*self.buckets, float("inf")), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else _format_number(bound)
+                labels = _format_labels(self.labels, values, f'le="{le}"')
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labels, values)
+            lines.append(f"{self.name}_sum{labels} {_format_number(total)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+def timed(histogram: Histogram, *label_values: str) -> Callable:
+    """
+    Decorator observing the wall time of each call while metrics are enabled.
+
+    :param histogram: Histogram receiving the durations, in seconds.
+    :type histogram: Histogram
+    :param label_values: Values of the histogram labels, in declaration order.
+    :type label_values: str
+    :returns: The decorator.
+    :rtype: Callable
+    """
+
+    def decorator(function: Callable) -> Callable:
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return function(*args, **kwargs)
+            started = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                histogram.observe(time.perf_counter() - started, *label_values)
+
+        return wrapper
+
+    return decorator
+
+
+REGISTRY: list[Counter | Histogram] = []
+
+ADB_COMMANDS = Counter(
+    "logitech_adb_commands_total", "ADB commands executed.", ("type", "outcome")
+)
+ADB_COMMAND_SECONDS = Histogram(
+    "logitech_adb_command_seconds", "Wall time of ADB commands.", ("type",)
+)
+UI_DUMP_BYTES = Histogram(
+    "logitech_ui_dump_bytes",
+    "Size of retrieved UI hierarchy dumps.",
+    buckets=(1024, 4096, 16384, 65536, 262144, 1048576),
+)
+UI_PARSE_SECONDS = Histogram(
+    "logitech_ui_parse_seconds",
+    "Time spent parsing UI hierarchy dumps.",
+    ("operation",),
+    buckets=(0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.1),
+)
+SLEEP_SECONDS = Counter(
+    "logitech_sleep_seconds_total",
+    "Time spent sleeping while waiting for the UI.",
+    ("reason",),
+)
+SCREENSHOT_BYTES = Counter(
+    "logitech_screenshot_bytes_total", "Bytes of screenshots pulled from the device."
+)
+RETRIES = Counter(
+    "logitech_retries_total", "Repeated device interactions.", ("operation",)
+)
+
+
+def render() -> str:
+    """
+    Render all registered metrics in the Prometheus text exposition format.
+
+    :returns: The exposition text.
+    :rtype: str
+    """
+    lines = []
+    for metric in REGISTRY:
+        lines.append(f"# HELP {metric.name} {metric.documentation}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        lines.extend(metric.samples())
+    return "\n".join(lines) + "\n"
+
+
+def write_textfile(path: Path) -> None:
+    """
+    Atomically write the metrics for the node_exporter textfile collector and enable metrics.
+
+    :param path: Destination ``*.prom`` file.
+    :type path: pathlib.Path
+    :returns: None
+    """
+    enable()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temporary = path.with_name(f".{path.name}.{os.getpid()}")
+    temporary.write_text(render())
+    os.replace(temporary, path)
+
+
+def start_http_server(port: int, address: str = "127.0.0.1"):
+    """
+    Serve ``/metrics`` from a background thread and enable metrics.
+
+    :param port: Port to listen on, 0 picks a free one.
+    :type port: int
+    :param address: Address to bind to.
+    :type address: str, optional
+    :returns: The running server; call ``shutdown()`` to stop it.
+    :rtype: http.server.ThreadingHTTPServer
+    """
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = render().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", CONTENT_TYPE)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format: str, *args) -> None:
+            pass
+
+    enable()
+    server = ThreadingHTTPServer((address, port), MetricsHandler)
+    threading.Thread(
+        target=server.serve_forever, name="metrics-server", daemon=True
+    ).start()
+    return server
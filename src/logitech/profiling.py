@@ -0,0 +1,257 @@
+from __future__ import annotations
+
+import cProfile
+import pstats
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+from . import logger as logger_module
+from .logger import configure_logger
+
+LOGGER = configure_logger("profiling")
+
+MODES = ("sampling", "cprofile")
+
+
+def frame_name(code) -> str:
+    """
+    Name a code object as ``<module file stem>:<qualified name>``.
+
+    :param code: Code object of a frame.
+    :type code: types.CodeType
+    :returns: The frame name, free of the ``;`` collapsed-stack separator.
+    :rtype: str
+    """
+    return f"{Path(code.co_filename).stem}:{code.co_qualname}".replace(";", ":")
+
+
+class StackSampler:
+    """Background thread sampling the Python stack of one thread at a fixed interval."""
+
+    def __init__(self, thread_id: int, interval: float = 0.005) -> None:
+        """
+        Initialize the sampler.
+
+        :param thread_id: Identifier of the sampled thread, see ``threading.get_ident``.
+        :type thread_id: int
+        :param interval: Seconds between samples.
+        :type interval: float, optional
+        """
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: Counter[tuple[str, ...]] = Counter()
+        self._stopping = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        """
+        Start sampling.
+
+        :returns: None
+        """
+        self._stopping.clear()
+        self._thread = threading.Thread(
+            target=self._sample, name="stack-sampler", daemon=True
+        )
+        self._thread.start()
+
+    def _sample(self) -> None:
+        while not self._stopping.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                stack.append(frame_name(frame.f_code))
+                frame = frame.f_back
+            if stack:
+                self.stacks[tuple(reversed(stack))] += 1
+
+    def stop(self) -> Counter[tuple[str, ...]]:
+        """
+        Stop sampling.
+
+        :returns: Number of samples per stack, outermost frame first.
+        :rtype: collections.Counter[tuple[str, ...]]
+        """
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        return self.stacks
+
+
+class RunProfiler:
+    """
+    Profile every test or scenario of a run and summarize where the time went.
+
+    In ``sampling`` mode the test's thread is sampled, and ``<test>.collapsed`` holds the
+    stacks in the collapsed format of ``flamegraph.pl`` and speedscope. In ``cprofile`` mode
+    every call is traced and ``<test>.prof`` holds the :mod:`pstats` data (e.g. for snakeviz
+    or flameprof). Self time per function is summed over the run in both modes.
+    """
+
+    def __init__(
+        self,
+        directory: Path | None = None,
+        mode: str = "sampling",
+        interval: float = 0.005,
+    ) -> None:
+        """
+        Initialize the profiler.
+
+        :param directory: Directory of the profiles, defaults to ``logs/profiles/<YYYYMMDD_HHMMSS>``.
+        :type directory: pathlib.Path or None, optional
+        :param mode: ``"sampling"`` or ``"cprofile"``.
+        :type mode: str, optional
+        :param interval: Seconds between samples in ``sampling`` mode.
+        :type interval: float, optional
+        :raises ValueError: If the mode is unknown.
+        """
+        if mode not in MODES:
+            raise ValueError(f"Unknown profiling mode: {mode}")
+        if directory is None:
+            run_id = datetime.now().strftime("%Y%m%d_%H%M%S")
+            directory = logger_module.LOG_DIR / "profiles" / run_id
+        self.directory = directory
+        self.mode = mode
+        self.interval = interval
+        self.self_time: Counter[str] = Counter()
+        self.test_time: dict[str, float] = {}
+        self._active: StackSampler | cProfile.Profile | None = None
+        self._started = 0.0
+
+    def start(self) -> None:
+        """
+        Start profiling the calling thread, e.g. at the start of a test.
+
+        :returns: None
+        """
+        self._started = time.perf_counter()
+        if self.mode == "sampling":
+            self._active = StackSampler(threading.get_ident(), self.interval)
+            self._active.start()
+        else:
+            self._active = cProfile.Profile()
+            self._active.enable()
+
+    def stop(self, test_id: str) -> Path | None:
+        """
+        Stop profiling and save the profile of a test.
+
+        :param test_id: Test node id or scenario name, used as the file name.
+        :type test_id: str
+        :returns: Path of the saved profile, None if profiling was not started.
+        :rtype: pathlib.Path or None
+        """
+        if self._active is None:
+            return None
+        profiler, self._active = self._active, None
+        self.test_time[test_id] = time.perf_counter() - self._started
+        self.directory.mkdir(parents=True, exist_ok=True)
+        file_name = re.sub(r"[^\w.-]+", "_", test_id)
+        if isinstance(profiler, StackSampler):
+            stacks = profiler.stop()
+            path = self.directory / f"{file_name}.collapsed"
+            path.write_text(
+                "".join(
+                    f"{';'.join(stack)} {count}\n" for stack, count in stacks.items()
+                )
+            )
+            for stack, count in stacks.items():
+                self.self_time[stack[-1]] += count * self.interval
+        else:
+            profiler.disable()
+            path = self.directory / f"{file_name}.prof"
+            profiler.dump_stats(path)
+            stats = pstats.Stats(profiler)
+            for (filename, line, function), entry in stats.stats.items():
+                name = f"{Path(filename).stem}:{function}" if line else function
+                self.self_time[name] += entry[2]
+        LOGGER.debug(f"Saved profile of '{test_id}' to {path}")
+        return path
+
+    def top_functions(self, count: int = 20) -> list[tuple[str, float, float]]:
+        """
+        Get the functions with the most self time over the run.
+
+        :param count: Number of functions returned.
+        :type count: int, optional
+        :returns: ``(function, self seconds, share of the profiled time)`` tuples.
+        :rtype: list[tuple[str, float, float]]
+        """
+        total = sum(self.test_time.values()) or 1.0
+        return [
+            (name, seconds, seconds / total)
+            for name, seconds in self.self_time.most_common(count)
+        ]
+
+    def summary(self, count: int = 20) -> list[str]:
+        """
+        Describe the top self-time functions for a report.
+
+        :param count: Number of functions listed.
+        :type count: int, optional
+        :returns: Report lines.
+        :rtype: list[str]
+        """
+        lines = [
+            f"{len(self.test_time)} tests profiled ({self.mode}) in {self.directory}",
+            f"{'self s':>9} {'share':>6}  function",
+        ]
+        lines.extend(
+            f"{seconds:9.3f} {share:6.1%}  {name}"
+            for name, seconds, share in self.top_functions(count)
+        )
+        return lines
+
+    def write_summary(self, count: int = 50) -> Path:
+        """
+        Save the top self-time functions as ``summary.txt`` next to the profiles.
+
+        :param count: Number of functions listed.
+        :type count: int, optional
+        :returns: Path of the summary.
+        :rtype: pathlib.Path
+        """
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self.directory / "summary.txt"
+        path.write_text("\n".join(self.summary(count)) + "\n")
+        return path
+
+
+class ProfilingPlugin:
+    """Pytest plugin profiling every test (setup, call and teardown)."""
+
+    def __init__(self, profiler: RunProfiler) -> None:
+        """
+        Initialize the plugin.
+
+        :param profiler: The profiler of the run.
+        :type profiler: RunProfiler
+        """
+        self.profiler = profiler
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_protocol(self, item: pytest.Item, nextitem: pytest.Item | None):
+        self.profiler.start()
+        try:
+            yield
+        finally:
+            self.profiler.stop(item.nodeid)
+
+    def pytest_sessionfinish(self, session: pytest.Session) -> None:
+        if self.profiler.test_time:
+            self.profiler.write_summary()
+
+    def pytest_terminal_summary(self, terminalreporter) -> None:
+        if not self.profiler.test_time:
+            return
+        terminalreporter.write_sep("-", "top self time")
+        for line in self.profiler.summary(15):
+            terminalreporter.write_line(line)
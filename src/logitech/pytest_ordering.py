@@ -0,0 +1,184 @@
+from __future__ import annotations
+
+import json
+import os
+import statistics
+from collections.abc import Sequence
+from pathlib import Path
+
+import pytest
+
+from .logger import configure_logger
+
+LOGGER = configure_logger("pytest_ordering")
+
+
+def state_key(item: pytest.Item) -> tuple[str, ...]:
+    """
+    Describe the app state a test needs, so tests sharing it run back to back.
+
+    An ``app_state`` marker names the state explicitly; otherwise the test's non
+    function-scoped fixtures (e.g. the launched ``calculator_app``) define it.
+
+    :param item: The collected test.
+    :type item: pytest.Item
+    :returns: The grouping key.
+    :rtype: tuple[str, ...]
+    """
+    marker = item.get_closest_marker("app_state")
+    if marker is not None:
+        return (str(marker.args[0]),)
+    fixture_info = getattr(item, "_fixtureinfo", None)
+    if fixture_info is None:
+        return ()
+    return tuple(
+        sorted(
+            name
+            for name, definitions in fixture_info.name2fixturedefs.items()
+            if definitions and definitions[-1].scope != "function"
+        )
+    )
+
+
+class DurationOrdering:
+    """
+    Pytest plugin ordering tests by recorded durations.
+
+    Phase durations of every test are smoothed across runs and stored in a JSON file. On the
+    next run, tests needing the same app state are grouped, so the state is set up once
+    per group. Groups and the tests inside them are scheduled longest first. Optionally,
+    ``smoke``-marked tests run first, cheapest first, and the session stops at the first
+    smoke failure.
+    """
+
+    def __init__(
+        self,
+        durations_file: Path,
+        smoke_fail_fast: bool = False,
+        smoothing: float = 0.5,
+    ) -> None:
+        """
+        Initialize the plugin.
+
+        :param durations_file: JSON file the durations are loaded from and saved to.
+        :type durations_file: pathlib.Path
+        :param smoke_fail_fast: Run smoke tests first and stop at the first smoke failure.
+        :type smoke_fail_fast: bool, optional
+        :param smoothing: Weight of the latest run in the smoothed durations.
+        :type smoothing: float, optional
+        """
+        self.durations_file = durations_file
+        self.smoke_fail_fast = smoke_fail_fast
+        self.smoothing = smoothing
+        self.durations: dict[str, dict[str, float]] = {}
+        if durations_file.exists():
+            self.durations = json.loads(durations_file.read_text())
+        self.measured: dict[str, dict[str, float]] = {}
+        self.smoke_ids: set[str] = set()
+        self.session: pytest.Session | None = None
+
+    def cost(self, nodeid: str, default: float) -> float:
+        """
+        Get the recorded duration of a test, summed over its phases.
+
+        :param nodeid: The test node id.
+        :type nodeid: str
+        :param default: Duration assumed for a test without records.
+        :type default: float
+        :returns: Duration in seconds.
+        :rtype: float
+        """
+        phases = self.durations.get(nodeid)
+        return default if phases is None else sum(phases.values())
+
+    def order(self, items: Sequence[pytest.Item]) -> list[pytest.Item]:
+        """
+        Order tests: smoke tests cheapest first (if enabled), then grouped by app state.
+
+        :param items: The collected tests.
+        :type items: Sequence[pytest.Item]
+        :returns: The reordered tests.
+        :rtype: list[pytest.Item]
+        """
+        known = [
+            self.cost(item.nodeid, 0.0)
+            for item in items
+            if item.nodeid in self.durations
+        ]
+        # Unknown tests are assumed typical, so new tests neither jump ahead nor trail
+        default = statistics.median(known) if known else 0.0
+
+        smoke = []
+        if self.smoke_fail_fast:
+            smoke = sorted(
+                (item for item in items if item.get_closest_marker("smoke")),
+                key=lambda item: self.cost(item.nodeid, default),
+            )
+            self.smoke_ids = {item.nodeid for item in smoke}
+
+        groups: dict[tuple[str, ...], list[pytest.Item]] = {}
+        for item in items:
+            if item.nodeid not in self.smoke_ids:
+                groups.setdefault(state_key(item), []).append(item)
+        for group in groups.values():
+            group.sort(key=lambda item: -self.cost(item.nodeid, default))
+        ordered_groups = sorted(
+            groups.values(),
+            key=lambda group: -sum(self.cost(item.nodeid, default) for item in group),
+        )
+        return smoke + [item for group in ordered_groups for item in group]
+
+    def pytest_sessionstart(self, session: pytest.Session) -> None:
+        self.session = session
+
+    @pytest.hookimpl(trylast=True)
+    def pytest_collection_modifyitems(
+        self, session: pytest.Session, config: pytest.Config, items: list[pytest.Item]
+    ) -> None:
+        items[:] = self.order(items)
+
+    def pytest_runtest_logreport(self, report: pytest.TestReport) -> None:
+        self.measured.setdefault(report.nodeid, {})[report.when] = report.duration
+        if (
+            report.failed
+            and report.nodeid in self.smoke_ids
+            and self.session is not None
+        ):
+            self.session.shouldstop = f"smoke test failed: {report.nodeid}"
+
+    def pytest_sessionfinish(self, session: pytest.Session) -> None:
+        for nodeid, phases in self.measured.items():
+            previous = self.durations.get(nodeid, {})
+            self.durations[nodeid] = {
+                phase: (
+                    duration
+                    if phase not in previous
+                    else self.smoothing * duration
+                    + (1 - self.smoothing) * previous[phase]
+                )
+                for phase, duration in phases.items()
+            }
+        self.durations_file.parent.mkdir(parents=True, exist_ok=True)
+        temporary = self.durations_file.with_name(
+            f".{self.durations_file.name}.{os.getpid()}"
+        )
+        temporary.write_text(json.dumps(self.durations, indent=1, sort_keys=True))
+        os.replace(temporary, self.durations_file)
+        LOGGER.debug(
+            f"Saved durations of {len(self.measured)} tests to {self.durations_file}"
+        )
+
+    def pytest_terminal_summary(self, terminalreporter) -> None:
+        if not self.measured or self.session is None:
+            return
+        setup_costs: dict[tuple[str, ...], float] = {}
+        for item in self.session.items:
+            setup = self.measured.get(item.nodeid, {}).get("setup", 0.0)
+            key = state_key(item)
+            setup_costs[key] = setup_costs.get(key, 0.0) + setup
+        if setup_costs:
+            terminalreporter.write_sep("-", "setup time by app state")
+            for key, setup in sorted(setup_costs.items(), key=lambda entry: -entry[1]):
+                terminalreporter.write_line(
+                    f"{setup:8.2f}s  {', '.join(key) or '<none>'}"
+                )
@@ -0,0 +1,319 @@
+from __future__ import annotations
+
+import argparse
+import bisect
+import json
+import logging
+import os
+import sys
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from pathlib import Path
+
+from . import logger as logger_module
+
+EVENTS_FILE = "events.jsonl"
+INDEX_FILE = "index.json"
+
+# Every CHECKPOINT_INTERVAL-th record is added to the time index
+CHECKPOINT_INTERVAL = 256
+
+_test_id: ContextVar[str | None] = ContextVar("log_test_id", default=None)
+_span_id: ContextVar[str | None] = ContextVar("log_span_id", default=None)
+_device_serial: str | None = os.environ.get("ANDROID_SERIAL")
+_handler: StructuredLogHandler | None = None
+
+
+def set_device(serial: str | None) -> None:
+    """
+    Set the device serial attached to every structured record of the process.
+
+    :param serial: Serial number of the device under test.
+    :type serial: str or None
+    :returns: None
+    """
+    global _device_serial
+    _device_serial = serial
+
+
+@contextmanager
+def log_context(test_id: str) -> Iterator[None]:
+    """
+    Attach a test id (and a root span) to the records logged inside the block.
+
+    :param test_id: Test node id or scenario name.
+    :type test_id: str
+    """
+    test_token = _test_id.set(test_id)
+    span_token = _span_id.set(os.urandom(8).hex())
+    try:
+        yield
+    finally:
+        _span_id.reset(span_token)
+        _test_id.reset(test_token)
+
+
+@contextmanager
+def span() -> Iterator[str]:
+    """
+    Give the records logged inside the block a new span id.
+
+    :returns: The span id.
+    :rtype: str
+    """
+    span_id = os.urandom(8).hex()
+    token = _span_id.set(span_id)
+    try:
+        yield span_id
+    finally:
+        _span_id.reset(token)
+
+
+class StructuredLogHandler(logging.Handler):
+    """
+    Write records of the framework loggers as compact JSON lines with a per-run index.
+
+    ``index.json`` holds, per test id, the byte range of ``events.jsonl`` containing its
+    records, and a sparse ``[timestamp, offset]`` checkpoint list for time range lookups.
+    """
+
+    def __init__(self, directory: Path) -> None:
+        """
+        Initialize the handler; the files are created on the first record.
+
+        :param directory: Run directory holding ``events.jsonl`` and ``index.json``.
+        :type directory: pathlib.Path
+        """
+        super().__init__(logging.DEBUG)
+        self.directory = directory
+        self._file = None
+        self._records = 0
+        self.tests: dict[str, list] = {}
+        self.checkpoints: list[list] = []
+
+    def emit(self, record: logging.LogRecord) -> None:
+        if record.name not in logger_module.configured_loggers:
+            return
+        if self._file is None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            self._file = open(self.directory / EVENTS_FILE, "ab")
+        entry = {
+            "ts": round(record.created, 6),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        test_id = _test_id.get()
+        if test_id is not None:
+            entry["test"] = test_id
+        span_id = _span_id.get()
+        if span_id is not None:
+            entry["span"] = span_id
+        if _device_serial is not None:
+            entry["device"] = _device_serial
+        if record.exc_info:
+            entry["exc"] = logging.Formatter().formatException(record.exc_info)
+        line = json.dumps(entry, separators=(",", ":")).encode() + b"\n"
+
+        offset = self._file.tell()
+        self._file.write(line)
+        self._file.flush()
+        end = offset + len(line)
+        if self._records % CHECKPOINT_INTERVAL == 0:
+            self.checkpoints.append([entry["ts"], offset])
+        self._records += 1
+        if test_id is not None:
+            extent = self.tests.get(test_id)
+            if extent is None:
+                self.tests[test_id] = [offset, end, entry["ts"], entry["ts"], 1]
+            else:
+                extent[1], extent[3], extent[4] = end, entry["ts"], extent[4] + 1
+
+    def write_index(self) -> None:
+        """
+        Save ``index.json`` for the records written so far.
+
+        :returns: None
+        """
+        with self.lock:
+            if self._file is None:
+                return
+            index = {"tests": self.tests, "checkpoints": self.checkpoints}
+            temporary = self.directory / f".{INDEX_FILE}.{os.getpid()}"
+            temporary.write_text(json.dumps(index, separators=(",", ":")))
+            os.replace(temporary, self.directory / INDEX_FILE)
+
+    def close(self) -> None:
+        self.write_index()
+        with self.lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+        super().close()
+
+
+def enable_structured_logging(directory: Path | None = None) -> StructuredLogHandler:
+    """
+    Additionally write all framework loggers to a per-run structured log.
+
+    Calling it again returns the already installed handler.
+
+    :param directory: Run directory, defaults to ``logs/structured/<YYYYMMDD_HHMMSS>``.
+    :type directory: pathlib.Path or None, optional
+    :returns: The installed handler.
+    :rtype: StructuredLogHandler
+    """
+    global _handler
+    if _handler is None:
+        if directory is None:
+            run_id = datetime.now().strftime("%Y%m%d_%H%M%S")
+            directory = logger_module.LOG_DIR / "structured" / run_id
+        _handler = StructuredLogHandler(directory)
+        # Framework loggers propagate to the root logger; records of others are skipped
+        logging.getLogger().addHandler(_handler)
+    return _handler
+
+
+def disable_structured_logging() -> None:
+    """
+    Remove the structured log handler, writing its index.
+
+    :returns: None
+    """
+    global _handler
+    if _handler is not None:
+        logging.getLogger().removeHandler(_handler)
+        _handler.close()
+        _handler = None
+
+
+class StructuredLogReader:
+    """Look up records of a structured run log by test id or time range."""
+
+    def __init__(self, directory: Path) -> None:
+        """
+        Open a run log, rebuilding its index if the run did not shut down cleanly.
+
+        :param directory: Run directory holding ``events.jsonl``.
+        :type directory: pathlib.Path
+        """
+        self.events_file = directory / EVENTS_FILE
+        index_file = directory / INDEX_FILE
+        if index_file.exists():
+            index = json.loads(index_file.read_text())
+            self.tests, self.checkpoints = index["tests"], index["checkpoints"]
+        else:
+            self.tests, self.checkpoints = self._build_index()
+
+    def _build_index(self) -> tuple[dict[str, list], list[list]]:
+        tests: dict[str, list] = {}
+        checkpoints: list[list] = []
+        offset = 0
+        with open(self.events_file, "rb") as file:
+            for number, line in enumerate(file):
+                entry = json.loads(line)
+                end = offset + len(line)
+                if number % CHECKPOINT_INTERVAL == 0:
+                    checkpoints.append([entry["ts"], offset])
+                test_id = entry.get("test")
+                if test_id is not None:
+                    extent = tests.setdefault(
+                        test_id, [offset, end, entry["ts"], entry["ts"], 0]
+                    )
+                    extent[1], extent[3], extent[4] = end, entry["ts"], extent[4] + 1
+                offset = end
+        return tests, checkpoints
+
+    def _read(self, start: int) -> Iterator[dict]:
+        with open(self.events_file, "rb") as file:
+            file.seek(start)
+            for line in file:
+                yield json.loads(line)
+
+    def for_test(self, test_id: str) -> list[dict]:
+        """
+        Get the records logged while a test ran.
+
+        :param test_id: Test node id or scenario name.
+        :type test_id: str
+        :returns: The records, in logged order.
+        :rtype: list[dict]
+        """
+        extent = self.tests.get(test_id)
+        if extent is None:
+            return []
+        return [
+            entry
+            for entry in self._read_range(extent[0], extent[1])
+            if entry.get("test") == test_id
+        ]
+
+    def _read_range(self, start: int, end: int) -> Iterator[dict]:
+        with open(self.events_file, "rb") as file:
+            file.seek(start)
+            data = file.read(end - start)
+        for line in data.splitlines():
+            yield json.loads(line)
+
+    def between(self, start: float, end: float) -> list[dict]:
+        """
+        Get the records logged within a time range.
+
+        :param start: Range start, as a Unix timestamp.
+        :type start: float
+        :param end: Range end, as a Unix timestamp.
+        :type end: float
+        :returns: The records, in logged order.
+        :rtype: list[dict]
+        """
+        # Start one checkpoint earlier, records of concurrent threads may be slightly out of order
+        position = bisect.bisect_left([ts for ts, _ in self.checkpoints], start) - 1
+        offset = self.checkpoints[max(position, 0)][1] if self.checkpoints else 0
+        records = []
+        for entry in self._read(offset):
+            if entry["ts"] > end + 1:
+                break
+            if start <= entry["ts"] <= end:
+                records.append(entry)
+        return records
+
+
+def main(argv: list[str] | None = None) -> int:
+    """
+    Command line entry point printing records of a structured run log.
+
+    :param argv: Command line arguments. Defaults to ``sys.argv[1:]``.
+    :type argv: list[str] or None, optional
+    :returns: 0
+    :rtype: int
+    """
+    parser = argparse.ArgumentParser(description="Query a structured run log.")
+    parser.add_argument(
+        "run", type=Path, help="Run directory, e.g. logs/structured/<run>."
+    )
+    query = parser.add_mutually_exclusive_group(required=True)
+    query.add_argument("--test", help="Print the records of one test.")
+    query.add_argument(
+        "--between",
+        nargs=2,
+        type=float,
+        metavar=("START", "END"),
+        help="Unix timestamps.",
+    )
+    query.add_argument("--tests", action="store_true", help="List the logged tests.")
+    args = parser.parse_args(argv)
+    reader = StructuredLogReader(args.run)
+    if args.tests:
+        for test_id, (_, _, first, last, count) in reader.tests.items():
+            print(f"{count:6d}  {last - first:8.2f}s  {test_id}")
+        return 0
+    records = reader.for_test(args.test) if args.test else reader.between(*args.between)
+    for entry in records:
+        print(json.dumps(entry))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
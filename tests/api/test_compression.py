@@ -0,0 +1,102 @@
+import gzip
+
+import pytest
+from werkzeug.http import parse_accept_header
+
+from logitech.api import compression, mock_api
+from logitech.api.compression import ResponseCompressor
+from logitech.api.user_store import UserStore
+
+
+@pytest.fixture
+def many_users(monkeypatch):
+    users = [
+        {"id": number, "name": f"User {number}", "email": f"user{number}@example.com"}
+        for number in range(1, 501)
+    ]
+    monkeypatch.setattr(mock_api, "store", UserStore(users))
+    monkeypatch.setattr(mock_api, "compressor", ResponseCompressor())
+    return users
+
+
+def accept(header):
+    return parse_accept_header(header)
+
+
+def test_large_listing_is_gzip_compressed(many_users):
+    client = mock_api.app.test_client()
+    response = client.get("/users", headers={"Accept-Encoding": "gzip, deflate"})
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["Vary"]
+    assert int(response.headers["Content-Length"]) == len(response.data)
+    plain = gzip.decompress(response.data)
+    assert len(response.data) < len(plain) / 4
+    assert mock_api.app.json.loads(plain) == many_users
+
+
+def test_unchanged_listing_is_serialized_and_compressed_once(many_users, mocker):
+    jsonify = mocker.spy(mock_api, "jsonify")
+    client = mock_api.app.test_client()
+    responses = [
+        client.get("/users", headers={"Accept-Encoding": "gzip"}) for _ in range(3)
+    ]
+    assert (mock_api.compressor.misses, mock_api.compressor.hits) == (1, 2)
+    assert jsonify.call_count == 1
+    assert responses[2].headers["Content-Encoding"] == "gzip"
+    assert responses[2].mimetype == "application/json"
+    assert responses[2].data == responses[0].data
+
+    client.post("/users", json={"name": "New", "email": "new@example.com"})
+    response = client.get("/users", headers={"Accept-Encoding": "gzip"})
+    assert mock_api.compressor.misses == 2
+    assert mock_api.app.json.loads(gzip.decompress(response.data))[-1]["name"] == "New"
+
+
+def test_small_or_unaccepted_bodies_are_sent_uncompressed(many_users):
+    client = mock_api.app.test_client()
+    assert "Content-Encoding" not in client.get("/users").headers
+    small = client.get("/users/1", headers={"Accept-Encoding": "gzip"})
+    assert "Content-Encoding" not in small.headers
+    assert small.json["id"] == 1
+
+
+def test_negotiation_respects_quality_values(monkeypatch):
+    monkeypatch.setattr(compression, "brotli", object())
+    compressor = ResponseCompressor()
+    assert compressor.negotiate(accept("gzip, br")) == "br"
+    assert compressor.negotiate(accept("gzip, br;q=0.5")) == "gzip"
+    assert compressor.negotiate(accept("br;q=0, gzip")) == "gzip"
+    assert compressor.negotiate(accept("identity")) is None
+    assert compressor.negotiate(accept("*")) == "br"
+
+
+def test_brotli_is_not_offered_without_the_package(monkeypatch):
+    monkeypatch.setattr(compression, "brotli", None)
+    assert ResponseCompressor().negotiate(accept("br, gzip;q=0.1")) == "gzip"
+
+
+def test_compressible_types_and_threshold():
+    compressor = ResponseCompressor(threshold=100)
+    assert compressor.compressible("application/json", 100)
+    assert compressor.compressible("text/html", 500)
+    assert not compressor.compressible("application/json", 99)
+    assert not compressor.compressible("image/png", 500)
+
+
+def test_cache_keeps_the_newest_bodies():
+    compressor = ResponseCompressor(cache_size=2)
+    for body in (b"a" * 2000, b"b" * 2000, b"c" * 2000, b"a" * 2000):
+        compressor.compress(body, "gzip")
+    assert (compressor.misses, compressor.hits) == (4, 0)
+    compressor.compress(b"c" * 2000, "gzip")
+    assert compressor.hits == 1
+
+
+def test_cache_by_version():
+    compressor = ResponseCompressor()
+    assert compressor.cached(1, "gzip") is None
+    compressed = compressor.compress(b"a" * 2000, "gzip", version=1)
+    assert compressor.cached(1, "gzip") == compressed
+    assert compressor.cached(1, "br") is None
+    assert compressor.compress(b"b" * 2000, "gzip", version=1) == compressed
+    assert (compressor.misses, compressor.hits) == (1, 2)
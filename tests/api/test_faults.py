@@ -0,0 +1,134 @@
+import random
+import time
+
+import pytest
+
+from logitech.api import mock_api
+from logitech.api.faults import FaultModel, Latency, RouteFaults, throttle
+
+
+@pytest.fixture
+def client():
+    client = mock_api.app.test_client()
+    yield client
+    client.delete("/admin/faults")
+
+
+def test_no_faults_by_default(client):
+    assert client.get("/admin/faults").json == {"seed": None, "routes": {}}
+    assert client.get("/users").status_code == 200
+    assert client.get("/users/999").status_code == 500
+
+
+def test_admin_endpoint_replaces_and_resets_settings(client):
+    settings = {
+        "seed": 1,
+        "routes": {"GET /users": {"error_ratio": 1.0, "error_status": 502}},
+    }
+    response = client.put("/admin/faults", json=settings)
+    assert response.status_code == 200
+    assert response.json["routes"]["GET /users"]["error_status"] == 502
+
+    assert client.get("/users").status_code == 502
+    assert client.get("/users/1").status_code == 200
+    assert client.get("/admin/faults").status_code == 200
+
+    client.delete("/admin/faults")
+    assert client.get("/users").status_code == 200
+
+
+@pytest.mark.parametrize(
+    "settings",
+    [
+        {"routes": {"*": {"error_ratio": 2}}},
+        {"routes": {"*": {"latency": {"distribution": "zipf"}}}},
+        {"routes": {"*": {"unknown": 1}}},
+        {"sede": 1},
+    ],
+)
+def test_admin_endpoint_rejects_invalid_settings(client, settings):
+    response = client.put("/admin/faults", json=settings)
+    assert response.status_code == 400
+    assert response.json["error"].startswith("Invalid fault settings")
+
+
+def test_rate_limit_returns_429_with_retry_after(client):
+    client.put(
+        "/admin/faults",
+        json={"routes": {"/users": {"rate_limit": 2, "rate_period": 60}}},
+    )
+    assert client.get("/users").status_code == 200
+    assert client.get("/users").status_code == 200
+    limited = client.get("/users")
+    assert limited.status_code == 429
+    assert int(limited.headers["Retry-After"]) == 30
+
+
+def test_connection_drop_without_server_socket_aborts_the_body(client):
+    client.put("/admin/faults", json={"routes": {"*": {"drop_ratio": 1.0}}})
+    response = client.get("/users")
+    assert response.headers["Content-Length"] == "2"
+    with pytest.raises(ConnectionAbortedError):
+        response.get_data()
+
+
+def test_latency_delays_the_response(client):
+    client.put(
+        "/admin/faults",
+        json={"routes": {"GET /users/<int:user_id>": {"latency": {"a": 0.05}}}},
+    )
+    started = time.monotonic()
+    assert client.get("/users/1").status_code == 200
+    assert time.monotonic() - started >= 0.05
+
+
+def test_bandwidth_throttles_the_body(client):
+    client.put("/admin/faults", json={"routes": {"GET /users": {"bandwidth": 1000}}})
+    started = time.monotonic()
+    response = client.get("/users")
+    elapsed = time.monotonic() - started
+    assert response.json == mock_api.store.users
+    assert elapsed >= len(response.data) / 1000 * 0.9
+
+
+def test_seed_makes_faults_reproducible():
+    settings = {
+        "seed": 7,
+        "routes": {
+            "*": {
+                "error_ratio": 0.5,
+                "latency": {"distribution": "exponential", "a": 0.1},
+            }
+        },
+    }
+    models = [FaultModel.from_dict(settings) for _ in range(2)]
+    decisions = [[model.decide("GET", "/users") for _ in range(20)] for model in models]
+    assert decisions[0] == decisions[1]
+    assert {decision.error_status for decision in decisions[0]} == {None, 503}
+
+
+def test_most_specific_route_wins():
+    model = FaultModel(
+        {
+            "*": RouteFaults(error_ratio=1),
+            "/users": RouteFaults(),
+            "POST /users": RouteFaults(drop_ratio=1),
+        }
+    )
+    assert model.route("GET", "/users")[0] == "/users"
+    assert model.route("POST", "/users")[0] == "POST /users"
+    assert model.route("GET", "/users/<int:user_id>")[0] == "*"
+
+
+@pytest.mark.parametrize(
+    "distribution", ["fixed", "uniform", "normal", "lognormal", "exponential"]
+)
+def test_latency_samples_are_not_negative(distribution):
+    rng = random.Random(0)
+    latency = Latency(distribution, -1.0 if distribution == "fixed" else 0.1, 0.5)
+    assert all(latency.sample(rng) >= 0 for _ in range(100))
+
+
+def test_throttle_keeps_the_body():
+    body = bytes(range(256)) * 10
+    assert b"".join(throttle(body, 100_000)) == body
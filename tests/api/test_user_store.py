@@ -0,0 +1,113 @@
+import time
+
+import pytest
+
+from logitech.api import mock_api
+from logitech.api.user_store import DuplicateEmailError, UserStore
+
+
+@pytest.fixture
+def store():
+    return UserStore(
+        [
+            {"id": 1, "name": "Alice", "email": "alice@example.com"},
+            {"id": 2, "name": "Bob", "email": "bob@example.com"},
+            {"id": 3, "name": "alina", "email": "alina@example.com"},
+            {"id": 4, "name": "Al", "email": "al@example.com"},
+        ]
+    )
+
+
+@pytest.fixture
+def client(monkeypatch, store):
+    monkeypatch.setattr(mock_api, "store", store)
+    return mock_api.app.test_client()
+
+
+def test_lookup_by_id_and_email(store):
+    assert store.get(2)["name"] == "Bob"
+    assert store.get(99) is None
+    assert store.by_email("ALICE@example.com")["id"] == 1
+    assert store.by_email("nobody@example.com") is None
+
+
+def test_name_search_is_exact_or_prefix_and_ignores_case(store):
+    assert [user["id"] for user in store.by_name("al")] == [4]
+    assert [user["id"] for user in store.by_name("AL", prefix=True)] == [4, 1, 3]
+    assert [user["id"] for user in store.by_name("ali", prefix=True, limit=1)] == [1]
+    assert store.by_name("Zed", prefix=True) == []
+
+
+def test_added_users_are_indexed(store):
+    user = store.add("Alfred", "alfred@example.com")
+    assert user["id"] == 5
+    assert store.by_email("alfred@example.com") is user
+    assert [found["id"] for found in store.by_name("alf", prefix=True)] == [5]
+
+
+def test_version_changes_with_every_user(store):
+    version = store.version
+    store.add("Alfred", "alfred@example.com")
+    assert store.version > version
+    version = store.version
+    store.seed(2)
+    assert store.version > version
+    version = store.version
+    with pytest.raises(DuplicateEmailError):
+        store.add("Other Alice", "alice@example.com")
+    assert store.version == version
+
+
+def test_email_must_be_unique(store):
+    with pytest.raises(DuplicateEmailError):
+        store.add("Other Alice", "Alice@Example.com")
+    with pytest.raises(DuplicateEmailError):
+        store.extend([{"id": 5, "name": "Bobby", "email": "bob@example.com"}])
+    assert len(store) == 4
+
+
+def test_lookups_stay_fast_with_a_million_users():
+    store = UserStore()
+    store.seed(1_000_000)
+    started = time.perf_counter()
+    for number in range(1000):
+        assert store.by_email(f"user{number * 997 + 1}@example.com") is not None
+        assert store.by_name(f"User {number + 1}", prefix=True, limit=10)
+    assert (time.perf_counter() - started) / 1000 < 0.001
+
+
+def test_search_endpoint(client):
+    assert client.get("/users/search?email=bob@example.com").json[0]["id"] == 2
+    assert client.get("/users/search?email=nobody@example.com").json == []
+    assert [user["id"] for user in client.get("/users/search?name=alice").json] == [1]
+    prefixed = client.get("/users/search?name_prefix=al&limit=2").json
+    assert [user["id"] for user in prefixed] == [4, 1]
+
+
+@pytest.mark.parametrize("query", ["", "?email=a@example.com&name=Al", "?limit=3"])
+def test_search_endpoint_needs_exactly_one_criterion(client, query):
+    assert client.get(f"/users/search{query}").status_code == 400
+
+
+def test_create_user_with_taken_email_conflicts(client):
+    response = client.post("/users", json={"name": "Bobby", "email": "BOB@example.com"})
+    assert response.status_code == 409
+    assert response.json == {"error": "Email already exists"}
+
+
+def test_seed_endpoint(client):
+    assert client.post("/admin/users/seed", json={"count": 10}).json == {"users": 14}
+    assert client.get("/users/search?email=user14@example.com").json[0]["id"] == 14
+    assert client.post("/admin/users/seed", json={"count": "many"}).status_code == 400
+
+
+def test_adds_stay_fast_with_a_million_users():
+    store = UserStore()
+    store.seed(1_000_000)
+    store.by_name("User 1")
+    started = time.perf_counter()
+    for number in range(1000):
+        store.add(f"Added {999 - number}", f"added{number}@example.com")
+    assert (time.perf_counter() - started) / 1000 < 0.0001
+    added = store.by_name("added", prefix=True, limit=3)
+    assert [user["name"] for user in added] == ["Added 0", "Added 1", "Added 10"]
@@ -1,4 +1,22 @@
+import time
+from contextlib import ExitStack
+
+from logitech.buggy_calc.helpers.dump_archive import DumpArchive
+from logitech.buggy_calc.helpers.logcat import LogcatCollector
+from logitech.buggy_calc.helpers.screen_recorder import ScreenRecorder
+from logitech.buggy_calc.helpers.screenshot_store import ScreenshotStore
+from logitech.buggy_calc.helpers.timeouts import deadline
+from logitech.buggy_calc.helpers.ui_mirror import UIStateMirror
 from logitech.buggy_calc.pages.calculator import Calculator
+from logitech.buggy_calc.session import get_active_session
+from logitech.logger import LOG_DIR
+from logitech.memory_profile import MIB, MemoryMonitor
+from logitech.profiling import RunProfiler
+from logitech.structured_log import (
+    disable_structured_logging,
+    enable_structured_logging,
+    log_context,
+)
 
 PACKAGE_NAME = "com.admsqa.buggycalc"
 ACTIVITY_NAME = ".MainActivity"
@@ -6,22 +24,130 @@ ACTIVITY_NAME = ".MainActivity"
 
 def before_all(context):
     """Set up test environment before all scenarios."""
-    context.calculator = Calculator(PACKAGE_NAME, ACTIVITY_NAME)
-    context.calculator.launch_app()
+    # behave -D structured_logs=true: also write JSON lines logs under logs/structured/<run>
+    if context.config.userdata.getbool("structured_logs"):
+        enable_structured_logging()
+    context.session = get_active_session()
+    context.recorder = None
+    # behave -D memory_profile=true: snapshot memory around every scenario, optionally failing
+    # the run over -D memory_budget=<MiB>, -D handler_budget=<n> or -D fd_budget=<n>
+    context.memory = None
+    userdata = context.config.userdata
+    if userdata.getbool("memory_profile"):
+        memory_budget = userdata.getfloat("memory_budget", 0.0)
+        context.memory = MemoryMonitor(
+            budget=int(memory_budget * MIB) if memory_budget else None,
+            handler_budget=userdata.getint("handler_budget", None),
+            fd_budget=userdata.getint("fd_budget", None),
+        )
+        context.memory.start()
+    # behave -D profile=sampling|cprofile: profile every scenario under logs/profiles/<run>
+    context.profiler = None
+    if userdata.get("profile"):
+        context.profiler = RunProfiler(mode=userdata["profile"])
+    if context.session is not None:
+        context.calculator = context.session.calculator
+        context.logcat = context.session.logcat
+    else:
+        context.calculator = Calculator(PACKAGE_NAME, ACTIVITY_NAME)
+        context.calculator.adb.dump_archive = DumpArchive.for_run()
+        context.calculator.launch_app()
+        context.logcat = LogcatCollector(PACKAGE_NAME, adb=context.calculator.adb)
+        context.logcat.start()
+    # behave -D screenshot_format=webp: re-encode stored screenshots in the background
+    screenshot_format = context.config.userdata.get("screenshot_format")
+    if screenshot_format:
+        context.calculator.screenshot_store = ScreenshotStore(
+            LOG_DIR / "screenshots", reencode=screenshot_format
+        )
+    # behave -D ui_mirror=true: serve reads from a mirror fed by `uiautomator events`
+    if (
+        context.config.userdata.getbool("ui_mirror")
+        and context.calculator.ui_mirror is None
+    ):
+        context.calculator.ui_mirror = UIStateMirror(
+            PACKAGE_NAME, adb=context.calculator.adb
+        )
+        context.calculator.ui_mirror.start()
+    # behave -D record=true: record video continuously instead of per-scenario screenshots
+    if context.config.userdata.getbool("record"):
+        context.recorder = ScreenRecorder(adb=context.calculator.adb)
+        context.recorder.start()
 
 
 def before_scenario(context, scenario):
     """Set up before each scenario."""
-    context.calculator.clear_inputs()
+    context.scenario_scope = ExitStack()
+    context.scenario_scope.enter_context(log_context(scenario.name))
+    # behave -D adb_deadline=<seconds>: total time all ADB calls of a scenario may take
+    context.scenario_scope.enter_context(
+        deadline(context.config.userdata.getfloat("adb_deadline", 120.0))
+    )
+    context.logcat_mark = context.logcat.mark()
+    context.scenario_started = time.time()
+    if context.memory is not None:
+        context.memory.begin()
+    if context.profiler is not None:
+        context.profiler.start()
+    context.calculator.reset_app_state()
 
 
 def after_scenario(context, scenario):
-    """Save screenshot after each scenario"""
+    """Save screenshot (or the recorded clip of a failed scenario) after each scenario"""
     scenario_name = "_".join(scenario.name.split(' ')).lower()
-    context.calculator.save_screenshot(scenario_name)
+    try:
+        if context.recorder is None:
+            context.calculator.save_screenshot(scenario_name)
+        if scenario.status == "failed":
+            if context.recorder is not None:
+                context.recorder.save_clip(
+                    scenario_name,
+                    context.scenario_started,
+                    time.time(),
+                    LOG_DIR / "recordings",
+                )
+            context.logcat.save_since(
+                context.logcat_mark, scenario_name, LOG_DIR / "device" / "logcat"
+            )
+    finally:
+        # Release the scenario's ADB deadline even if it expired while saving artifacts,
+        # otherwise every later scenario would inherit it
+        context.scenario_scope.close()
+        if context.profiler is not None:
+            context.profiler.stop(scenario.name)
+        if context.memory is not None:
+            context.memory.end(scenario.name)
 
 
 def after_all(context):
     """Clean up after all scenarios."""
-    if hasattr(context, "calculator"):
-        context.calculator.close_app()
+    if (
+        getattr(context, "calculator", None) is not None
+        and context.calculator.screenshot_store
+    ):
+        context.calculator.screenshot_store.flush()
+    if getattr(context, "recorder", None) is not None:
+        context.recorder.stop()
+    if (
+        getattr(context, "calculator", None) is not None
+        and context.calculator.ui_mirror
+    ):
+        context.calculator.ui_mirror.stop()
+        context.calculator.ui_mirror = None
+    if context.config.userdata.getbool("structured_logs"):
+        disable_structured_logging()
+    if getattr(context, "session", None) is None:
+        if hasattr(context, "logcat"):
+            context.logcat.stop()
+        if hasattr(context, "calculator"):
+            context.calculator.close_app()
+            context.calculator.adb.dump_archive.close()
+    if getattr(context, "profiler", None) is not None and context.profiler.test_time:
+        print("\n".join(context.profiler.summary(15)))
+        context.profiler.write_summary()
+    if getattr(context, "memory", None) is not None:
+        context.memory.write_report(LOG_DIR / "memory" / "behave.json")
+        context.memory.stop()
+        violations = context.memory.violations()
+        # A failing after_all hook fails the run
+        assert not violations, "Memory budget exceeded: " + "; ".join(violations)
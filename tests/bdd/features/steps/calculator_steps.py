@@ -1,5 +1,7 @@
 from behave import given, then, when
 
+from logitech.buggy_calc.helpers.exceptions import ResultTimeoutError
+
 
 @given("the calculator app is launched")
 def step_calculator_launched(context):
@@ -60,15 +62,11 @@ def step_tap_division(context):
 @when('I perform the operation "{first}" "{operation}" "{second}"')
 def step_perform_operation(context, operation, first, second):
     """Perform a complete calculation operation."""
-    context.calculator.clear_inputs()
-
-    if first != "None":
-        context.calculator.input_value(field_name="first_number", value=first)
-
-    if second != "None":
-        context.calculator.input_value(field_name="second_number", value=second)
-
-    context.calculator.tap_button(operation)
+    context.calculator.perform_calculation(
+        operation=operation,
+        input1=None if first == "None" else first,
+        input2=None if second == "None" else second,
+    )
 
 
 @then('I should see "{expected_text}"')
@@ -101,7 +99,12 @@ def step_verify_second_number_display(context, expected_value):
 @then('the result should be "{expected_result}"')
 def step_verify_result(context, expected_result):
     """Verify calculation result."""
-    actual_result = context.calculator.get_display_result()
+    try:
+        actual_result = context.calculator.await_display_result(
+            predicate=lambda value: value == expected_result
+        )
+    except ResultTimeoutError as e:
+        actual_result = e.last_value
     assert (
         actual_result == expected_result
     ), f"Expected result '{expected_result}' but got '{actual_result}'"
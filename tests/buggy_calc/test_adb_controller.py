@@ -3,6 +3,11 @@ import subprocess
 import pytest
 
 from logitech.buggy_calc.helpers.adb_controller import ADBController
+from logitech.buggy_calc.helpers.exceptions import (
+    DeadlineExceededError,
+    DeviceUnavailableError,
+)
+from logitech.buggy_calc.helpers.timeouts import deadline
 
 
 class TestADBController:
@@ -38,6 +43,53 @@ class TestADBController:
         with pytest.raises(RuntimeError):
             self.adb_controller.execute_command(["adb", "devices"])
 
+    def test_execute_command__uses_learned_timeout(self, mocker):
+        mock_run = mocker.patch("subprocess.run")
+        for _ in range(5):
+            self.adb_controller.latency.record("shell input", 0.1)
+
+        self.adb_controller.execute_command(["adb", "shell", "input", "tap", "1", "2"])
+
+        assert mock_run.call_args.kwargs["timeout"] == 2.0
+
+    def test_execute_command__shortened_to_deadline(self, mocker):
+        mock_run = mocker.patch("subprocess.run")
+
+        with deadline(5):
+            self.adb_controller.execute_command(["adb", "devices"])
+
+        assert 4 < mock_run.call_args.kwargs["timeout"] <= 5
+
+    def test_execute_command__deadline_timeout(self, mocker):
+        mocker.patch(
+            "subprocess.run",
+            side_effect=subprocess.TimeoutExpired(cmd="adb devices", timeout=5),
+        )
+
+        with deadline(5), pytest.raises(DeadlineExceededError):
+            self.adb_controller.execute_command(["adb", "devices"])
+        assert self.adb_controller.breaker.failures == 0
+
+    def test_execute_command__expired_deadline_skips_device(self, mocker):
+        mock_run = mocker.patch("subprocess.run")
+
+        with deadline(-1), pytest.raises(DeadlineExceededError):
+            self.adb_controller.execute_command(["adb", "devices"])
+        mock_run.assert_not_called()
+
+    def test_execute_command__fails_fast_after_repeated_timeouts(self, mocker):
+        mock_run = mocker.patch(
+            "subprocess.run",
+            side_effect=subprocess.TimeoutExpired(cmd="adb devices", timeout=30),
+        )
+        for _ in range(3):
+            with pytest.raises(RuntimeError):
+                self.adb_controller.execute_command(["adb", "devices"])
+
+        with pytest.raises(DeviceUnavailableError):
+            self.adb_controller.execute_command(["adb", "devices"])
+        assert mock_run.call_count == 3
+
     def test_get_ui_dump__returns_result(self, mocker):
         mock_run = mocker.patch("subprocess.run")
         mock_process = mocker.Mock()
@@ -54,6 +106,86 @@ class TestADBController:
         )
         assert result == mock_process.stdout
 
+    def test_get_app_pid(self, mocker):
+        mock_run = mocker.patch("subprocess.run")
+        mock_run.return_value.stdout = "4321\n"
+
+        result = self.adb_controller.get_app_pid("TEST")
+
+        mock_run.assert_called_once_with(
+            ["adb", "shell", "pidof", "TEST"],
+            capture_output=True,
+            text=True,
+            check=True,
+            timeout=30,
+        )
+        assert result == 4321
+
+    def test_get_app_pid__app_not_running(self, mocker):
+        mock_run = mocker.patch("subprocess.run")
+        mock_run.side_effect = subprocess.CalledProcessError(
+            returncode=1, cmd="adb shell pidof TEST"
+        )
+
+        assert self.adb_controller.get_app_pid("TEST") is None
+
+    def test_start_process(self, mocker):
+        mock_popen = mocker.patch("subprocess.Popen")
+
+        result = self.adb_controller.start_process(["adb", "logcat"])
+
+        mock_popen.assert_called_once_with(
+            ["adb", "logcat"],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+            errors="replace",
+        )
+        assert result == mock_popen.return_value
+
+    def test_get_devices(self, mocker):
+        mock_run = mocker.patch("subprocess.run")
+        mock_run.return_value.stdout = (
+            "List of devices attached\nemulator-5554\tdevice\nR58M\tunauthorized\n\n"
+        )
+
+        assert self.adb_controller.get_devices() == ["emulator-5554"]
+
+    def test_get_apk_sha256(self, mocker):
+        mock_run = mocker.patch("subprocess.run")
+        mock_run.side_effect = [
+            mocker.Mock(stdout="package:/data/app/base.apk\n"),
+            mocker.Mock(stdout="abc123  /data/app/base.apk\n"),
+        ]
+
+        result = self.adb_controller.get_apk_sha256("TEST")
+
+        assert mock_run.call_args_list[1].args[0] == [
+            "adb",
+            "shell",
+            "sha256sum",
+            "/data/app/base.apk",
+        ]
+        assert result == "abc123"
+
+    def test_get_apk_sha256__raises_ValueError_when_not_installed(self, mocker):
+        mock_run = mocker.patch("subprocess.run")
+        mock_run.return_value.stdout = ""
+
+        with pytest.raises(ValueError):
+            self.adb_controller.get_apk_sha256("TEST")
+
+    def test_get_ui_dump__archives_result(self, mocker):
+        mock_run = mocker.patch("subprocess.run")
+        mock_run.return_value.stdout = "<hierarchy/>"
+        mock_archive = mocker.Mock()
+        self.adb_controller.dump_archive = mock_archive
+
+        result = self.adb_controller.get_ui_dump()
+
+        mock_archive.append.assert_called_once_with("<hierarchy/>")
+        assert result == "<hierarchy/>"
+
     def test_tap_coordinates(self, mocker):
         mock_run = mocker.patch("subprocess.run")
         mock_process = mocker.Mock()
@@ -87,6 +219,42 @@ class TestADBController:
             timeout=30,
         )
 
+    def test_restart_activity(self, mocker):
+        mock_run = mocker.patch("subprocess.run")
+
+        self.adb_controller.restart_activity("TEST", ".TestActivity")
+
+        mock_run.assert_called_once_with(
+            [
+                "adb",
+                "shell",
+                "am",
+                "start",
+                "-W",
+                "--activity-clear-task",
+                "--activity-new-task",
+                "-n",
+                "TEST/.TestActivity",
+            ],
+            capture_output=False,
+            text=True,
+            check=True,
+            timeout=30,
+        )
+
+    def test_clear_app_data(self, mocker):
+        mock_run = mocker.patch("subprocess.run")
+
+        self.adb_controller.clear_app_data("TEST")
+
+        mock_run.assert_called_once_with(
+            ["adb", "shell", "pm", "clear", "TEST"],
+            capture_output=False,
+            text=True,
+            check=True,
+            timeout=30,
+        )
+
     def test_close_app(self, mocker):
         mock_app_name = "TEST"
         mock_run = mocker.patch("subprocess.run")
@@ -128,6 +296,43 @@ class TestADBController:
             timeout=30,
         )
 
+    def test_run_batch(self, mocker):
+        mock_run = mocker.patch("subprocess.run")
+
+        self.adb_controller.run_batch(
+            [["input", "tap", "1", "2"], ["input", "text", "hello world"]]
+        )
+
+        mock_run.assert_called_once_with(
+            ["adb", "shell", "input tap 1 2 && input text 'hello world'"],
+            capture_output=False,
+            text=True,
+            check=True,
+            timeout=30,
+        )
+
+    def test_run_batch__skips_empty_batch(self, mocker):
+        mock_run = mocker.patch("subprocess.run")
+
+        self.adb_controller.run_batch([])
+
+        mock_run.assert_not_called()
+
+    def test_get_sdk_version(self, mocker):
+        mock_run = mocker.patch("subprocess.run")
+        mock_run.return_value.stdout = "34\n"
+
+        result = self.adb_controller.get_sdk_version()
+
+        mock_run.assert_called_once_with(
+            ["adb", "shell", "getprop", "ro.build.version.sdk"],
+            capture_output=True,
+            text=True,
+            check=True,
+            timeout=30,
+        )
+        assert result == 34
+
     def test_take_screenshot(self, mocker):
         mock_screenshot_name = "test"
         mock_run = mocker.patch("subprocess.run")
@@ -175,3 +380,31 @@ class TestADBController:
             check=True,
             timeout=30,
         )
+
+    def test_pull_file(self, mocker, tmp_path):
+        mock_run = mocker.patch("subprocess.run")
+
+        self.adb_controller.pull_file("/sdcard/clip.mp4", tmp_path / "clip.mp4")
+
+        mock_run.assert_called_once_with(
+            ["adb", "pull", "/sdcard/clip.mp4", str(tmp_path / "clip.mp4")],
+            capture_output=False,
+            text=True,
+            check=True,
+            timeout=30,
+        )
+
+    def test_interrupt_process__missing_process_is_ignored(self, mocker):
+        mock_run = mocker.patch(
+            "subprocess.run", side_effect=subprocess.CalledProcessError(1, "pkill")
+        )
+
+        self.adb_controller.interrupt_process("screenrecord")
+
+        assert mock_run.call_args.args[0] == [
+            "adb",
+            "shell",
+            "pkill",
+            "-INT",
+            "screenrecord",
+        ]
@@ -1,7 +1,11 @@
-from unittest.mock import call
+from unittest.mock import ANY, call
 
 import pytest
 
+from logitech.buggy_calc.helpers.exceptions import (
+    FieldNotClearedError,
+    ResultTimeoutError,
+)
 from logitech.buggy_calc.pages.calculator import Calculator
 
 
@@ -77,6 +81,96 @@ class TestCalculator:
         mock_parser.parse_result_text.assert_called_once_with("", text="=")
         assert result == mock_parsed_result
 
+    def test_get_display_result__served_by_ui_mirror(self, mocker):
+        mock_adb = mocker.Mock()
+        mock_mirror = mocker.Mock()
+        mock_mirror.text.return_value = "3.0"
+        self.calculator.adb = mock_adb
+        self.calculator.ui_mirror = mock_mirror
+
+        assert self.calculator.get_display_result() == "3.0"
+        assert self.calculator._get_input_value_length("first_number") == 3
+
+        mock_mirror.text.assert_has_calls([call("="), call("first_number")])
+        mock_adb.get_ui_dump.assert_not_called()
+
+    def test_await_display_result__served_by_running_ui_mirror(self, mocker):
+        mock_adb = mocker.Mock()
+        mock_mirror = mocker.Mock(running=True)
+        mock_mirror.await_text.return_value = "3.0"
+        self.calculator.adb = mock_adb
+        self.calculator.ui_mirror = mock_mirror
+        predicate = "3.0".__eq__
+
+        assert (
+            self.calculator.await_display_result(predicate=predicate, timeout=2.0)
+            == "3.0"
+        )
+
+        mock_mirror.await_text.assert_called_once_with(
+            "=", predicate=predicate, timeout=2.0
+        )
+        mock_adb.get_ui_dump.assert_not_called()
+
+    def test_tap_button__uses_ui_mirror_bounds_and_reports_change(self, mocker):
+        mock_adb = mocker.Mock()
+        mock_mirror = mocker.Mock()
+        mock_mirror.bounds.return_value = 1, 2, 3, 4
+        self.calculator.adb = mock_adb
+        self.calculator.ui_mirror = mock_mirror
+
+        self.calculator.tap_button("first_number")
+
+        mock_mirror.bounds.assert_called_once_with("first_number")
+        mock_adb.tap_coordinates.assert_called_once_with(2, 3)
+        mock_mirror.expect_change.assert_called_once_with("first_number")
+        mock_adb.get_ui_dump.assert_not_called()
+
+    def test_await_display_result__returns_matching_value(self, mocker):
+        mock_adb = mocker.Mock()
+        mock_adb.get_ui_dump.side_effect = ["a", "b"]
+        mock_parser = mocker.Mock()
+        mock_parser.parse_result_text.side_effect = ["1.0", "3.0"]
+        self.calculator.adb = mock_adb
+        self.calculator.parser = mock_parser
+
+        result = self.calculator.await_display_result(
+            predicate=lambda value: value == "3.0"
+        )
+
+        assert result == "3.0"
+        assert mock_adb.get_ui_dump.call_count == 2
+
+    def test_await_display_result__returns_when_ui_settles(self, mocker):
+        mock_adb = mocker.Mock()
+        mock_adb.get_ui_dump.side_effect = ["a", "b", "b"]
+        mock_parser = mocker.Mock()
+        mock_parser.parse_result_text.side_effect = ["1.0", "3.0"]
+        self.calculator.adb = mock_adb
+        self.calculator.parser = mock_parser
+
+        result = self.calculator.await_display_result()
+
+        assert result == "3.0"
+        assert mock_parser.parse_result_text.call_count == 2
+
+    def test_await_display_result__raises_ResultTimeoutError(self, mocker):
+        mock_adb = mocker.Mock()
+        mock_adb.get_ui_dump.return_value = "a"
+        mock_parser = mocker.Mock()
+        mock_parser.parse_result_text.return_value = "1.0"
+        self.calculator.adb = mock_adb
+        self.calculator.parser = mock_parser
+        mocker.patch("time.monotonic", side_effect=[0.0, 0.0, 0.1, 1.0])
+
+        with pytest.raises(ResultTimeoutError) as e:
+            self.calculator.await_display_result(
+                predicate=lambda value: value == "3.0", timeout=0.5
+            )
+
+        assert e.value.last_value == "1.0"
+        mock_parser.parse_result_text.assert_called_once()
+
     @pytest.mark.parametrize(
         "display_result, expected_length",
         [
@@ -97,17 +191,78 @@ class TestCalculator:
         assert result == expected_length
 
     def test_clear_input_field__deletes_input_value(self, mocker):
-        mock_field_name = mocker.Mock()
         mock_adb = mocker.Mock()
-        mock_tap_button = mocker.Mock()
         self.calculator.adb = mock_adb
-        self.calculator.tap_button = mock_tap_button
-        mocker.patch.object(self.calculator, "_get_input_value_length", return_value=1)
+        self.calculator._sdk_version = 30
+        self.calculator._bounds["first_number"] = (0, 0, 10, 10)
+        self.calculator._field_state["first_number"] = "100"
+        mocker.patch.object(self.calculator, "_get_input_value_length", return_value=0)
 
-        self.calculator.clear_input_field(mock_field_name)
+        self.calculator.clear_input_field("first_number")
 
-        mock_tap_button.assert_called_once_with(button_text=mock_field_name)
-        mock_adb.del_value.assert_called_once_with()
+        mock_adb.run_batch.assert_called_once_with(
+            [
+                ["input", "tap", "5", "5"],
+                ["input", "keyevent", "123"],
+                ["input", "keyevent", "67", "67", "67"],
+            ]
+        )
+        assert self.calculator._field_state["first_number"] == ""
+
+    def test_clear_input_field__skips_known_empty_field(self, mocker):
+        mock_adb = mocker.Mock()
+        self.calculator.adb = mock_adb
+        self.calculator._field_state["first_number"] = ""
+
+        self.calculator.clear_input_field("first_number")
+
+        mock_adb.run_batch.assert_not_called()
+        mock_adb.get_ui_dump.assert_not_called()
+
+    def test_clear_input_field__falls_back_to_next_strategy(self, mocker):
+        mock_adb = mocker.Mock()
+        self.calculator.adb = mock_adb
+        self.calculator._sdk_version = 34
+        self.calculator._bounds["first_number"] = (0, 0, 10, 10)
+        self.calculator._field_state["first_number"] = "12"
+
+        def refresh():
+            self.calculator._field_state["first_number"] = "12"
+
+        mocker.patch.object(self.calculator, "refresh_ui_state", side_effect=refresh)
+        mocker.patch.object(
+            self.calculator, "_get_input_value_length", side_effect=[2, 0]
+        )
+
+        self.calculator.clear_input_field("first_number")
+
+        assert mock_adb.run_batch.call_args_list[0] == call(
+            [
+                ["input", "tap", "5", "5"],
+                ["input", "keycombination", "113", "29"],
+                ["input", "keyevent", "67"],
+            ]
+        )
+        assert mock_adb.run_batch.call_args_list[1] == call(
+            [
+                ["input", "tap", "5", "5"],
+                ["input", "keyevent", "123"],
+                ["input", "keyevent", "67", "67"],
+            ]
+        )
+        assert self.calculator._failed_clear_strategies == {"select_all"}
+
+    def test_clear_input_field__raises_FieldNotClearedError(self, mocker):
+        mock_adb = mocker.Mock()
+        self.calculator.adb = mock_adb
+        self.calculator._sdk_version = 30
+        self.calculator._bounds["first_number"] = (0, 0, 10, 10)
+        self.calculator._field_state["first_number"] = "1"
+        mocker.patch.object(self.calculator, "refresh_ui_state")
+        mocker.patch.object(self.calculator, "_get_input_value_length", return_value=1)
+
+        with pytest.raises(FieldNotClearedError):
+            self.calculator.clear_input_field("first_number")
 
     def test_clear_inputs(self, mocker):
         mock_clear_input_field = mocker.Mock()
@@ -119,6 +274,17 @@ class TestCalculator:
             [call("first_number"), call("second_number")], any_order=False
         )
 
+    def test_reset_app_state(self, mocker):
+        mock_resetter = mocker.Mock()
+        mock_resetter.reset.return_value = "restart_activity"
+        self.calculator.resetter = mock_resetter
+
+        result = self.calculator.reset_app_state()
+
+        mock_resetter.reset.assert_called_once_with(self.calculator)
+        assert result == "restart_activity"
+        assert self.calculator.inputs_known_empty()
+
     def test_input_value(self, mocker):
         mock_field_name = mocker.Mock()
         mock_value = mocker.Mock()
@@ -131,3 +297,220 @@ class TestCalculator:
 
         mock_tap_button.assert_called_once_with(button_text=mock_field_name)
         mock_adb.input_value.assert_called_once_with(mock_value)
+
+    def test_refresh_ui_state(self, mocker):
+        mock_adb = mocker.Mock()
+        mock_parser = mocker.Mock()
+        mock_parser.parse_all_bounds.return_value = {"+": (1, 2, 3, 4)}
+        mock_parser.parse_result_text.side_effect = [
+            "Enter the first number",
+            "12",
+            "3.0",
+        ]
+        self.calculator.adb = mock_adb
+        self.calculator.parser = mock_parser
+
+        self.calculator.refresh_ui_state()
+
+        mock_adb.get_ui_dump.assert_called_once_with()
+        assert self.calculator._bounds == {"+": (1, 2, 3, 4)}
+        assert self.calculator._field_state == {
+            "first_number": "",
+            "second_number": "12",
+        }
+        assert self.calculator._result == "3.0"
+
+    def test_perform_calculation__refreshes_then_batches(self, mocker):
+        mock_adb = mocker.Mock()
+        self.calculator.adb = mock_adb
+        self.calculator._sdk_version = 30
+        self.calculator._verified_clear_strategies.add("keyevent")
+        mock_await_batch_result = mocker.patch.object(
+            self.calculator, "_await_batch_result", return_value="3.0"
+        )
+
+        def refresh():
+            self.calculator._bounds.update(
+                {
+                    "first_number": (0, 0, 10, 10),
+                    "second_number": (0, 10, 10, 20),
+                    "+": (0, 20, 10, 30),
+                }
+            )
+            self.calculator._field_state.update(
+                {"first_number": "12", "second_number": ""}
+            )
+            self.calculator._result = "0"
+
+        mock_refresh = mocker.patch.object(
+            self.calculator, "refresh_ui_state", side_effect=refresh
+        )
+
+        result = self.calculator.perform_calculation("+", "1", "2")
+
+        mock_refresh.assert_called_once_with()
+        mock_adb.run_batch.assert_called_once_with(
+            [
+                ["input", "tap", "5", "5"],
+                ["input", "keyevent", "123"],
+                ["input", "keyevent", "67", "67"],
+                ["input", "tap", "5", "5"],
+                ["input", "text", "1"],
+                ["input", "tap", "5", "15"],
+                ["input", "text", "2"],
+                ["input", "tap", "5", "25"],
+            ]
+        )
+        mock_await_batch_result.assert_called_once_with(ANY, "0")
+        assert result == "3.0"
+        assert self.calculator._field_state == {
+            "first_number": "1",
+            "second_number": "2",
+        }
+
+    def test_perform_calculation__verifies_clear_before_batching_it(self, mocker):
+        mock_adb = mocker.Mock()
+        self.calculator.adb = mock_adb
+        self.calculator._sdk_version = 34
+        self.calculator._bounds.update(
+            {
+                "first_number": (0, 0, 10, 10),
+                "second_number": (0, 10, 10, 20),
+                "+": (0, 20, 10, 30),
+            }
+        )
+        self.calculator._field_state.update(
+            {"first_number": "12", "second_number": "3"}
+        )
+        mocker.patch.object(self.calculator, "_await_batch_result", return_value="3.0")
+        mocker.patch.object(self.calculator, "_get_input_value_length", return_value=0)
+        mocker.patch.object(self.calculator, "get_display_result", return_value="15.0")
+
+        self.calculator.perform_calculation("+", "1", "2")
+
+        assert mock_adb.run_batch.call_args_list == [
+            call(
+                [
+                    ["input", "tap", "5", "5"],
+                    ["input", "keycombination", "113", "29"],
+                    ["input", "keyevent", "67"],
+                ]
+            ),
+            call(
+                [
+                    ["input", "tap", "5", "5"],
+                    ["input", "text", "1"],
+                    ["input", "tap", "5", "15"],
+                    ["input", "keycombination", "113", "29"],
+                    ["input", "keyevent", "67"],
+                    ["input", "tap", "5", "15"],
+                    ["input", "text", "2"],
+                    ["input", "tap", "5", "25"],
+                ]
+            ),
+        ]
+        assert self.calculator._verified_clear_strategies == {"select_all"}
+
+    def test_perform_calculation__reuses_known_state(self, mocker):
+        mock_adb = mocker.Mock()
+        self.calculator.adb = mock_adb
+        self.calculator._bounds.update(
+            {
+                "first_number": (0, 0, 10, 10),
+                "second_number": (0, 10, 10, 20),
+                "-": (0, 20, 10, 30),
+            }
+        )
+        self.calculator._field_state.update({"first_number": "", "second_number": ""})
+        self.calculator._result = "3.0"
+        mocker.patch.object(self.calculator, "_await_batch_result", return_value="")
+        mock_refresh = mocker.patch.object(self.calculator, "refresh_ui_state")
+
+        self.calculator.perform_calculation("-", None, None)
+
+        mock_refresh.assert_not_called()
+        mock_adb.run_batch.assert_called_once_with([["input", "tap", "5", "25"]])
+        mock_adb.get_ui_dump.assert_not_called()
+
+    def dump(self, first, second, result):
+        return "".join(
+            f'<node text="{text}" resource-id="{self.package_name}:id/{resource_id}" />'
+            for text, resource_id in (
+                (result, "resultView"),
+                (first, "input1"),
+                (second, "input2"),
+            )
+        )
+
+    def known_plan(self, mocker, dumps):
+        mock_adb = mocker.Mock()
+        mock_adb.get_ui_dump.side_effect = dumps
+        self.calculator.adb = mock_adb
+        self.calculator._verified_clear_strategies.add("keyevent")
+        self.calculator._sdk_version = 30
+        self.calculator._bounds.update(
+            {
+                "first_number": (0, 0, 10, 10),
+                "second_number": (0, 10, 10, 20),
+                "+": (0, 20, 10, 30),
+            }
+        )
+        self.calculator._field_state.update({"first_number": "", "second_number": ""})
+        return mock_adb
+
+    def test_perform_calculation__waits_until_batch_shows_and_result_changes(
+        self, mocker
+    ):
+        dumps = [
+            self.dump("Enter the first number", "Enter the second number", "5.0"),
+            # Inputs not typed yet, then the stale result, then the redrawn one
+            self.dump("1", "Enter the second number", "5.0"),
+            self.dump("1", "2", "5.0"),
+            self.dump("1", "2", "3.0"),
+        ]
+        mock_adb = self.known_plan(mocker, dumps)
+
+        result = self.calculator.perform_calculation("+", "1", "2")
+
+        assert result == "3.0"
+        assert mock_adb.get_ui_dump.call_count == 4
+        assert self.calculator._result == "3.0"
+
+    def test_perform_calculation__returns_unchanged_result_once_ui_settles(
+        self, mocker
+    ):
+        mock_sleep = mocker.patch("time.sleep")
+        mock_adb = self.known_plan(mocker, [self.dump("2", "1", "3.0")] * 2)
+        self.calculator._result = "3.0"
+
+        assert self.calculator.perform_calculation("+", "2", "1") == "3.0"
+
+        assert mock_adb.get_ui_dump.call_count == 2
+        mock_sleep.assert_called_once_with(0.05)
+
+    def test_perform_calculation__raises_if_batch_never_shows(self, mocker):
+        mocker.patch("time.monotonic", side_effect=[0.0, 0.1, 5.0])
+        self.known_plan(mocker, [self.dump("", "", "3.0")] * 3)
+        self.calculator._result = "3.0"
+
+        with pytest.raises(ResultTimeoutError):
+            self.calculator.perform_calculation("+", "2", "1")
+
+    def test_save_screenshot__stores_pulled_frame(self, mocker, tmp_path):
+        from logitech.buggy_calc.helpers.screenshot_store import ScreenshotStore
+
+        mock_adb = mocker.Mock()
+        mock_adb.pull_screenshot.side_effect = lambda name, log_dir: (
+            log_dir / f"{name}.png"
+        ).write_bytes(b"frame")
+        self.calculator.adb = mock_adb
+        self.calculator.screenshot_store = ScreenshotStore(tmp_path)
+
+        digest = self.calculator.save_screenshot("scenario")
+
+        mock_adb.take_screenshot.assert_called_once_with("scenario")
+        mock_adb.del_screenshot_from_device.assert_called_once_with("scenario")
+        assert (
+            self.calculator.screenshot_store.path("scenario").read_bytes() == b"frame"
+        )
+        assert digest == self.calculator.screenshot_store.scenarios["scenario"]["blob"]
@@ -0,0 +1,42 @@
+import pytest
+
+from logitech.buggy_calc.helpers.clearing import (
+    ClearStrategy,
+    KeyeventClear,
+    SelectAllClear,
+    available_strategies,
+)
+
+
+class TestClearStrategies:
+    def test_keyevent_clear__commands(self):
+        commands = KeyeventClear().commands(1, 2, length=3)
+
+        assert commands == [
+            ["input", "tap", "1", "2"],
+            ["input", "keyevent", "123"],
+            ["input", "keyevent", "67", "67", "67"],
+        ]
+
+    def test_clear_strategy__is_abstract(self):
+        with pytest.raises(TypeError):
+            ClearStrategy()
+
+    def test_select_all_clear__commands_do_not_depend_on_length(self):
+        strategy = SelectAllClear()
+
+        assert strategy.commands(1, 2, length=1) == strategy.commands(1, 2, length=10)
+
+    @pytest.mark.parametrize(
+        "sdk_version, excluded, expected_names",
+        [
+            (34, set(), ["select_all", "keyevent"]),
+            (30, set(), ["keyevent"]),
+            (34, {"select_all"}, ["keyevent"]),
+            (34, {"select_all", "keyevent"}, []),
+        ],
+    )
+    def test_available_strategies(self, sdk_version, excluded, expected_names):
+        strategies = available_strategies(sdk_version, excluded)
+
+        assert [strategy.name for strategy in strategies] == expected_names
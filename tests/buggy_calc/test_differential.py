@@ -0,0 +1,84 @@
+import pytest
+
+from logitech.buggy_calc.differential import (
+    Case,
+    DifferentialRunner,
+    cluster_mismatches,
+    expected_results,
+    format_report,
+    generate_cases,
+)
+
+
+class TestOracle:
+    @pytest.mark.parametrize(
+        "case, expected",
+        [
+            (Case("1", "+", "2"), "3.0"),
+            (Case("0.1", "+", "0.2"), "0.30000000000000004"),
+            (Case("-0", "*", "5"), "-0.0"),
+            (Case("0.0000001", "*", "0.0000002"), "1.9999999999999997E-14"),
+            (Case("999999999", "*", "1000"), "9.99999999E11"),
+            (Case("1000000", "/", "0.0001"), "1.0E10"),
+            (Case("9999999", "+", "0"), "9999999.0"),
+            (Case("0.001", "-", "0.0001"), "9.0E-4"),
+            (Case("005.00", "-", "002.50"), "2.5"),
+            (Case("1.", "-", "2."), "-1.0"),
+            (Case("1", "/", "3"), "0.3333333333333333"),
+            (Case("5", "/", "6"), "0.8333333333333334"),
+            (Case("1", "/", "6"), "0.16666666666666666"),
+            (Case("1", "/", "0"), "Error: invalid operation"),
+            (Case("1", "/", "-0"), "Error: invalid operation"),
+            (Case("5", "+", None), "Error: provide numbers"),
+            (Case(None, "/", None), "Error: provide numbers"),
+        ],
+    )
+    def test_expected_results(self, case, expected):
+        assert expected_results([case]) == [expected]
+
+    def test_expected_results__keeps_order_across_operations(self):
+        cases = [Case("6", "/", "2"), Case("6", "-", "2"), Case("6", "*", "2")]
+
+        assert expected_results(cases) == ["3.0", "4.0", "12.0"]
+
+    def test_generate_cases__is_reproducible(self):
+        assert generate_cases(50, seed=7) == generate_cases(50, seed=7)
+        assert generate_cases(50, seed=7) != generate_cases(50, seed=8)
+
+
+class TestDifferentialRunner:
+    @staticmethod
+    def buggy_calculator(operation, input1, input2):
+        """Oracle-correct calculator that drops the fraction of every negative sum."""
+        result = expected_results([Case(input1, operation, input2)])[0]
+        if operation == "+" and result.startswith("-"):
+            return result.split(".")[0]
+        return result
+
+    def test_run__finds_and_clusters_mismatches(self):
+        runner = DifferentialRunner(self.buggy_calculator, batch_size=64)
+        cases = generate_cases(1000, seed=1)
+
+        mismatches = list(runner.run(cases))
+        clusters = cluster_mismatches(mismatches)
+
+        assert runner.executed == 1000
+        assert mismatches
+        assert all(m.case.operation == "+" for m in mismatches)
+        assert {deviation for (_, _, _, deviation) in clusters} <= {
+            "format",
+            "precision",
+            "wrong-value",
+        }
+        assert format_report(clusters, runner.executed).startswith(
+            f"{len(mismatches)} mismatches in 1000 cases"
+        )
+
+    def test_run__no_mismatches_for_correct_calculator(self):
+        runner = DifferentialRunner(
+            lambda operation, input1, input2: expected_results(
+                [Case(input1, operation, input2)]
+            )[0]
+        )
+
+        assert list(runner.run(generate_cases(200))) == []
@@ -0,0 +1,49 @@
+import pytest
+
+from logitech.buggy_calc.helpers.dump_archive import DumpArchive, DumpArchiveReader
+
+
+class TestDumpArchive:
+    @pytest.fixture(autouse=True)
+    def setup(self, tmp_path):
+        self.directory = tmp_path / "run"
+        self.archive = DumpArchive(self.directory)
+
+    def test_append__returns_consecutive_steps(self):
+        assert self.archive.append("<a/>") == 0
+        assert self.archive.append("<b/>") == 1
+
+    def test_reader__loads_any_step(self):
+        for dump in ("<a/>", "<b/>", "<c/>"):
+            self.archive.append(dump)
+        self.archive.close()
+
+        with DumpArchiveReader(self.directory) as reader:
+            assert len(reader) == 3
+            assert reader[2] == "<c/>"
+            assert reader[0] == "<a/>"
+
+    def test_append__deduplicates_identical_dumps(self):
+        self.archive.append("<hierarchy>" * 100, timestamp=1.0)
+        self.archive.append("<hierarchy>" * 100, timestamp=2.0)
+        self.archive.close()
+
+        with DumpArchiveReader(self.directory) as reader:
+            first, second = reader.record(0), reader.record(1)
+            assert first[0] == 1.0 and second[0] == 2.0
+            assert first[1:] == second[1:]
+            assert reader[1] == "<hierarchy>" * 100
+
+    def test_append__continues_existing_archive(self):
+        self.archive.append("<a/>")
+        self.archive.close()
+
+        assert DumpArchive(self.directory).append("<b/>") == 1
+
+    def test_reader__raises_IndexError_for_unknown_step(self):
+        self.archive.close()
+
+        with DumpArchiveReader(self.directory) as reader:
+            assert len(reader) == 0
+            with pytest.raises(IndexError):
+                reader[0]
@@ -0,0 +1,73 @@
+import pytest
+
+from logitech.buggy_calc.helpers.logcat import LogcatCollector
+
+APP_LINE = "08-18 21:15:02.123  4321  4321 I BuggyCalc: result=3.0"
+OTHER_LINE = "08-18 21:15:02.124  1000  1010 D ActivityManager: noise"
+
+
+class TestLogcatCollector:
+    @pytest.fixture(autouse=True)
+    def setup(self, mocker):
+        self.mock_adb = mocker.Mock()
+        self.mock_adb.get_app_pid.return_value = 4321
+        self.collector = LogcatCollector(
+            "com.admsqa.buggycalc", adb=self.mock_adb, capacity=3
+        )
+
+    def test_feed__keeps_only_app_lines(self):
+        mark = self.collector.mark()
+
+        self.collector.feed(APP_LINE)
+        self.collector.feed(OTHER_LINE)
+        self.collector.feed("--------- beginning of main")
+
+        assert self.collector.lines_since(mark) == [APP_LINE]
+
+    def test_lines_since__slices_from_mark(self):
+        self.collector.mark()
+        self.collector.feed(APP_LINE)
+        mark = self.collector.mark()
+        self.collector.feed(APP_LINE.replace("3.0", "4.0"))
+
+        assert self.collector.lines_since(mark) == [APP_LINE.replace("3.0", "4.0")]
+
+    def test_feed__ring_buffer_is_bounded(self):
+        mark = self.collector.mark()
+        for _ in range(5):
+            self.collector.feed(APP_LINE)
+
+        assert len(self.collector.lines_since(mark)) == 3
+
+    def test_mark__tracks_restarted_app(self):
+        self.collector.mark()
+        self.mock_adb.get_app_pid.return_value = 1000
+        mark = self.collector.mark()
+
+        self.collector.feed(APP_LINE)
+        self.collector.feed(OTHER_LINE)
+
+        assert self.collector.lines_since(mark) == [APP_LINE, OTHER_LINE]
+
+    def test_save_since(self, tmp_path):
+        mark = self.collector.mark()
+        self.collector.feed(APP_LINE)
+
+        log_file = self.collector.save_since(mark, "test_add[1-2]", tmp_path)
+
+        assert log_file == tmp_path / "test_add_1-2_.log"
+        assert log_file.read_text() == f"{APP_LINE}\n"
+
+    def test_start__streams_logcat(self, mocker):
+        mock_process = mocker.Mock()
+        mock_process.stdout = iter([f"{APP_LINE}\n"])
+        self.mock_adb.start_process.return_value = mock_process
+
+        self.collector.start()
+        self.collector._thread.join(timeout=1)
+        self.collector.stop()
+
+        self.mock_adb.start_process.assert_called_once_with(
+            ["adb", "logcat", "-v", "threadtime", "-T", "1"]
+        )
+        assert self.collector.lines_since(0) == [APP_LINE]
@@ -0,0 +1,69 @@
+import pytest
+
+from logitech.buggy_calc.helpers.planner import Action, CalculationPlanner
+
+ALL_BOUNDS = {"first_number", "second_number", "+", "-", "*", "/", "="}
+
+
+class TestCalculationPlanner:
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        self.planner = CalculationPlanner()
+
+    def test_compile__unknown_state_requires_refresh(self):
+        plan = self.planner.compile("+", "1", "2", field_state={})
+
+        assert plan.refresh
+        assert plan.batch == [
+            Action("clear", "first_number"),
+            Action("input", "first_number", "1"),
+            Action("clear", "second_number"),
+            Action("input", "second_number", "2"),
+            Action("tap", "+"),
+        ]
+        assert plan.round_trips == 3
+
+    def test_compile__skips_clears_of_empty_fields(self):
+        plan = self.planner.compile(
+            "-",
+            "1",
+            "2",
+            field_state={"first_number": "", "second_number": ""},
+            known_bounds=ALL_BOUNDS,
+        )
+
+        assert not plan.refresh
+        assert plan.batch == [
+            Action("input", "first_number", "1"),
+            Action("input", "second_number", "2"),
+            Action("tap", "-"),
+        ]
+        assert plan.round_trips == 2
+
+    def test_compile__reuses_matching_field_values(self):
+        plan = self.planner.compile(
+            "*",
+            "5",
+            None,
+            field_state={"first_number": "5", "second_number": "3"},
+            known_bounds=ALL_BOUNDS,
+        )
+
+        assert plan.batch == [Action("clear", "second_number"), Action("tap", "*")]
+        assert plan.expected_state == {"first_number": "5", "second_number": ""}
+
+    def test_compile__missing_bounds_require_refresh(self):
+        plan = self.planner.compile(
+            "/",
+            None,
+            None,
+            field_state={"first_number": "", "second_number": ""},
+            known_bounds={"first_number", "second_number"},
+        )
+
+        assert plan.refresh
+        assert plan.batch == [Action("tap", "/")]
+
+    def test_compile__raises_ValueError_for_invalid_operation(self):
+        with pytest.raises(ValueError):
+            self.planner.compile("^", "1", "2", field_state={})
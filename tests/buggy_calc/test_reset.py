@@ -0,0 +1,75 @@
+import pytest
+
+from logitech.buggy_calc.helpers.reset import AppResetter, ResetStrategy
+
+
+class FakeStrategy(ResetStrategy):
+    def __init__(self, name, clears=True):
+        self.name = name
+        self.clears = clears
+        self.runs = 0
+
+    def run(self, calculator):
+        self.runs += 1
+        calculator.cleared = self.clears
+
+
+class TestAppResetter:
+    @pytest.fixture(autouse=True)
+    def setup(self, mocker):
+        self.calculator = mocker.Mock()
+        self.calculator.cleared = False
+        self.calculator.inputs_known_empty.side_effect = lambda: self.calculator.cleared
+        self.cheap = FakeStrategy("cheap")
+        self.expensive = FakeStrategy("expensive")
+        self.resetter = AppResetter(strategies=(self.cheap, self.expensive))
+
+    def test_reset__skips_when_inputs_known_empty(self):
+        self.calculator.cleared = True
+
+        assert self.resetter.reset(self.calculator) == "none"
+        assert self.cheap.runs == 0
+
+    def test_reset__calibrates_then_uses_cheapest(self, mocker):
+        mocker.patch("time.monotonic", side_effect=[0.0, 0.5, 0.0, 0.1, 0.0, 0.2])
+        self.resetter.costs["expensive"] = 0.1
+
+        assert self.resetter.reset(self.calculator) == "cheap"
+        assert self.resetter.costs["cheap"] == 0.5
+
+        self.calculator.cleared = False
+        assert self.resetter.reset(self.calculator) == "expensive"
+        assert self.expensive.runs == 1
+
+    def test_reset__calibration_cost_excludes_verification(self, mocker):
+        clock = [0.0]
+        mocker.patch("time.monotonic", side_effect=lambda: clock[0])
+        self.cheap.run = lambda calculator: clock.__setitem__(0, clock[0] + 0.2)
+
+        def verify():
+            clock[0] += 1.0
+            self.calculator.cleared = True
+
+        self.calculator.refresh_ui_state.side_effect = verify
+
+        self.resetter.reset(self.calculator)
+
+        assert self.resetter.costs["cheap"] == pytest.approx(0.2)
+
+    def test_reset_strategy__is_abstract(self):
+        with pytest.raises(TypeError):
+            ResetStrategy()
+
+    def test_reset__drops_incorrect_strategy(self):
+        self.cheap.clears = False
+
+        assert self.resetter.reset(self.calculator) == "expensive"
+        assert self.resetter.failed == {"cheap"}
+        self.calculator.refresh_ui_state.assert_called()
+
+    def test_reset__raises_RuntimeError_when_nothing_works(self):
+        self.cheap.clears = False
+        self.expensive.clears = False
+
+        with pytest.raises(RuntimeError):
+            self.resetter.reset(self.calculator)
@@ -0,0 +1,59 @@
+import pytest
+
+from logitech.buggy_calc.helpers.result_cache import ResultCache, resolve_build_id
+
+INPUTS = ("+", "1", "2")
+
+
+class TestResultCache:
+    def test_get__misses_then_hits_after_save(self, tmp_path):
+        cache = ResultCache(tmp_path, "build-a")
+        assert cache.get("test_simple_addition", INPUTS) is None
+        cache.put("test_simple_addition", INPUTS, "3.0")
+        cache.save()
+
+        reloaded = ResultCache(tmp_path, "build-a")
+
+        assert reloaded.get("test_simple_addition", INPUTS) == "3.0"
+        assert reloaded.get("test_simple_addition", ("+", "1", None)) is None
+        assert reloaded.stats == {"hits": 1, "misses": 1, "stores": 0, "entries": 1}
+
+    def test_get__is_scoped_to_build(self, tmp_path):
+        cache = ResultCache(tmp_path, "build-a")
+        cache.put("test_simple_addition", INPUTS, "3.0")
+        cache.save()
+
+        assert (
+            ResultCache(tmp_path, "build-b").get("test_simple_addition", INPUTS) is None
+        )
+
+    def test_get__force_ignores_cached_results(self, tmp_path):
+        cache = ResultCache(tmp_path, "build-a")
+        cache.put("test_simple_addition", INPUTS, "3.0")
+        cache.save()
+
+        forced = ResultCache(tmp_path, "build-a", force=True)
+
+        assert forced.get("test_simple_addition", INPUTS) is None
+
+
+class TestResolveBuildId:
+    def test_resolve_build_id__uses_apk_hash(self, mocker):
+        mock_adb = mocker.Mock()
+        mock_adb.get_apk_sha256.return_value = "abc"
+
+        assert resolve_build_id(mock_adb, "TEST") == "abc"
+
+    @pytest.mark.parametrize("error", [RuntimeError, ValueError])
+    def test_resolve_build_id__falls_back_to_dumpsys(self, mocker, error):
+        mock_adb = mocker.Mock()
+        mock_adb.get_apk_sha256.side_effect = error
+        mock_adb.get_package_details.return_value = (
+            "    versionCode=1 minSdk=24\n    lastUpdateTime=2025-08-18 21:15:02\n"
+        )
+
+        first = resolve_build_id(mock_adb, "TEST")
+        mock_adb.get_package_details.return_value += "    flags=[ DEBUGGABLE ]\n"
+
+        assert first == resolve_build_id(mock_adb, "TEST")
+        assert len(first) == 64
@@ -0,0 +1,133 @@
+import subprocess
+import threading
+
+import pytest
+
+from logitech.buggy_calc.helpers import screen_recorder
+from logitech.buggy_calc.helpers.screen_recorder import ScreenRecorder, Segment
+
+
+class TestScreenRecorder:
+    @pytest.fixture(autouse=True)
+    def setup(self, mocker):
+        self.mock_adb = mocker.Mock()
+        self.recorder = ScreenRecorder(adb=self.mock_adb, max_segments=2)
+        self.recorder._segments.extend(
+            [
+                Segment("/sdcard/logitech_segment_0.mp4", 100.0, 120.0),
+                Segment("/sdcard/logitech_segment_1.mp4", 120.1, 140.0),
+            ]
+        )
+
+    def test_record__keeps_only_newest_segments(self, mocker):
+        self.recorder._segments.clear()
+        calls = []
+
+        def start_process(command):
+            calls.append(command)
+            if len(calls) == 3:
+                self.recorder._stopping.set()
+            return mocker.Mock()
+
+        self.mock_adb.start_process.side_effect = start_process
+
+        self.recorder._record()
+
+        assert calls[0][:5] == ["adb", "shell", "screenrecord", "--time-limit", "20"]
+        assert [segment.device_path for segment in self.recorder._segments] == [
+            "/sdcard/logitech_segment_1.mp4",
+            "/sdcard/logitech_segment_2.mp4",
+        ]
+        self.mock_adb.remove_file.assert_called_once_with(
+            "/sdcard/logitech_segment_0.mp4"
+        )
+
+    def test_save_clip__without_ffmpeg_keeps_overlapping_segments(
+        self, mocker, tmp_path
+    ):
+        mocker.patch("shutil.which", return_value=None)
+
+        files = self.recorder.save_clip("failed scenario", 110.0, 118.0, tmp_path)
+
+        assert files == [tmp_path / "failed_scenario_part0.mp4"]
+        self.mock_adb.pull_file.assert_called_once_with(
+            "/sdcard/logitech_segment_0.mp4", tmp_path / "failed_scenario_part0.mp4"
+        )
+        self.mock_adb.interrupt_process.assert_not_called()
+
+    def test_save_clip__with_ffmpeg_trims_joined_segments(self, mocker, tmp_path):
+        mocker.patch("shutil.which", return_value="/usr/bin/ffmpeg")
+        self.mock_adb.pull_file.side_effect = lambda device, local: local.write_bytes(
+            b""
+        )
+        mock_run = mocker.patch("subprocess.run")
+
+        files = self.recorder.save_clip("failed", 115.0, 125.0, tmp_path)
+
+        assert files == [tmp_path / "failed.mp4"]
+        command = mock_run.call_args.args[0]
+        assert command[command.index("-ss") + 1] == "15.000"
+        assert command[command.index("-t") + 1] == "10.000"
+        assert list(tmp_path.iterdir()) == []
+
+    def test_save_clip__ffmpeg_failure_keeps_segments(self, mocker, tmp_path):
+        mocker.patch("shutil.which", return_value="/usr/bin/ffmpeg")
+        mocker.patch(
+            "subprocess.run", side_effect=subprocess.CalledProcessError(1, "ffmpeg")
+        )
+
+        files = self.recorder.save_clip("failed", 115.0, 125.0, tmp_path)
+
+        assert len(files) == 2
+
+    def test_save_clip__finishes_running_segment(self, tmp_path, mocker):
+        mocker.patch("shutil.which", return_value=None)
+        self.recorder._recording_since = 140.1
+
+        def interrupt(name):
+            with self.recorder._lock:
+                self.recorder._segments.append(
+                    Segment("/sdcard/logitech_segment_2.mp4", 140.1, 145.0)
+                )
+                self.recorder._recording_since = None
+                self.recorder._segment_done.notify_all()
+
+        self.mock_adb.interrupt_process.side_effect = interrupt
+
+        files = self.recorder.save_clip("failed", 141.0, 144.0, tmp_path)
+
+        self.mock_adb.interrupt_process.assert_called_once_with("screenrecord")
+        assert files == [tmp_path / "failed_part0.mp4"]
+
+    def test_save_clip__no_coverage(self, tmp_path):
+        assert self.recorder.save_clip("failed", 200.0, 210.0, tmp_path) == []
+
+    def test_stop__interrupts_until_recording_ends(self, mocker):
+        mocker.patch.object(screen_recorder, "STOP_WAIT_SECONDS", 0.05)
+        self.recorder._segments.clear()
+        started = threading.Event()
+        finished = threading.Event()
+        process = mocker.Mock()
+        process.wait.side_effect = lambda: finished.wait(5)
+        self.mock_adb.start_process.side_effect = (
+            lambda command: started.set() or process
+        )
+        interrupts = []
+
+        def interrupt(name):
+            # The first interrupt reaches the device before screenrecord runs
+            interrupts.append(name)
+            if len(interrupts) == 2:
+                finished.set()
+
+        self.mock_adb.interrupt_process.side_effect = interrupt
+        self.recorder.start()
+        started.wait(5)
+
+        self.recorder.stop()
+
+        assert len(interrupts) == 2
+        self.mock_adb.start_process.assert_called_once()
+        self.mock_adb.remove_file.assert_called_once_with(
+            "/sdcard/logitech_segment_0.mp4"
+        )
@@ -0,0 +1,123 @@
+import json
+
+import pytest
+
+from logitech.buggy_calc.helpers.screenshot_store import ScreenshotStore
+
+
+def capture(tmp_path, name, data):
+    path = tmp_path / "incoming" / f"{name}.png"
+    path.parent.mkdir(exist_ok=True)
+    path.write_bytes(data)
+    return path
+
+
+class TestScreenshotStore:
+    @pytest.fixture(autouse=True)
+    def setup(self, tmp_path):
+        self.tmp_path = tmp_path
+        self.store = ScreenshotStore(tmp_path / "store", max_bytes=None, max_age=None)
+
+    def test_add__deduplicates_identical_frames(self):
+        first = self.store.add("one", capture(self.tmp_path, "one", b"frame"))
+        second = self.store.add("two", capture(self.tmp_path, "two", b"frame"))
+
+        assert first == second
+        assert len(list((self.tmp_path / "store" / "blobs").rglob("*.png"))) == 1
+        assert self.store.path("one") == self.store.path("two")
+        assert not list((self.tmp_path / "incoming").iterdir())
+
+    def test_manifest__survives_reopen(self):
+        digest = self.store.add("one", capture(self.tmp_path, "one", b"frame"))
+
+        reopened = ScreenshotStore(self.tmp_path / "store")
+        manifest = json.loads((self.tmp_path / "store" / "manifest.json").read_text())
+
+        assert manifest["scenarios"]["one"]["blob"] == digest
+        assert reopened.path("one").read_bytes() == b"frame"
+
+    def test_retention__size_limit_evicts_least_recently_used(self, mocker):
+        clock = mocker.patch("time.time", return_value=100.0)
+        self.store.max_bytes = 10
+        self.store.add("old", capture(self.tmp_path, "old", b"aaaaaa"))
+        clock.return_value = 101.0
+        self.store.add("new", capture(self.tmp_path, "new", b"bbbbbb"))
+
+        assert self.store.path("old") is None
+        assert self.store.path("new").read_bytes() == b"bbbbbb"
+        assert len(self.store.blobs) == 1
+
+    def test_retention__age_limit(self, mocker):
+        clock = mocker.patch("time.time", return_value=100.0)
+        self.store.max_age = 60
+        self.store.add("old", capture(self.tmp_path, "old", b"frame"))
+        clock.return_value = 200.0
+
+        self.store.enforce_retention()
+
+        assert self.store.scenarios == {}
+        assert not list((self.tmp_path / "store" / "blobs").rglob("*.png"))
+
+    def test_export__writes_scenario_named_pngs(self):
+        self.store.add("one", capture(self.tmp_path, "one", b"frame"))
+
+        exported = self.store.export(self.tmp_path / "out")
+
+        assert exported == [self.tmp_path / "out" / "one.png"]
+        assert exported[0].read_bytes() == b"frame"
+
+    def test_export__skips_frames_removed_by_another_process(self, mocker):
+        for name in ("one", "two", "three"):
+            self.store.add(name, capture(self.tmp_path, name, name.encode()))
+        path = self.store.path
+        removed = {"one": None, "two": self.tmp_path / "store" / "blobs" / "gone.png"}
+        mocker.patch.object(
+            self.store, "path", side_effect=lambda name: removed.get(name, path(name))
+        )
+
+        exported = self.store.export(self.tmp_path / "out")
+
+        assert exported == [self.tmp_path / "out" / "three.png"]
+        assert exported[0].read_bytes() == b"three"
+
+    def test_shared_store__keeps_entries_of_every_process(self):
+        other = ScreenshotStore(self.tmp_path / "store", max_bytes=None, max_age=None)
+
+        self.store.add("one", capture(self.tmp_path, "one", b"first"))
+        other.add("two", capture(self.tmp_path, "two", b"second"))
+        self.store.add("three", capture(self.tmp_path, "three", b"third"))
+
+        manifest = json.loads((self.tmp_path / "store" / "manifest.json").read_text())
+        assert set(manifest["scenarios"]) == {"one", "two", "three"}
+        assert other.path("three").read_bytes() == b"third"
+
+    def test_shared_store__retention_sees_blobs_used_by_another_process(self, mocker):
+        clock = mocker.patch("time.time", return_value=100.0)
+        other = ScreenshotStore(self.tmp_path / "store", max_bytes=None, max_age=None)
+        self.store.add("one", capture(self.tmp_path, "one", b"frame"))
+        self.store.max_age = 60
+        clock.return_value = 150.0
+        other.add("two", capture(self.tmp_path, "two", b"frame"))
+        clock.return_value = 200.0
+
+        self.store.enforce_retention()
+
+        assert self.store.path("two").read_bytes() == b"frame"
+
+
+def test_reencode__keeps_smaller_format(tmp_path):
+    np = pytest.importorskip("numpy")
+    Image = pytest.importorskip("PIL.Image")
+    path = tmp_path / "frame.png"
+    Image.fromarray(np.zeros((64, 64, 3), dtype=np.uint8)).save(path, compress_level=0)
+    store = ScreenshotStore(tmp_path / "store", reencode="webp")
+
+    store.add("black", path)
+    store.flush()
+
+    assert store.path("black").suffix == ".webp"
+    assert not list((tmp_path / "store" / "blobs").rglob("*.png"))
+    exported = store.export(tmp_path / "out")
+    with Image.open(exported[0]) as image:
+        assert image.format == "PNG"
+        assert image.size == (64, 64)
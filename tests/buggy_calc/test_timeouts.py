@@ -0,0 +1,83 @@
+import pytest
+
+from logitech.buggy_calc.helpers.exceptions import DeviceUnavailableError
+from logitech.buggy_calc.helpers.timeouts import (
+    CircuitBreaker,
+    LatencyTracker,
+    command_type,
+    deadline,
+    remaining_time,
+)
+
+
+@pytest.mark.parametrize(
+    "command, expected",
+    [
+        (["adb", "devices"], "devices"),
+        (["adb", "pull", "/sdcard/a.png", "a.png"], "pull"),
+        (["adb", "exec-out", "uiautomator", "dump", "/dev/tty"], "exec-out"),
+        (["adb", "shell", "input", "tap", "1", "2"], "shell input"),
+        (["adb", "shell", "input tap 1 2 && input text 3"], "shell batch"),
+    ],
+)
+def test_command_type(command, expected):
+    assert command_type(command) == expected
+
+
+class TestLatencyTracker:
+    def test_timeout_for__default_until_enough_samples(self):
+        tracker = LatencyTracker(min_samples=3)
+        tracker.record("shell input", 0.1)
+
+        assert tracker.timeout_for("shell input") == 30.0
+        assert tracker.timeout_for("unknown") == 30.0
+
+    def test_timeout_for__percentile_times_multiplier(self):
+        tracker = LatencyTracker(min_samples=3, percentile=0.9)
+        for latency in [1.0] * 9 + [2.0]:
+            tracker.record("exec-out", latency)
+
+        assert tracker.timeout_for("exec-out") == 6.0
+
+    def test_timeout_for__clamped(self):
+        tracker = LatencyTracker(min_samples=1, floor=2.0, default=30.0)
+        tracker.record("fast", 0.01)
+        tracker.record("slow", 20.0)
+
+        assert tracker.timeout_for("fast") == 2.0
+        assert tracker.timeout_for("slow") == 30.0
+
+
+class TestCircuitBreaker:
+    def test_opens_after_threshold_and_half_opens_after_cooldown(self, mocker):
+        clock = mocker.patch("time.monotonic", return_value=100.0)
+        breaker = CircuitBreaker(threshold=2, cooldown=10)
+        breaker.record_timeout()
+        breaker.check()
+        breaker.record_timeout()
+
+        with pytest.raises(DeviceUnavailableError):
+            breaker.check()
+
+        clock.return_value = 111.0
+        breaker.check()
+        breaker.record_timeout()
+        with pytest.raises(DeviceUnavailableError):
+            breaker.check()
+
+    def test_success_resets(self):
+        breaker = CircuitBreaker(threshold=2)
+        breaker.record_timeout()
+        breaker.record_success()
+        breaker.record_timeout()
+
+        breaker.check()
+
+
+def test_deadline__nested_keeps_earlier():
+    with deadline(1000):
+        with deadline(10):
+            with deadline(60):
+                assert remaining_time() <= 10
+            assert remaining_time() <= 10
+        assert remaining_time() > 10
@@ -0,0 +1,193 @@
+import subprocess
+import threading
+import time
+
+import pytest
+
+from logitech.buggy_calc.helpers.exceptions import TraceMismatchError
+from logitech.buggy_calc.helpers.trace import (
+    RecordingADBController,
+    ReplayADBController,
+    ReplayClock,
+    TraceWriter,
+    read_trace,
+)
+
+DUMP_COMMAND = ["adb", "exec-out", "uiautomator", "dump", "/dev/tty"]
+
+
+@pytest.fixture
+def trace_path(tmp_path, mocker):
+    """Trace of a short recorded run: two UI dumps, a tap and a failed pidof."""
+    path = tmp_path / "run.jsonl.gz"
+    trace = TraceWriter(path)
+    controller = RecordingADBController(trace)
+    mocker.patch(
+        "subprocess.run",
+        side_effect=[
+            subprocess.CompletedProcess(
+                DUMP_COMMAND, 0, "<hierarchy>1</hierarchy>", ""
+            ),
+            subprocess.CompletedProcess(
+                DUMP_COMMAND, 0, "<hierarchy>2</hierarchy>", ""
+            ),
+            subprocess.CompletedProcess([], 0, None, None),
+            subprocess.CalledProcessError(1, ["adb", "shell", "pidof", "app"], "", ""),
+        ],
+    )
+    controller.execute_command(DUMP_COMMAND)
+    controller.execute_command(DUMP_COMMAND)
+    controller.tap_coordinates(10, 20)
+    assert controller.get_app_pid("app") is None
+    trace.close()
+    mocker.stopall()
+    return path
+
+
+def test_read_trace__records_every_command(trace_path):
+    entries = read_trace(trace_path)
+
+    assert [entry["outcome"] for entry in entries] == ["ok", "ok", "ok", "failed"]
+    assert entries[0]["argv"] == DUMP_COMMAND
+    assert entries[0]["stdout"] == "<hierarchy>1</hierarchy>"
+    assert entries[3]["returncode"] == 1
+
+
+def test_read_trace__rejects_other_files(tmp_path):
+    import gzip
+
+    with gzip.open(tmp_path / "other.gz", "wt") as file:
+        file.write('{"something": "else"}\n')
+
+    with pytest.raises(ValueError):
+        read_trace(tmp_path / "other.gz")
+
+
+class TestReplayADBController:
+    @pytest.fixture(autouse=True)
+    def setup(self, trace_path, mocker):
+        self.mock_run = mocker.patch("subprocess.run")
+        self.replay = ReplayADBController.from_file(trace_path)
+
+    def test_replays_outcomes_in_order(self):
+        outputs = [self.replay.get_ui_dump() for _ in range(2)]
+
+        assert outputs == ["<hierarchy>1</hierarchy>", "<hierarchy>2</hierarchy>"]
+        self.mock_run.assert_not_called()
+
+    def test_surplus_command_raises(self):
+        self.replay.get_ui_dump()
+        self.replay.get_ui_dump()
+
+        with pytest.raises(TraceMismatchError, match="more often than recorded"):
+            self.replay.get_ui_dump()
+
+    def test_verify_complete__reports_missing_and_swallowed_mismatches(self):
+        self.replay.get_ui_dump()
+        self.replay.get_app_pid("app")
+        # get_app_pid handles the error like any failed command
+        assert self.replay.get_app_pid("app") is None
+
+        with pytest.raises(TraceMismatchError) as error:
+            self.replay.verify_complete()
+
+        assert "more often than recorded: ['adb', 'shell', 'pidof', 'app']" in str(
+            error.value
+        )
+        assert f"recorded 1 more time(s) than replayed: {DUMP_COMMAND}" in str(
+            error.value
+        )
+        assert "input" in str(error.value)
+
+    def test_verify_complete__passes_after_exact_replay(self):
+        self.replay.get_ui_dump()
+        self.replay.get_ui_dump()
+        self.replay.tap_coordinates(10, 20)
+        self.replay.get_app_pid("app")
+
+        self.replay.verify_complete()
+
+        assert self.replay.unreplayed() == {}
+
+    def test_replays_failures(self):
+        self.replay.tap_coordinates(10, 20)
+
+        assert self.replay.get_app_pid("app") is None
+
+    def test_unknown_command_raises(self):
+        with pytest.raises(TraceMismatchError):
+            self.replay.tap_coordinates(1, 1)
+
+        assert issubclass(TraceMismatchError, RuntimeError)
+
+    def test_realtime_sleeps_recorded_duration(self, trace_path, mocker):
+        mock_sleep = mocker.patch("time.sleep")
+        replay = ReplayADBController.from_file(trace_path, realtime=True)
+
+        replay.tap_coordinates(10, 20)
+
+        mock_sleep.assert_called_once()
+
+    def test_recorded_time__polls_as_often_as_recorded(self, trace_path):
+        entries = read_trace(trace_path)
+        for entry in entries[:2]:
+            entry["duration"] = 0.9
+        replay = ReplayADBController(entries)
+        real_monotonic, started = time.monotonic, time.monotonic()
+
+        with replay.recorded_time():
+            # Polls an unchanged UI until a timeout, like a result await
+            deadline = time.monotonic() + 1.5
+            while time.monotonic() < deadline:
+                replay.get_ui_dump()
+                time.sleep(0.1)
+
+        assert replay.unreplayed() == {
+            ("adb", "shell", "input", "tap", "10", "20"): 1,
+            ("adb", "shell", "pidof", "app"): 1,
+        }
+        assert time.monotonic is real_monotonic
+        assert time.monotonic() - started < 1.0
+
+    def test_recorded_time__is_real_time_in_realtime_mode(self, trace_path):
+        replay = ReplayADBController.from_file(trace_path, realtime=True)
+        real_sleep = time.sleep
+
+        with replay.recorded_time():
+            assert time.sleep is real_sleep
+
+    def test_streaming_process_has_no_output(self):
+        process = self.replay.start_process(["adb", "logcat"])
+
+        assert list(process.stdout) == []
+        assert process.wait() == 0
+
+
+class TestReplayClock:
+    def test_sleep_advances_virtual_time(self):
+        clock = ReplayClock()
+
+        with clock.installed():
+            before = time.monotonic()
+            time.sleep(60)
+            clock.advance(1.5)
+            elapsed = time.monotonic() - before
+
+        assert elapsed == pytest.approx(61.5)
+
+    def test_other_threads_keep_real_time(self):
+        clock = ReplayClock()
+        elapsed = []
+
+        def measure():
+            before = time.monotonic()
+            clock.advance(60)
+            time.sleep(0.01)
+            elapsed.append(time.monotonic() - before)
+
+        with clock.installed():
+            thread = threading.Thread(target=measure)
+            thread.start()
+            thread.join()
+
+        assert 0.01 <= elapsed[0] < 60
@@ -0,0 +1,258 @@
+import queue
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from logitech.buggy_calc.helpers.exceptions import (
+    ResultNotFoundError,
+    ResultTimeoutError,
+)
+from logitech.buggy_calc.helpers.ui_mirror import UIStateMirror
+
+XML_TEST_PATH = Path(__file__).parent / "resources" / "xml_dump.txt"
+# `uiautomator events` output of typing 12 + 3 over the dump above, one "# <action>"
+# line before the events of each action
+EVENTS_TEST_PATH = Path(__file__).parent / "resources" / "ui_events.txt"
+PACKAGE_NAME = "com.admsqa.buggycalc"
+
+
+def event(
+    event_type,
+    class_name="android.widget.EditText",
+    text="",
+    before="",
+    package=PACKAGE_NAME,
+    change_types="",
+):
+    return (
+        f"EventType: {event_type}; EventTime: 4325853; PackageName: {package}; "
+        f"MovementGranularity: 0; Action: 0; ContentChangeTypes: [{change_types}]; "
+        "WindowChangeTypes: [] "
+        f"[ ClassName: {class_name}; Text: [{text}]; ContentDescription: null; ItemCount: -1; "
+        f"CurrentItemIndex: -1; Enabled: true; Password: false; Checked: false; "
+        f"FullScreen: false; Scrollable: false; BeforeText: {before}; FromIndex: 0; "
+        "ToIndex: -1; ScrollX: -1; ScrollY: -1; AddedCount: 1; RemovedCount: 0; "
+        "ParcelableData: null ]; recordCount: 0"
+    )
+
+
+class FakeEventStream:
+    """Stand-in for the ``uiautomator events`` process, fed line by line by the test."""
+
+    def __init__(self):
+        self.lines = queue.Queue()
+        self.stdout = iter(self.lines.get, None)
+
+    def terminate(self):
+        self.lines.put(None)
+
+    def wait(self):
+        pass
+
+
+class TestUIStateMirror:
+    @pytest.fixture(autouse=True)
+    def setup(self, mocker):
+        self.mock_adb = mocker.Mock()
+        self.mock_adb.get_ui_dump.return_value = XML_TEST_PATH.read_text()
+        self.stream = FakeEventStream()
+        self.mock_adb.start_process.return_value = self.stream
+        self.mirror = UIStateMirror(
+            PACKAGE_NAME, adb=self.mock_adb, quiet=0.01, event_timeout=0.2
+        )
+        yield
+        self.mirror.stop()
+
+    def push(self, line):
+        self.stream.lines.put(line)
+        deadline = time.monotonic() + 1
+        while not self.stream.lines.empty() and time.monotonic() < deadline:
+            time.sleep(0.001)
+        time.sleep(0.02)
+
+    def test_text__without_event_stream_reads_dumps(self):
+        assert self.mirror.text("=") == "102.0"
+        assert self.mirror.text("first_number") == "100"
+
+        assert self.mock_adb.get_ui_dump.call_count == 2
+
+    def test_text__served_from_mirror_while_nothing_changed(self):
+        self.mirror.start()
+
+        assert self.mirror.text("=") == "102.0"
+        assert self.mirror.text("second_number") == "2"
+
+        self.mock_adb.start_process.assert_called_once_with(
+            ["adb", "shell", "uiautomator", "events"]
+        )
+        assert self.mock_adb.get_ui_dump.call_count == 1
+        assert self.mirror.hits == 1
+
+    def test_text_change_of_focused_field_is_applied(self):
+        self.mirror.start()
+        self.mirror.sync()
+
+        self.mirror.expect_change("first_number")
+        self.push(event("TYPE_VIEW_TEXT_CHANGED", text="1005", before="100"))
+
+        assert self.mirror.text("first_number") == "1005"
+        assert self.mock_adb.get_ui_dump.call_count == 1
+
+    def test_text_change_is_attributed_by_previous_text(self):
+        self.mirror.start()
+        self.mirror.sync()
+
+        self.mirror.expect_change()
+        self.push(event("TYPE_VIEW_TEXT_CHANGED", text="", before="2"))
+
+        assert self.mirror.text("second_number") == ""
+        assert self.mirror.text("first_number") == "100"
+        assert self.mock_adb.get_ui_dump.call_count == 1
+
+    def test_unattributable_text_change_resyncs(self):
+        self.mirror.start()
+        self.mirror.sync()
+
+        self.push(event("TYPE_VIEW_TEXT_CHANGED", text="7", before="8"))
+
+        assert self.mirror.text("first_number") == "100"
+        assert self.mock_adb.get_ui_dump.call_count == 2
+
+    def test_content_change_of_result_is_applied(self):
+        self.mirror.start()
+        self.mirror.sync()
+
+        self.mirror.expect_change("=")
+        self.push(
+            event(
+                "TYPE_WINDOW_CONTENT_CHANGED",
+                class_name="android.widget.TextView",
+                text="3.0",
+                before="null",
+                change_types="CONTENT_CHANGE_TYPE_TEXT",
+            )
+        )
+
+        assert self.mirror.text("=") == "3.0"
+        assert self.mock_adb.get_ui_dump.call_count == 1
+
+    def test_subtree_change_resyncs_but_keeps_bounds(self):
+        self.mirror.start()
+        self.mirror.sync()
+
+        self.push(
+            event(
+                "TYPE_WINDOW_CONTENT_CHANGED",
+                class_name="android.widget.LinearLayout",
+                change_types="CONTENT_CHANGE_TYPE_SUBTREE",
+            )
+        )
+
+        assert self.mirror.bounds("+") == (44, 551, 1036, 683)
+        assert self.mock_adb.get_ui_dump.call_count == 1
+        assert self.mirror.text("=") == "102.0"
+        assert self.mock_adb.get_ui_dump.call_count == 2
+
+    def test_await_text__returns_once_an_event_matches(self):
+        self.mirror.start()
+        self.mirror.sync()
+        result_changed = event(
+            "TYPE_WINDOW_CONTENT_CHANGED",
+            class_name="android.widget.TextView",
+            text="7.0",
+            change_types="CONTENT_CHANGE_TYPE_TEXT",
+        )
+        threading.Timer(0.05, self.stream.lines.put, (result_changed,)).start()
+
+        assert self.mirror.await_text("=", predicate="7.0".__eq__, timeout=2) == "7.0"
+        assert self.mock_adb.get_ui_dump.call_count == 1
+
+    def test_await_text__times_out_with_last_value(self):
+        self.mirror.start()
+        self.mirror.sync()
+
+        with pytest.raises(ResultTimeoutError) as error:
+            self.mirror.await_text("=", predicate="7.0".__eq__, timeout=0.1)
+
+        assert error.value.last_value == "102.0"
+
+    def test_recorded_stream__reads_served_from_mirror(self):
+        groups = []
+        for line in EVENTS_TEST_PATH.read_text().splitlines():
+            if line.startswith("# "):
+                groups.append([])
+            else:
+                groups[-1].append(line)
+        # Field each action focuses, and its text after the action
+        steps = [
+            ("first_number", "100"),
+            ("first_number", "10"),
+            ("first_number", "1"),
+            ("first_number", ""),
+            ("first_number", "1"),
+            ("first_number", "12"),
+            ("second_number", "2"),
+            ("second_number", ""),
+            ("second_number", "3"),
+            ("=", "15.0"),
+        ]
+        assert len(groups) == len(steps)
+        self.mirror.start()
+        self.mirror.sync()
+
+        for (field_name, expected), lines in zip(steps, groups):
+            self.mirror.expect_change(field_name)
+            for line in lines:
+                self.push(line)
+            assert self.mirror.text(field_name) == expected
+
+        assert self.mirror.text("first_number") == "12"
+        hit_rate = self.mirror.hits / (self.mirror.hits + self.mirror.dumps)
+        assert (self.mirror.dumps, hit_rate) == (1, 11 / 12)
+
+    def test_benign_and_foreign_events_are_ignored(self):
+        self.mirror.start()
+        self.mirror.sync()
+
+        self.push(event("TYPE_VIEW_CLICKED"))
+        self.push(event("TYPE_WINDOW_CONTENT_CHANGED", package="com.android.systemui"))
+
+        self.mirror.text("=")
+        assert self.mock_adb.get_ui_dump.call_count == 1
+
+    def test_new_window_forgets_bounds(self):
+        self.mirror.start()
+        self.mirror.sync()
+
+        self.push(event("TYPE_WINDOW_STATE_CHANGED", package="com.android.launcher"))
+        self.mirror.bounds("+")
+
+        assert self.mock_adb.get_ui_dump.call_count == 2
+
+    def test_action_without_events_falls_back_to_dump(self):
+        self.mirror.start()
+        self.mirror.sync()
+
+        self.mirror.expect_change("first_number")
+
+        assert self.mirror.text("first_number") == "100"
+        assert self.mock_adb.get_ui_dump.call_count == 2
+
+    def test_ended_stream_falls_back_to_dump(self):
+        self.mirror.start()
+        self.mirror.sync()
+
+        self.stream.terminate()
+        self.mirror._thread.join(timeout=1)
+
+        assert not self.mirror.running
+        self.mirror.text("=")
+        assert self.mock_adb.get_ui_dump.call_count == 2
+
+    def test_text__raises_for_field_not_on_screen(self):
+        self.mock_adb.get_ui_dump.return_value = "<hierarchy/>"
+
+        with pytest.raises(ResultNotFoundError):
+            self.mirror.text("=")
@@ -72,3 +72,13 @@ class TestUIParser:
     def test_parse_result_text__raises_InvalidAppFieldError(self):
         with pytest.raises(InvalidAppFieldError):
             self.parser.parse_result_text(xml_dump="", text="^")
+
+    def test_parse_all_bounds__matches_all_fields(self):
+        all_bounds = self.parser.parse_all_bounds(self.xml_test_dump)
+
+        assert all_bounds["="] == (44, 127, 1036, 303)
+        assert all_bounds["second_number"] == (44, 427, 1036, 551)
+        assert len(all_bounds) == 7
+
+    def test_parse_all_bounds__match_not(self):
+        assert self.parser.parse_all_bounds("") == {}
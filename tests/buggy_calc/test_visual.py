@@ -0,0 +1,79 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+Image = pytest.importorskip("PIL.Image")
+
+from logitech.buggy_calc.visual import (  # noqa: E402
+    VisualRegression,
+    compare_images,
+    load_image,
+    mask_from_bounds,
+)
+
+
+def save_png(image, path):
+    Image.fromarray(image).save(path)
+
+
+@pytest.fixture
+def screen():
+    rng = np.random.default_rng(0)
+    return rng.integers(0, 256, size=(32, 24, 3), dtype=np.uint8)
+
+
+class TestVisualRegression:
+    @pytest.fixture(autouse=True)
+    def setup(self, tmp_path, screen):
+        self.captures = tmp_path / "captures"
+        self.golden = tmp_path / "golden"
+        self.captures.mkdir()
+        self.golden.mkdir()
+        self.screen = screen
+        save_png(screen, self.golden / "scenario.png")
+
+    def test_load_image__drops_alpha(self, tmp_path):
+        rgba = np.dstack([self.screen, np.full((32, 24), 255, np.uint8)])
+        save_png(rgba, tmp_path / "rgba.png")
+
+        np.testing.assert_array_equal(load_image(tmp_path / "rgba.png"), self.screen)
+
+    def test_compare_images__masked_region_is_ignored(self):
+        changed = self.screen.copy()
+        changed[:8] = 0
+
+        diff_ratio, _ = compare_images(changed, self.screen, factor=4)
+        mask = mask_from_bounds((32, 24), [(0, 0, 24, 8)], factor=4)
+        masked_ratio, _ = compare_images(changed, self.screen, factor=4, mask=mask)
+
+        assert diff_ratio > 0
+        assert masked_ratio == 0
+
+    def test_mask_from_bounds__include_only_regions(self):
+        mask = mask_from_bounds((32, 24), [(0, 0, 8, 8)], factor=4, include=True)
+
+        assert mask.shape == (8, 6)
+        assert mask.sum() == 4
+
+    def test_check__passes_identical_capture(self):
+        save_png(self.screen, self.captures / "scenario.png")
+
+        result = VisualRegression(self.golden).check(self.captures / "scenario.png")
+
+        assert result.status == "passed"
+        assert result.diff_ratio == 0
+
+    def test_check_all__reports_failed_and_new_captures(self):
+        changed = self.screen.copy()
+        changed[16:] = 255 - changed[16:]
+        save_png(changed, self.captures / "scenario.png")
+        save_png(self.screen, self.captures / "other.png")
+
+        results = VisualRegression(self.golden).check_all(
+            self.captures, update=True, max_workers=2
+        )
+
+        assert [(r.name, r.status) for r in results] == [
+            ("other.png", "new"),
+            ("scenario.png", "failed"),
+        ]
+        assert (self.golden / "other.png").exists()
@@ -0,0 +1,178 @@
+from pathlib import Path
+
+import pytest
+
+from logitech.buggy_calc.helpers.result_cache import ResultCache, resolve_build_id
+from logitech.buggy_calc.helpers.timeouts import deadline
+from logitech.logger import LOG_DIR
+from logitech.memory_profile import MIB, MemoryMonitor, MemoryProfilePlugin
+from logitech.profiling import MODES, ProfilingPlugin, RunProfiler
+from logitech.pytest_ordering import DurationOrdering
+from logitech.structured_log import (
+    disable_structured_logging,
+    enable_structured_logging,
+    log_context,
+)
+
+RESULT_CACHE_KEY = pytest.StashKey()
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("logitech")
+    group.addoption(
+        "--result-cache",
+        action="store_true",
+        help="Reuse results of deterministic cases already run against the installed APK build.",
+    )
+    group.addoption(
+        "--force-rerun",
+        action="store_true",
+        help="Re-run every case even if its result is cached (the cache is still refreshed).",
+    )
+    group.addoption(
+        "--result-cache-dir",
+        default=str(LOG_DIR / "result_cache"),
+        help="Directory of the result cache (default: logs/result_cache).",
+    )
+    group.addoption(
+        "--adb-deadline",
+        type=float,
+        default=120.0,
+        help="Seconds all ADB calls of one test may take in total, 0 to disable (default: 120).",
+    )
+    group.addoption(
+        "--structured-logs",
+        action="store_true",
+        help="Also write JSON lines logs with an index under logs/structured/<run>.",
+    )
+    group.addoption(
+        "--order-by-duration",
+        action="store_true",
+        help="Group tests by app state and run the longest first, using recorded durations.",
+    )
+    group.addoption(
+        "--smoke-fail-fast",
+        action="store_true",
+        help="Run smoke tests first, cheapest first, and stop at the first smoke failure.",
+    )
+    group.addoption(
+        "--durations-file",
+        default=str(LOG_DIR / "test_durations.json"),
+        help="Recorded test durations (default: logs/test_durations.json).",
+    )
+    group.addoption(
+        "--ui-mirror",
+        action="store_true",
+        help="Serve calculator reads from a `uiautomator events` mirror instead of UI dumps.",
+    )
+    group.addoption(
+        "--memory-profile",
+        action="store_true",
+        help="Snapshot memory around every test, report to logs/memory/pytest.json.",
+    )
+    group.addoption(
+        "--memory-budget",
+        type=float,
+        help="Fail the run if traced memory grows by more MiB after the first test.",
+    )
+    group.addoption(
+        "--handler-budget",
+        type=int,
+        help="Fail the run if more logging handlers are added after the first test.",
+    )
+    group.addoption(
+        "--fd-budget",
+        type=int,
+        help="Fail the run if more file descriptors stay open after the first test.",
+    )
+    group.addoption(
+        "--profile",
+        choices=MODES,
+        help="Profile every test (sampling: collapsed stacks, cprofile: pstats) "
+        "under logs/profiles/<run>.",
+    )
+
+
+def pytest_configure(config):
+    if config.getoption("--structured-logs"):
+        enable_structured_logging()
+    if config.getoption("--order-by-duration") or config.getoption("--smoke-fail-fast"):
+        config.pluginmanager.register(
+            DurationOrdering(
+                Path(config.getoption("--durations-file")),
+                smoke_fail_fast=config.getoption("--smoke-fail-fast"),
+            ),
+            "logitech-duration-ordering",
+        )
+    budgets = [
+        config.getoption(name)
+        for name in ("--memory-budget", "--handler-budget", "--fd-budget")
+    ]
+    if config.getoption("--memory-profile") or any(
+        budget is not None for budget in budgets
+    ):
+        memory_budget, handler_budget, fd_budget = budgets
+        monitor = MemoryMonitor(
+            budget=None if memory_budget is None else int(memory_budget * MIB),
+            handler_budget=handler_budget,
+            fd_budget=fd_budget,
+        )
+        config.pluginmanager.register(
+            MemoryProfilePlugin(monitor, LOG_DIR / "memory" / "pytest.json"),
+            "logitech-memory-profile",
+        )
+    if config.getoption("--profile"):
+        config.pluginmanager.register(
+            ProfilingPlugin(RunProfiler(mode=config.getoption("--profile"))),
+            "logitech-profiling",
+        )
+
+
+def pytest_unconfigure(config):
+    if config.getoption("--structured-logs"):
+        disable_structured_logging()
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_protocol(item, nextitem):
+    """Run each test (setup, call and teardown) under its ADB deadline and log context."""
+    seconds = item.config.getoption("--adb-deadline")
+    with log_context(item.nodeid):
+        if not seconds:
+            yield
+            return
+        with deadline(seconds):
+            yield
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_makereport(item, call):
+    """Expose each phase's report on the test item (``item.rep_setup``, ``item.rep_call``...)."""
+    outcome = yield
+    report = outcome.get_result()
+    setattr(item, f"rep_{report.when}", report)
+
+
+@pytest.fixture(scope="session")
+def result_cache(request, calculator_app):
+    """Result cache of the installed APK build, or None unless ``--result-cache`` is given."""
+    if not request.config.getoption("--result-cache"):
+        yield None
+        return
+    cache = ResultCache(
+        Path(request.config.getoption("--result-cache-dir")),
+        resolve_build_id(calculator_app.adb, calculator_app.package_name),
+        force=request.config.getoption("--force-rerun"),
+    )
+    request.config.stash[RESULT_CACHE_KEY] = cache
+    yield cache
+    cache.save()
+
+
+def pytest_terminal_summary(terminalreporter, exitstatus, config):
+    result_cache = config.stash.get(RESULT_CACHE_KEY, None)
+    if result_cache is not None:
+        stats = ", ".join(
+            f"{name}={value}" for name, value in result_cache.stats.items()
+        )
+        terminalreporter.write_line(f"Result cache ({result_cache.path.name}): {stats}")
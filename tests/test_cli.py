@@ -0,0 +1,208 @@
+import os
+
+import pytest
+
+from logitech import cli
+from logitech.cli import SUITES, SuiteResult
+
+
+class TestCli:
+    @pytest.fixture(autouse=True)
+    def setup(self, mocker, monkeypatch, tmp_path):
+        mocker.patch.object(cli, "LOG_DIR", tmp_path)
+        (tmp_path / "tests").mkdir()
+        monkeypatch.chdir(tmp_path)
+        self.log_dir = tmp_path
+
+    def test_parse_args__defaults_to_all_suites(self):
+        assert cli.parse_args([]).suites == list(SUITES)
+
+    def test_parse_args__rejects_unknown_suite(self):
+        with pytest.raises(SystemExit):
+            cli.parse_args(["unknown"])
+
+    def test_parse_args__root_defaults_to_current_directory(self, tmp_path):
+        assert cli.parse_args([]).root == tmp_path.resolve()
+
+        with pytest.raises(SystemExit):
+            cli.parse_args(["--root", str(tmp_path / "site-packages")])
+
+    def test_run_in_subprocess__runs_in_root(self, mocker, tmp_path):
+        mock_run = mocker.patch(
+            "subprocess.run", return_value=mocker.Mock(returncode=0)
+        )
+
+        cli.run_in_subprocess(SUITES["api"], 0.0, tmp_path)
+
+        assert mock_run.call_args.kwargs["cwd"] == tmp_path
+
+    def test_main__runs_api_suite_without_device(self, mocker):
+        mock_subprocess = mocker.patch.object(
+            cli, "run_in_subprocess", return_value=SuiteResult("api", 0, 0.0, 1.0)
+        )
+        mock_in_process = mocker.patch.object(cli, "run_in_process")
+
+        assert cli.main(["api"]) == 0
+
+        mock_subprocess.assert_called_once()
+        mock_in_process.assert_not_called()
+        assert (self.log_dir / "run_report.json").exists()
+
+    def test_main__log_shards_per_process_merged_after_run(self, mocker, monkeypatch):
+        monkeypatch.delenv("LOGITECH_LOG_SHARD", raising=False)
+        mock_run = mocker.patch(
+            "subprocess.run", return_value=mocker.Mock(returncode=0)
+        )
+        mock_merge = mocker.patch.object(
+            cli.log_shards, "merge_shards", return_value=[]
+        )
+        mock_clear = mocker.patch.object(cli.log_shards, "clear_shards")
+
+        assert cli.main(["api", "--log-shards"]) == 0
+
+        assert mock_run.call_args.kwargs["env"]["LOGITECH_LOG_SHARD"] == "api"
+        mock_clear.assert_called_once_with(self.log_dir / "automation")
+        mock_merge.assert_called_once_with(self.log_dir / "automation")
+        assert "LOGITECH_LOG_SHARD" not in os.environ
+
+    def test_run_in_process__isolates_context_and_root_logger(self, mocker, tmp_path):
+        import logging
+
+        from logitech.buggy_calc.helpers.timeouts import remaining_time, start_deadline
+
+        handler = logging.NullHandler()
+
+        def suite(args):
+            start_deadline(1.0)
+            logging.getLogger().addHandler(handler)
+            assert os.getcwd() == str(tmp_path)
+            return 0
+
+        mocker.patch("pytest.main", side_effect=suite)
+
+        result = cli.run_in_process(SUITES["e2e"], 0.0, tmp_path)
+
+        assert result.exit_code == 0
+        # The test's own deadline is back in place, not the suite's 1 s one
+        remaining = remaining_time()
+        assert remaining is None or remaining > 1.0
+        assert handler not in logging.getLogger().handlers
+
+    def test_main__shares_one_device_session(self, mocker):
+        mock_session = mocker.patch("logitech.buggy_calc.session.DeviceSession")
+        mock_adb = mock_session.return_value.calculator.adb
+        mock_adb.get_devices.return_value = ["emu"]
+        mock_adb.get_package_details.return_value = "Packages:"
+        mocker.patch.object(
+            cli, "run_in_subprocess", return_value=SuiteResult("api", 0, 0.0, 1.0)
+        )
+        mock_in_process = mocker.patch.object(
+            cli,
+            "run_in_process",
+            side_effect=[
+                SuiteResult("e2e", 0, 0.0, 2.0),
+                SuiteResult("bdd", 1, 2.0, 2.0),
+            ],
+        )
+
+        assert cli.main([]) == 1
+
+        mock_session.assert_called_once_with(adb=None)
+        mock_session.return_value.start.assert_called_once_with()
+        mock_session.return_value.stop.assert_called_once_with()
+        assert [c.args[0].name for c in mock_in_process.call_args_list] == [
+            "e2e",
+            "bdd",
+        ]
+        assert (self.log_dir / "device" / "package_details.txt").exists()
+
+    def test_main__stops_session_whose_start_failed(self, mocker):
+        mock_session = mocker.patch("logitech.buggy_calc.session.DeviceSession")
+        mock_session.return_value.calculator.adb.get_devices.return_value = ["emu"]
+        mock_session.return_value.start.side_effect = RuntimeError("launch failed")
+        mock_in_process = mocker.patch.object(cli, "run_in_process")
+
+        with pytest.raises(RuntimeError):
+            cli.main(["e2e"])
+
+        mock_session.return_value.stop.assert_called_once_with()
+        mock_in_process.assert_not_called()
+
+    def test_device_session__stop_after_failed_start(self, mocker):
+        from logitech.buggy_calc.session import DeviceSession
+
+        mock_adb = mocker.Mock()
+        mock_adb.launch_app.side_effect = RuntimeError("launch failed")
+        mocker.patch("time.sleep")
+        mocker.patch("logitech.buggy_calc.session.DumpArchive")
+        session = DeviceSession(adb=mock_adb)
+        with pytest.raises(RuntimeError):
+            session.start()
+        archive = session.dump_archive
+
+        session.stop()
+        session.stop()
+
+        archive.close.assert_called_once_with()
+        assert mock_adb.dump_archive is None
+
+    def test_main__fails_without_device(self, mocker):
+        mock_session = mocker.patch("logitech.buggy_calc.session.DeviceSession")
+        mock_session.return_value.calculator.adb.get_devices.return_value = []
+
+        assert cli.main(["e2e"]) == 1
+
+        mock_session.return_value.start.assert_not_called()
+
+    def test_main__replays_trace(self, mocker, tmp_path):
+        from logitech.buggy_calc.helpers.trace import ReplayADBController, TraceWriter
+
+        trace = TraceWriter(tmp_path / "run.jsonl.gz")
+        trace.record(
+            ["adb", "devices"],
+            "ok",
+            0.1,
+            0,
+            "List of devices attached\nemu\tdevice\n",
+            "",
+        )
+        trace.close()
+        mock_session = mocker.patch("logitech.buggy_calc.session.DeviceSession")
+        mock_session.side_effect = lambda adb: mocker.Mock(
+            calculator=mocker.Mock(adb=adb)
+        )
+        mocker.patch.object(
+            cli, "run_in_process", return_value=SuiteResult("e2e", 0, 0.0, 1.0)
+        )
+        mocker.patch.object(cli, "collect_device_details")
+
+        assert cli.main(["e2e", "--replay-trace", str(tmp_path / "run.jsonl.gz")]) == 0
+
+        assert isinstance(mock_session.call_args.kwargs["adb"], ReplayADBController)
+
+    def test_main__fails_when_replay_leaves_commands(self, mocker, tmp_path, capsys):
+        from logitech.buggy_calc.helpers.trace import TraceWriter
+
+        trace = TraceWriter(tmp_path / "run.jsonl.gz")
+        trace.record(
+            ["adb", "devices"],
+            "ok",
+            0.1,
+            0,
+            "List of devices attached\nemu\tdevice\n",
+            "",
+        )
+        trace.record(["adb", "shell", "input", "tap", "1", "2"], "ok", 0.1, 0, "", "")
+        trace.close()
+        mock_session = mocker.patch("logitech.buggy_calc.session.DeviceSession")
+        mock_session.side_effect = lambda adb: mocker.Mock(
+            calculator=mocker.Mock(adb=adb)
+        )
+        mocker.patch.object(
+            cli, "run_in_process", return_value=SuiteResult("e2e", 0, 0.0, 1.0)
+        )
+        mocker.patch.object(cli, "collect_device_details")
+
+        assert cli.main(["e2e", "--replay-trace", str(tmp_path / "run.jsonl.gz")]) == 1
+
+        assert "does not match the trace" in capsys.readouterr().out
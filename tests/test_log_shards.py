@@ -0,0 +1,80 @@
+from logitech.log_shards import clear_shards, merge_shards, shard_files
+
+
+def write_shard(directory, shard, name, text):
+    path = directory / "shards" / shard / name
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text)
+    return path
+
+
+def test_merge_shards__interleaves_records_by_timestamp(tmp_path):
+    write_shard(
+        tmp_path,
+        "gw0",
+        "calculator.log",
+        "2025-01-01 10:00:00.100 - INFO - tap +\n"
+        "2025-01-01 10:00:00.300 - ERROR - failed\n"
+        "Traceback (most recent call last):\n"
+        "ValueError: boom\n",
+    )
+    write_shard(
+        tmp_path,
+        "gw1",
+        "calculator.log",
+        "2025-01-01 10:00:00.100 - INFO - tap -\n"
+        "2025-01-01 10:00:00.200 - DEBUG - result 3\n",
+    )
+
+    assert merge_shards(tmp_path) == [tmp_path / "combined" / "calculator.log"]
+
+    assert (tmp_path / "combined" / "calculator.log").read_text() == (
+        "2025-01-01 10:00:00.100 - [gw0] INFO - tap +\n"
+        "2025-01-01 10:00:00.100 - [gw1] INFO - tap -\n"
+        "2025-01-01 10:00:00.200 - [gw1] DEBUG - result 3\n"
+        "2025-01-01 10:00:00.300 - [gw0] ERROR - failed\n"
+        "Traceback (most recent call last):\n"
+        "ValueError: boom\n"
+    )
+
+
+def test_shard_files__rotated_backups_oldest_first(tmp_path):
+    newest = write_shard(tmp_path, "api", "cli.log", "")
+    backup_1 = write_shard(tmp_path, "api", "cli.log.1", "")
+    backup_10 = write_shard(tmp_path, "api", "cli.log.10", "")
+    backup_2 = write_shard(tmp_path, "api", "cli.log.2", "")
+
+    assert shard_files(tmp_path) == {
+        "cli.log": {"api": [backup_10, backup_2, backup_1, newest]}
+    }
+
+
+def test_merge_shards__reads_rotated_backups(tmp_path):
+    write_shard(
+        tmp_path, "main", "cli.log.1", "2025-01-01 10:00:00.000 - INFO - first\n"
+    )
+    write_shard(
+        tmp_path, "main", "cli.log", "2025-01-01 10:00:01.000 - INFO - second\n"
+    )
+
+    merge_shards(tmp_path)
+
+    assert (tmp_path / "combined" / "cli.log").read_text().splitlines() == [
+        "2025-01-01 10:00:00.000 - [main] INFO - first",
+        "2025-01-01 10:00:01.000 - [main] INFO - second",
+    ]
+
+
+def test_merge_shards__without_shards(tmp_path):
+    assert merge_shards(tmp_path) == []
+    assert not (tmp_path / "combined").exists()
+
+
+def test_clear_shards(tmp_path):
+    write_shard(tmp_path, "main", "cli.log", "2025-01-01 10:00:00.000 - INFO - old\n")
+    merge_shards(tmp_path)
+    (tmp_path / "cli.log").write_text("unsharded")
+
+    clear_shards(tmp_path)
+
+    assert [path.name for path in tmp_path.iterdir()] == ["cli.log"]
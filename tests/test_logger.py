@@ -0,0 +1,104 @@
+import json
+import subprocess
+import sys
+
+from logitech import logger as logger_module
+from logitech.logger import LazyFileHandler, configure_logger
+
+# Generous bound for a cold interpreter on a loaded CI machine; the import itself is ~20 ms
+IMPORT_BUDGET_SECONDS = 0.5
+
+IMPORT_PROBE = """
+import json, logging, sys, time
+start = time.perf_counter()
+import logitech.buggy_calc.pages.calculator
+elapsed = time.perf_counter() - start
+handlers = logging.getLogger("calculator").handlers
+print(json.dumps({
+    "elapsed": elapsed,
+    "opened": [h.target is not None for h in handlers],
+    "modules": sorted(m for m in ("logging.handlers", "numpy", "PIL") if m in sys.modules),
+}))
+"""
+
+
+def test_configure_logger__no_io_until_first_record(monkeypatch, tmp_path):
+    monkeypatch.setattr(logger_module, "LOG_DIR", tmp_path / "logs")
+
+    logger = configure_logger("lazy_test")
+    try:
+        assert not (tmp_path / "logs").exists()
+
+        logger.debug("first record")
+
+        log_file = tmp_path / "logs" / "automation" / "lazy_test.log"
+        assert log_file.read_text().endswith(" - DEBUG - first record\n")
+    finally:
+        for handler in logger.handlers[:]:
+            handler.close()
+            logger.removeHandler(handler)
+
+
+def test_lazy_file_handler__close_without_records(tmp_path):
+    handler = LazyFileHandler(tmp_path / "never.log")
+
+    handler.close()
+
+    assert not (tmp_path / "never.log").exists()
+
+
+def test_import_calculator__within_budget_and_without_io():
+    result = subprocess.run(
+        [sys.executable, "-c", IMPORT_PROBE],
+        capture_output=True,
+        text=True,
+        check=True,
+        timeout=30,
+    )
+    probe = json.loads(result.stdout)
+
+    assert probe["elapsed"] < IMPORT_BUDGET_SECONDS
+    assert probe["opened"] == [False]
+    assert probe["modules"] == []
+
+
+def test_configure_logger__idempotent(monkeypatch, tmp_path):
+    monkeypatch.setattr(logger_module, "LOG_DIR", tmp_path / "logs")
+
+    logger = configure_logger("idempotent_test")
+    try:
+        assert configure_logger("idempotent_test") is logger
+        assert len(logger.handlers) == 1
+    finally:
+        for handler in logger.handlers[:]:
+            handler.close()
+            logger.removeHandler(handler)
+
+
+def test_configure_logger__writes_shard_of_worker(monkeypatch, tmp_path):
+    monkeypatch.setattr(logger_module, "LOG_DIR", tmp_path)
+    monkeypatch.setenv("LOGITECH_LOG_SHARD", "emulator 5554")
+
+    logger = configure_logger("shard_test")
+    try:
+        logger.info("sharded")
+
+        assert not (tmp_path / "automation" / "shard_test.log").exists()
+        shard = tmp_path / "automation" / "shards" / "emulator_5554" / "shard_test.log"
+        assert shard.read_text().endswith(" - INFO - sharded\n")
+    finally:
+        for handler in logger.handlers[:]:
+            handler.close()
+            logger.removeHandler(handler)
+
+
+def test_log_shard__from_env_or_xdist_worker(monkeypatch):
+    monkeypatch.delenv("LOGITECH_LOG_SHARD", raising=False)
+    monkeypatch.delenv("PYTEST_XDIST_WORKER", raising=False)
+    assert logger_module.log_shard() is None
+
+    monkeypatch.setenv("PYTEST_XDIST_WORKER", "gw1")
+    assert logger_module.log_shard() == "gw1"
+
+    monkeypatch.setenv("LOGITECH_LOG_SHARD", "..")
+    assert logger_module.log_shard() is None
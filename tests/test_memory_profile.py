@@ -0,0 +1,95 @@
+import json
+import logging
+
+import pytest
+
+from logitech.memory_profile import (
+    MIB,
+    MemoryMonitor,
+    MemoryProfilePlugin,
+    MemorySample,
+    count_handlers,
+    count_open_fds,
+)
+
+
+def sample(test_id, traced=0, handlers=10, fds=20):
+    return MemorySample(test_id, traced, 0, traced, None, handlers, fds)
+
+
+@pytest.fixture
+def monitor():
+    monitor = MemoryMonitor(top=3)
+    monitor.start()
+    yield monitor
+    monitor.stop()
+
+
+def test_end__records_growth_and_allocation_sites(monitor):
+    monitor.begin()
+    retained = [bytearray(1024) for _ in range(200)]
+
+    recorded = monitor.end("test_leak")
+
+    assert recorded.traced_delta > 200 * 1024
+    assert any("test_memory_profile.py" in site for site in recorded.top)
+    assert monitor.samples == [recorded]
+    del retained
+
+
+def test_count_handlers_and_fds():
+    logger = logging.getLogger("memory_profile_test")
+    handlers, fds = count_handlers(), count_open_fds()
+    handler = logging.StreamHandler()
+    logger.addHandler(handler)
+    try:
+        with open(__file__):
+            assert count_handlers() == handlers + 1
+            if fds is not None:
+                assert count_open_fds() == fds + 1
+    finally:
+        logger.removeHandler(handler)
+
+
+def test_violations__growth_since_first_test_over_budget():
+    monitor = MemoryMonitor(budget=MIB, handler_budget=0, fd_budget=2)
+    monitor.samples = [sample("a", traced=50 * MIB), sample("b", traced=50 * MIB + 1)]
+    assert monitor.violations() == []
+
+    monitor.samples.append(sample("c", traced=52 * MIB, handlers=11, fds=23))
+
+    assert monitor.violations() == [
+        "traced memory grew by 2.0 MiB (budget 1.0 MiB)",
+        "logging handlers grew by 1 (budget 0)",
+        "open file descriptors grew by 3 (budget 2)",
+    ]
+
+
+def test_write_report_and_summary(tmp_path):
+    monitor = MemoryMonitor(handler_budget=0)
+    monitor.samples = [sample("a"), sample("b", traced=MIB, handlers=12)]
+
+    monitor.write_report(tmp_path / "memory.json")
+
+    report = json.loads((tmp_path / "memory.json").read_text())
+    assert [entry["test_id"] for entry in report["samples"]] == ["a", "b"]
+    assert report["violations"] == ["logging handlers grew by 2 (budget 0)"]
+    assert monitor.summary()[0] == (
+        "traced 1.0 MiB (+1.0 MiB since the first test), handlers 12 (+2), open fds 20 (+0)"
+    )
+
+
+class FakeSession:
+    exitstatus = pytest.ExitCode.OK
+
+
+def test_plugin__fails_passing_run_over_budget(tmp_path):
+    monitor = MemoryMonitor(handler_budget=0)
+    plugin = MemoryProfilePlugin(monitor, tmp_path / "memory.json")
+    session = FakeSession()
+    monitor.samples = [sample("a"), sample("b", handlers=11)]
+
+    plugin.pytest_sessionfinish(session, 0)
+
+    assert session.exitstatus == pytest.ExitCode.TESTS_FAILED
+    assert (tmp_path / "memory.json").exists()
@@ -0,0 +1,125 @@
+import subprocess
+import urllib.error
+import urllib.request
+
+import pytest
+
+from logitech import metrics
+from logitech.buggy_calc.helpers.adb_controller import ADBController
+from logitech.buggy_calc.helpers.parser import UIParser
+
+
+@pytest.fixture
+def registry():
+    """Enabled metrics with any metric created by the test removed afterwards."""
+    registered = list(metrics.REGISTRY)
+    metrics.enable()
+    yield
+    metrics.disable()
+    metrics.REGISTRY[:] = registered
+
+
+def test_counter__disabled_is_noop():
+    counter = metrics.Counter("test_disabled_total", "Test.")
+    metrics.REGISTRY.remove(counter)
+
+    counter.inc()
+
+    assert counter.value() == 0
+
+
+def test_render__counter_and_histogram(registry):
+    counter = metrics.Counter("test_events_total", "Events.", ("kind",))
+    histogram = metrics.Histogram("test_seconds", "Durations.", buckets=(0.1, 1))
+    counter.inc(2, 'a"b')
+    histogram.observe(0.05)
+    histogram.observe(0.5)
+    histogram.observe(5)
+
+    text = metrics.render()
+
+    assert "# TYPE test_events_total counter\n" in text
+    assert 'test_events_total{kind="a\\"b"} 2\n' in text
+    assert 'test_seconds_bucket{le="0.1"} 1\n' in text
+    assert 'test_seconds_bucket{le="1"} 2\n' in text
+    assert 'test_seconds_bucket{le="+Inf"} 3\n' in text
+    assert "test_seconds_sum 5.55\n" in text
+    assert "test_seconds_count 3\n" in text
+
+
+def test_timed__observes_calls(registry):
+    histogram = metrics.Histogram("test_timed_seconds", "Durations.", ("operation",))
+
+    @metrics.timed(histogram, "parse")
+    def parse():
+        return 42
+
+    assert parse() == 42
+    assert histogram.count("parse") == 1
+
+
+def test_write_textfile(registry, tmp_path):
+    metrics.write_textfile(tmp_path / "node" / "logitech.prom")
+
+    assert (
+        "logitech_adb_commands_total"
+        in (tmp_path / "node" / "logitech.prom").read_text()
+    )
+    assert list((tmp_path / "node").iterdir()) == [tmp_path / "node" / "logitech.prom"]
+
+
+def test_start_http_server(registry):
+    server = metrics.start_http_server(0)
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    try:
+        with urllib.request.urlopen(f"{base_url}/metrics", timeout=5) as response:
+            body = response.read().decode()
+            content_type = response.headers["Content-Type"]
+        with pytest.raises(urllib.error.HTTPError):
+            urllib.request.urlopen(f"{base_url}/other", timeout=5)
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert content_type == metrics.CONTENT_TYPE
+    assert "# TYPE logitech_ui_dump_bytes histogram" in body
+
+
+def test_adb_controller_hooks(registry, mocker):
+    mocker.patch(
+        "subprocess.run",
+        return_value=subprocess.CompletedProcess([], 0, "<hierarchy/>", ""),
+    )
+    before = metrics.ADB_COMMANDS.value("exec-out", "ok")
+
+    ADBController().get_ui_dump()
+
+    assert metrics.ADB_COMMANDS.value("exec-out", "ok") == before + 1
+    assert metrics.UI_DUMP_BYTES.count() >= 1
+
+
+def test_ui_dump_bytes__counts_encoded_bytes(registry, mocker):
+    mocker.patch(
+        "subprocess.run",
+        return_value=subprocess.CompletedProcess([], 0, 'text="ü"', ""),
+    )
+
+    def dumped_bytes():
+        sums = [line for line in metrics.UI_DUMP_BYTES.samples() if "_sum" in line]
+        return float(sums[0].split()[-1]) if sums else 0.0
+
+    before = dumped_bytes()
+
+    ADBController().get_ui_dump()
+
+    assert dumped_bytes() == before + 9
+
+
+def test_parse_all_bounds__is_timed_once(registry):
+    parser = UIParser("com.example")
+    before = metrics.UI_PARSE_SECONDS.count("element_bounds")
+
+    parser.parse_all_bounds("<hierarchy/>")
+
+    assert metrics.UI_PARSE_SECONDS.count("all_bounds") >= 1
+    assert metrics.UI_PARSE_SECONDS.count("element_bounds") == before
@@ -0,0 +1,76 @@
+import pstats
+
+import pytest
+
+from logitech.profiling import RunProfiler, frame_name
+
+
+def busy(iterations):
+    total = 0
+    for number in range(iterations):
+        total += number * number
+    return total
+
+
+def test_frame_name():
+    assert frame_name(busy.__code__) == "test_profiling:busy"
+
+
+def test_sampling__writes_collapsed_stacks_and_self_time(tmp_path):
+    profiler = RunProfiler(tmp_path, interval=0.001)
+
+    profiler.start()
+    busy(2_000_000)
+    path = profiler.stop("tests/test_x.py::test_busy[1 + 1]")
+
+    assert path == tmp_path / "tests_test_x.py_test_busy_1_1_.collapsed"
+    stacks = dict(line.rsplit(" ", 1) for line in path.read_text().splitlines())
+    assert any(
+        stack.endswith(
+            ";test_profiling:test_sampling__writes_collapsed_stacks_and_self_time;"
+            "test_profiling:busy"
+        )
+        for stack in stacks
+    )
+    assert all(int(count) > 0 for count in stacks.values())
+    name, seconds, share = profiler.top_functions(1)[0]
+    assert name == "test_profiling:busy"
+    assert 0 < share <= 1
+
+
+def test_cprofile__writes_pstats_and_self_time(tmp_path):
+    profiler = RunProfiler(tmp_path, mode="cprofile")
+
+    profiler.start()
+    busy(500_000)
+    path = profiler.stop("test_busy")
+
+    assert path == tmp_path / "test_busy.prof"
+    assert any(function == "busy" for _, _, function in pstats.Stats(str(path)).stats)
+    assert profiler.top_functions(1)[0][0] == "test_profiling:busy"
+
+
+def test_self_time_is_summed_over_tests_and_saved(tmp_path):
+    profiler = RunProfiler(tmp_path, mode="cprofile")
+    for test_id in ("a", "b"):
+        profiler.start()
+        busy(500_000)
+        profiler.stop(test_id)
+
+    path = profiler.write_summary()
+
+    assert set(profiler.test_time) == {"a", "b"}
+    assert profiler.self_time["test_profiling:busy"] > 0
+    lines = path.read_text().splitlines()
+    assert lines[0] == f"2 tests profiled (cprofile) in {tmp_path}"
+    assert lines[2].endswith("test_profiling:busy")
+
+
+def test_stop_without_start_is_ignored(tmp_path):
+    assert RunProfiler(tmp_path).stop("test") is None
+    assert not tmp_path.joinpath("test.collapsed").exists()
+
+
+def test_unknown_mode():
+    with pytest.raises(ValueError):
+        RunProfiler(mode="perf")
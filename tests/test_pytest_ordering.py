@@ -0,0 +1,108 @@
+import json
+
+import pytest
+
+from logitech.pytest_ordering import DurationOrdering, state_key
+
+
+class FakeItem:
+    """Minimal stand-in for a collected pytest item."""
+
+    def __init__(self, nodeid, fixtures=(), markers=()):
+        self.nodeid = nodeid
+        self.markers = {marker.name: marker for marker in markers}
+        self._fixtureinfo = type(
+            "FixtureInfo",
+            (),
+            {
+                "name2fixturedefs": {
+                    name: [type("FixtureDef", (), {"scope": scope})()]
+                    for name, scope in fixtures
+                }
+            },
+        )()
+
+    def get_closest_marker(self, name):
+        return self.markers.get(name)
+
+
+def durations_file(tmp_path, durations):
+    path = tmp_path / "durations.json"
+    path.write_text(json.dumps(durations))
+    return path
+
+
+def test_state_key__session_fixtures_or_marker():
+    device = FakeItem("a", [("calculator_app", "session"), ("setUp", "function")])
+    marked = FakeItem(
+        "b", [("calculator_app", "session")], [pytest.mark.app_state("fresh").mark]
+    )
+
+    assert state_key(device) == ("calculator_app",)
+    assert state_key(marked) == ("fresh",)
+
+
+def test_order__groups_by_state_longest_first(tmp_path):
+    api = [FakeItem(f"api{i}") for i in range(2)]
+    device = [FakeItem(f"e2e{i}", [("calculator_app", "session")]) for i in range(3)]
+    plugin = DurationOrdering(
+        durations_file(
+            tmp_path,
+            {
+                "api0": {"call": 0.1},
+                "api1": {"call": 0.3},
+                "e2e0": {"setup": 5.0, "call": 1.0},
+                "e2e1": {"call": 2.0},
+            },
+        )
+    )
+
+    ordered = plugin.order([api[0], device[0], api[1], device[1], device[2]])
+
+    # e2e2 has no record and is assumed to take the median (1.0 s)
+    assert [item.nodeid for item in ordered] == ["e2e0", "e2e1", "e2e2", "api1", "api0"]
+
+
+def test_order__smoke_first_cheapest_first(tmp_path):
+    smoke = pytest.mark.smoke.mark
+    items = [
+        FakeItem("slow"),
+        FakeItem("smoke_b", markers=[smoke]),
+        FakeItem("smoke_a", markers=[smoke]),
+    ]
+    plugin = DurationOrdering(
+        durations_file(
+            tmp_path,
+            {"slow": {"call": 9}, "smoke_a": {"call": 1}, "smoke_b": {"call": 2}},
+        ),
+        smoke_fail_fast=True,
+    )
+
+    ordered = plugin.order(items)
+
+    assert [item.nodeid for item in ordered] == ["smoke_a", "smoke_b", "slow"]
+
+
+def test_logreport__smoke_failure_stops_session(tmp_path, mocker):
+    plugin = DurationOrdering(tmp_path / "durations.json", smoke_fail_fast=True)
+    plugin.order([FakeItem("smoke", markers=[pytest.mark.smoke.mark])])
+    plugin.session = mocker.Mock(shouldstop=False)
+
+    plugin.pytest_runtest_logreport(
+        mocker.Mock(nodeid="smoke", when="call", duration=0.5, failed=True)
+    )
+
+    assert plugin.session.shouldstop == "smoke test failed: smoke"
+
+
+def test_sessionfinish__smooths_durations(tmp_path, mocker):
+    path = durations_file(tmp_path, {"a": {"call": 4.0}})
+    plugin = DurationOrdering(path)
+    for when, duration in (("setup", 1.0), ("call", 2.0)):
+        plugin.pytest_runtest_logreport(
+            mocker.Mock(nodeid="a", when=when, duration=duration, failed=False)
+        )
+
+    plugin.pytest_sessionfinish(mocker.Mock())
+
+    assert json.loads(path.read_text()) == {"a": {"call": 3.0, "setup": 1.0}}
@@ -0,0 +1,83 @@
+import json
+import logging
+
+import pytest
+
+from logitech import structured_log
+from logitech.logger import configure_logger
+from logitech.structured_log import StructuredLogReader, log_context, span
+
+
+@pytest.fixture
+def run_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(structured_log, "_device_serial", "emulator-5554")
+    monkeypatch.setattr(structured_log, "CHECKPOINT_INTERVAL", 2)
+    structured_log.enable_structured_logging(tmp_path / "run")
+    yield tmp_path / "run"
+    structured_log.disable_structured_logging()
+
+
+@pytest.fixture
+def framework_logger():
+    logger = configure_logger("structured_test")
+    # Keep the text log out of the repository log directory
+    for handler in logger.handlers[:]:
+        logger.removeHandler(handler)
+    return logger
+
+
+def test_records_carry_test_span_and_device(run_dir, framework_logger):
+    with log_context("tests/test_a.py::test_one"):
+        framework_logger.info("in test")
+        with span() as span_id:
+            framework_logger.debug("in span")
+    framework_logger.info("outside")
+    logging.getLogger("third_party").warning("not framework")
+    structured_log.disable_structured_logging()
+
+    records = [
+        json.loads(line) for line in (run_dir / "events.jsonl").read_text().splitlines()
+    ]
+
+    assert [record["msg"] for record in records] == ["in test", "in span", "outside"]
+    assert records[0]["test"] == "tests/test_a.py::test_one"
+    assert records[0]["device"] == "emulator-5554"
+    assert records[1]["span"] == span_id != records[0]["span"]
+    # Outside the inner context the record belongs to the running pytest item again
+    assert records[2]["test"].endswith("test_records_carry_test_span_and_device")
+
+
+def test_reader__by_test_and_time(run_dir, framework_logger, mocker):
+    clock = mocker.patch("time.time")
+    for second, test_id in enumerate(["a", "b", "a", None, "b"]):
+        clock.return_value = 1000.0 + second
+        if test_id is None:
+            framework_logger.info("idle")
+            continue
+        with log_context(test_id):
+            framework_logger.info(f"record {second}")
+    structured_log.disable_structured_logging()
+
+    reader = StructuredLogReader(run_dir)
+
+    assert [record["msg"] for record in reader.for_test("a")] == [
+        "record 0",
+        "record 2",
+    ]
+    assert reader.tests["b"][4] == 2
+    assert [record["msg"] for record in reader.between(1002.0, 1003.0)] == [
+        "record 2",
+        "idle",
+    ]
+    assert reader.for_test("unknown") == []
+
+
+def test_reader__rebuilds_missing_index(run_dir, framework_logger):
+    with log_context("a"):
+        framework_logger.info("record")
+    structured_log.disable_structured_logging()
+    (run_dir / "index.json").unlink()
+
+    reader = StructuredLogReader(run_dir)
+
+    assert [record["msg"] for record in reader.for_test("a")] == ["record"]